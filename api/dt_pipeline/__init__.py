@@ -8,5 +8,7 @@ __all__ = [
     'career_predictor',
     'curriculum_gap',
     'study_plan',
-    'personality_classifier'
+    'personality_classifier',
+    'internship_matcher',
+    'model_registry'
 ]
@@ -1,29 +1,234 @@
 """
 Career Prediction Pipeline
-Predicts top career paths with probability scores
+Predicts top career paths with probability scores using the trained
+XGBoost artifacts from train_career_model.py:
+    models/career_model_xgb.pkl   classifier (its booster is used directly)
+    models/emb_pca.pkl            student embedding PCA (384 -> 32 dims)
+    models/label_encoder.pkl      career classes
+    models/feature_list.pkl       feature order
+The artifacts are loaded once per worker through the model registry. The
+PCA is applied as a plain mean / components projection and the booster
+predicts with inplace_predict, so scoring one student is a few numpy ops
+plus a single booster call. Inside the API, concurrent predictions are
+coalesced into one booster call by the "career_model" micro-batcher;
+bulk ingestion scores a whole batch with predict_students_careers.
 """
-from typing import List, Tuple
+import os
+import re
+import warnings
+from typing import Dict, List, Optional, Tuple
+
 import numpy as np
 
-def predict_careers(features: List[float]) -> List[Tuple[str, float]]:
+from api.dt_pipeline.model_registry import register, get_model
+from api.dt_pipeline.skill_extractor import embed_text, embed_texts
+from api.utils.micro_batcher import register_batcher, call_batched
+
+MODELS_DIR = os.environ.get("MODELS_DIR", "./models")
+
+# Defaults used by train_career_model.py for missing dataset values
+DEFAULT_ATTENDANCE = 80.0
+# Grades above this are on a 0-100 scale, else on the 0-4 GPA scale
+PERCENT_SCALE_MIN = 4.0
+FAIL_GRADE = {"percent": 60.0, "gpa": 1.0}
+
+
+class CareerModel:
+    """
+    Career classifier prepared for single-student inference.
+
+    Args:
+        models_dir: Directory holding the training artifacts
+    """
+
+    def __init__(self, models_dir: str = MODELS_DIR):
+        import joblib
+        with warnings.catch_warnings():
+            # Artifacts pickled by other sklearn / xgboost versions still load
+            warnings.simplefilter("ignore")
+            classifier = joblib.load(os.path.join(models_dir, "career_model_xgb.pkl"))
+            pca = joblib.load(os.path.join(models_dir, "emb_pca.pkl"))
+            label_encoder = joblib.load(os.path.join(models_dir, "label_encoder.pkl"))
+            self.feature_names: List[str] = list(joblib.load(os.path.join(models_dir, "feature_list.pkl")))
+
+        self.booster = classifier.get_booster()
+        # One row per call: threading costs more than it saves
+        self.booster.set_param({"nthread": 1})
+        self.classes: List[str] = [str(c) for c in label_encoder.classes_]
+
+        self.pca_mean = pca.mean_.astype(np.float32)
+        self.pca_components = np.ascontiguousarray(pca.components_.T, dtype=np.float32)
+        if getattr(pca, "whiten", False):
+            self.pca_components /= np.sqrt(pca.explained_variance_).astype(np.float32)
+        self.embedding_dim = self.pca_mean.shape[0]
+
+        self.columns = {name: i for i, name in enumerate(self.feature_names)}
+        self.pca_columns = [self.columns[f"emb_pca_{i}"] for i in range(self.pca_components.shape[1])]
+
+    def features(self, student: Dict, embedding: Optional[np.ndarray] = None,
+                 skill_gaps: Optional[Dict] = None) -> np.ndarray:
+        """
+        Feature vector of a live student, in training column order.
+
+        Args:
+            student: StudentForm payload
+            embedding: Student skill embedding (zeros if None, as in training
+                for students without one)
+            skill_gaps: Dictionary with 'missing_skills' and optional
+                'priority_skills' (as in skill gap profiles)
+
+        Returns:
+            float32 array of shape (1, n_features)
+        """
+        row = np.zeros((1, len(self.feature_names)), dtype=np.float32)
+        values = academic_features(student)
+        skill_gaps = skill_gaps or {}
+        priorities = [s.get("priority_score", 0) for s in skill_gaps.get("priority_skills", [])]
+        values["num_missing_skills"] = len(skill_gaps.get("missing_skills", []))
+        values["top_missing_priority"] = float(np.mean(priorities)) if priorities else 0.0
+        for name, value in values.items():
+            if name in self.columns:
+                row[0, self.columns[name]] = value
+
+        if embedding is None:
+            embedding = np.zeros(self.embedding_dim, dtype=np.float32)
+        projected = (np.asarray(embedding, dtype=np.float32).reshape(-1) - self.pca_mean) @ self.pca_components
+        row[0, self.pca_columns] = projected
+        return row
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (n, n_features) feature matrix"""
+        return self.booster.inplace_predict(np.asarray(features, dtype=np.float32))
+
+    def top_k(self, probabilities: np.ndarray, top_k: int = 5) -> List[Tuple[str, float]]:
+        """(career, probability) pairs of one row, most likely first"""
+        order = np.argsort(-probabilities, kind="stable")[:top_k]
+        return [(self.classes[i], float(probabilities[i])) for i in order]
+
+
+def _count(value) -> int:
+    """Number of entries in a list field (or a ;,|/ separated string)"""
+    if not value:
+        return 0
+    if isinstance(value, str):
+        return len([x for x in re.split(r"[;,|/]+", value) if x.strip()])
+    return len(value)
+
+
+def academic_features(student: Dict) -> Dict[str, float]:
+    """Academic and activity count features of a StudentForm payload"""
+    gpa = float(student.get("gpa") or 0)
+    grades = [float(g) for g in student.get("completed_grades") or []]
+    scale = "percent" if grades and max(grades) > PERCENT_SCALE_MIN else "gpa"
+    return {
+        "GPA": gpa,
+        # Training uses GPA here: the dataset's grade columns are letters
+        "major_avg": gpa,
+        "AttendancePercent": float(student.get("attendance_percent") or DEFAULT_ATTENDANCE),
+        "FailedCourses": sum(g < FAIL_GRADE[scale] for g in grades),
+        "num_skills": _count(student.get("technical_skills")),
+        "num_courses_completed": _count(student.get("completed_courses")),
+        "project_count": _count(student.get("projects")),
+        "internship_count": _count(student.get("internships")),
+    }
+
+
+def student_text(student: Dict) -> str:
+    """Skill text of a live student, built like build_embeddings.combine_student_skills"""
+    parts = []
+    for field in ("technical_skills", "soft_skills", "completed_courses", "projects"):
+        value = student.get(field) or []
+        parts.append(value if isinstance(value, str) else " ".join(str(v) for v in value))
+    return " ".join(p for p in parts if p)
+
+
+register("career_model", CareerModel)
+
+
+def get_career_model() -> CareerModel:
+    """Return the process-wide career model, loading it on first call"""
+    return get_model("career_model")
+
+
+def predict_proba_rows(rows: List[np.ndarray]) -> List[np.ndarray]:
+    """Class probabilities of several feature rows in one booster call"""
+    return list(get_career_model().predict_proba(np.vstack(rows)))
+
+
+register_batcher("career_model", predict_proba_rows)
+
+
+def embed_student(student: Dict) -> Optional[np.ndarray]:
+    """Skill embedding of a live student, or None if the encoder is unavailable"""
+    try:
+        return embed_text(student_text(student))
+    except (ImportError, OSError):
+        return None
+
+
+def embed_students(students: List[Dict]) -> Optional[np.ndarray]:
+    """Skill embeddings of several students in one encoder call (None if unavailable)"""
+    try:
+        return embed_texts([student_text(student) for student in students])
+    except (ImportError, OSError):
+        return None
+
+
+def predict_student_careers(student: Dict, embedding: Optional[np.ndarray] = None,
+                            skill_gaps: Optional[Dict] = None, top_k: int = 5) -> List[Tuple[str, float]]:
     """
-    Predict top 5 career paths with probability scores
-    
+    Predict the top careers of a live student
+
     Args:
-        features: Student feature vector (GPA, skills count, etc.)
-        
+        student: StudentForm payload
+        embedding: Precomputed skill embedding (see embed_student)
+        skill_gaps: Missing / priority skills of the student
+        top_k: Number of careers to return
+
     Returns:
         List of (career_name, probability) tuples, sorted by probability
     """
-    # Placeholder - will be implemented in Step 12
-    # This will use the trained ML model from models/career_model.pkl
-    
-    careers = [
-        ("Data Analyst", 0.82),
-        ("ML Engineer", 0.65),
-        ("Backend Developer", 0.58),
-        ("Frontend Developer", 0.45),
-        ("DevOps Engineer", 0.40)
-    ]
-    
-    return careers
+    model = get_career_model()
+    features = model.features(student, embedding, skill_gaps)[0]
+    probabilities = call_batched("career_model", features, lambda row: predict_proba_rows([row])[0])
+    return model.top_k(probabilities, top_k)
+
+
+def predict_careers(features: List[float], top_k: int = 5) -> List[Tuple[str, float]]:
+    """
+    Predict top career paths with probability scores
+
+    Args:
+        features: Student feature vector in models/feature_list.pkl order
+        top_k: Number of careers to return
+
+    Returns:
+        List of (career_name, probability) tuples, sorted by probability
+    """
+    model = get_career_model()
+    features = np.asarray(features, dtype=np.float32).reshape(1, -1)
+    return model.top_k(model.predict_proba(features)[0], top_k)
+
+
+def predict_students_careers(students: List[Dict], embeddings: Optional[np.ndarray] = None,
+                             skill_gaps: Optional[List[Dict]] = None,
+                             top_k: int = 5) -> List[List[Tuple[str, float]]]:
+    """
+    Predict the top careers of several live students in one booster call
+
+    Args:
+        students: StudentForm payloads
+        embeddings: Skill embeddings, one row per student (see embed_students)
+        skill_gaps: Missing / priority skills, one entry per student
+        top_k: Number of careers per student
+
+    Returns:
+        One list of (career_name, probability) tuples per student
+    """
+    model = get_career_model()
+    skill_gaps = skill_gaps or [None] * len(students)
+    rows = np.vstack([
+        model.features(student, None if embeddings is None else embeddings[i], skill_gaps[i])
+        for i, student in enumerate(students)
+    ])
+    return [model.top_k(probabilities, top_k) for probabilities in model.predict_proba(rows)]
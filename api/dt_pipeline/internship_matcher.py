@@ -0,0 +1,40 @@
+"""
+Internship Matching Pipeline
+Matches a live student embedding against entry-level jobs using the
+precomputed job catalog index
+"""
+import os
+from typing import Dict, List
+
+from utils.job_index import JobIndex, load_job_index
+from api.dt_pipeline.model_registry import register, get_model
+
+EMBEDDINGS_DIR = os.environ.get("EMBEDDINGS_DIR", "./embeddings")
+JOB_DATA_PATH = os.environ.get("JOB_DATA_PATH", "./egypt_jobs_full_1500_cleaned.csv")
+# Optional vector index backend ('flat', 'ivf', 'hnsw'); unset uses the in-memory buckets
+VECTOR_INDEX_BACKEND = os.environ.get("VECTOR_INDEX_BACKEND") or None
+
+# Built on first use (or at startup warm-up), then shared by every request
+# in this worker
+register("job_index", lambda: load_job_index(EMBEDDINGS_DIR, JOB_DATA_PATH, backend=VECTOR_INDEX_BACKEND))
+
+
+def get_job_index() -> JobIndex:
+    """
+    Return the process-wide job index, building it on first call
+    """
+    return get_model("job_index")
+
+
+def match_internships(student_embedding, top_k: int = 5) -> List[Dict]:
+    """
+    Recommend internship / junior roles for a single student
+    
+    Args:
+        student_embedding: Student skill embedding vector (384 dims)
+        top_k: Number of roles to return
+        
+    Returns:
+        List of internship recommendation dicts, best match first
+    """
+    return get_job_index().recommend_internships(student_embedding, k=top_k)[0]
@@ -0,0 +1,134 @@
+"""
+Model Registry
+Process-wide registry of lazily loaded models and indexes. Nothing is
+loaded at import time: each entry loads on first use, or explicitly via
+warm() (called from the API lifespan hook), and its load time is recorded
+"""
+import time
+import logging
+import importlib
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pipeline modules that register each model when imported
+MODEL_MODULES = {
+    "sentence_encoder": "api.dt_pipeline.skill_extractor",
+    "skill_matcher": "api.dt_pipeline.skill_extractor",
+    "job_index": "api.dt_pipeline.internship_matcher",
+    "career_model": "api.dt_pipeline.career_predictor",
+}
+
+_loaders: Dict[str, Callable[[], Any]] = {}
+_models: Dict[str, Any] = {}
+_metrics: Dict[str, Dict[str, Any]] = {}
+_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def register(name: str, loader: Callable[[], Any]) -> None:
+    """
+    Register a model loader (does not load the model)
+
+    Args:
+        name: Registry key
+        loader: Zero-argument callable returning the loaded model
+    """
+    with _registry_lock:
+        _loaders[name] = loader
+        _locks.setdefault(name, threading.Lock())
+        _metrics.setdefault(name, {"loaded": False, "load_seconds": None, "loaded_at": None,
+                                   "requests": 0, "error": None})
+
+
+def _ensure_registered(name: str) -> None:
+    """Import the module that registers name, if it is a known pipeline model"""
+    if name not in _loaders and name in MODEL_MODULES:
+        importlib.import_module(MODEL_MODULES[name])
+    if name not in _loaders:
+        raise KeyError(f"Unknown model: {name}")
+
+
+def get_model(name: str) -> Any:
+    """
+    Return a model, loading it on first use
+
+    Concurrent first calls wait for a single load.
+    """
+    _ensure_registered(name)
+    _metrics[name]["requests"] += 1
+    model = _models.get(name)
+    if model is not None:
+        return model
+    return _load(name)
+
+
+def _load(name: str) -> Any:
+    """Load a registered model once"""
+    with _locks[name]:
+        if name not in _models:
+            start = time.perf_counter()
+            try:
+                _models[name] = _loaders[name]()
+            except Exception as e:
+                _metrics[name]["error"] = str(e)
+                raise
+            _metrics[name].update({
+                "loaded": True,
+                "load_seconds": round(time.perf_counter() - start, 4),
+                "loaded_at": datetime.now().isoformat(),
+                "error": None,
+            })
+            logger.info("Loaded model %s in %.2fs", name, _metrics[name]["load_seconds"])
+    return _models[name]
+
+
+def is_loaded(name: str) -> bool:
+    """True if the model is already in memory"""
+    return name in _models
+
+
+def warm(names: Optional[Iterable[str]] = None) -> Dict[str, Optional[float]]:
+    """
+    Load models ahead of the first request
+
+    Args:
+        names: Models to load; None loads every known model
+
+    Returns:
+        Dictionary of model name -> load seconds (None if loading failed;
+        the error is kept in metrics())
+    """
+    if names is None:
+        names = sorted(set(MODEL_MODULES) | set(_loaders))
+    timings = {}
+    for name in names:
+        try:
+            _ensure_registered(name)
+            _load(name)
+            timings[name] = _metrics[name]["load_seconds"]
+        except Exception as e:
+            logger.warning("Could not warm model %s: %s", name, e)
+            timings[name] = None
+    return timings
+
+
+def unload(name: str) -> None:
+    """Drop a loaded model so the next get_model reloads it"""
+    with _locks.get(name, _registry_lock):
+        _models.pop(name, None)
+        if name in _metrics:
+            _metrics[name]["loaded"] = False
+
+
+def metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Load metrics per registered model
+
+    Returns:
+        Dictionary of model name -> loaded flag, load seconds, load
+        timestamp, request count and last load error
+    """
+    return {name: dict(values) for name, values in _metrics.items()}
@@ -2,12 +2,35 @@
 AI Skill Extraction Pipeline
 Extracts technical skills from free-text input using NLP and pattern matching
 """
-from sentence_transformers import SentenceTransformer
-import re
+import os
 from typing import List
 
-# Load sentence transformer model for semantic matching
-model = SentenceTransformer("all-MiniLM-L6-v2")
+import numpy as np
+
+from utils.encoder_cache import CachedEncoder, DEFAULT_CACHE_PATH
+from utils.skill_matcher import SkillMatcher, catalog_vocabulary
+from api.dt_pipeline.model_registry import register, get_model
+from api.utils.micro_batcher import register_batcher, call_batched
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def load_sentence_model():
+    """Load the sentence transformer (called once by the model registry)"""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME, device="cpu")
+
+
+register("sentence_encoder", load_sentence_model)
+
+# Sentence encoder for semantic matching; the model is fetched from the
+# registry on the first cache miss and repeated texts are served from the
+# shared text -> vector cache
+encoder = CachedEncoder(
+    MODEL_NAME,
+    cache_path=os.environ.get("ENCODER_CACHE_PATH", DEFAULT_CACHE_PATH),
+    model_loader=lambda: get_model("sentence_encoder")
+)
 
 # Common technical skills patterns
 SKILL_PATTERNS = [
@@ -22,6 +45,24 @@ SKILL_PATTERNS = [
     "rest api", "graphql", "microservices", "flask", "django", "fastapi"
 ]
 
+# "patterns" matches SKILL_PATTERNS only; "catalog" adds every skill from the
+# job and course catalogs
+SKILL_VOCABULARY = os.environ.get("SKILL_VOCABULARY", "patterns")
+JOB_DATA_PATH = os.environ.get("JOB_DATA_PATH", "./egypt_jobs_full_1500_cleaned.csv")
+COURSE_DATA_PATH = os.environ.get("COURSE_DATA_PATH", "./digital_twin_courses_1500_cleaned.csv")
+
+
+def load_skill_matcher() -> SkillMatcher:
+    """Compile the skill vocabulary (called once by the model registry)"""
+    vocabulary = list(SKILL_PATTERNS)
+    if SKILL_VOCABULARY == "catalog":
+        vocabulary += catalog_vocabulary(JOB_DATA_PATH, COURSE_DATA_PATH)
+    return SkillMatcher(vocabulary)
+
+
+register("skill_matcher", load_skill_matcher)
+
+
 def extract_skills(text: str) -> List[str]:
     """
     Extract technical skills from text using pattern matching
@@ -30,13 +71,31 @@ def extract_skills(text: str) -> List[str]:
         text: Free-form text containing skill descriptions
         
     Returns:
-        List of extracted skill names
+        List of extracted skill names (canonical, title-cased), in order of
+        first appearance
     """
-    found_skills = []
-    text_lower = text.lower()
-    
-    for skill in SKILL_PATTERNS:
-        if re.search(r'\b' + re.escape(skill) + r'\b', text_lower):
-            found_skills.append(skill.title())
+    return [name.title() for name in get_model("skill_matcher").find(text or "")]
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """
+    Encode texts for semantic matching
     
-    return list(set(found_skills))  # Remove duplicates
+    Args:
+        texts: Texts to encode (duplicates are encoded once)
+        
+    Returns:
+        Array of shape (len(texts), 384)
+    """
+    return encoder.encode(texts)
+
+
+register_batcher("sentence_encoder", lambda texts: list(embed_texts(texts)))
+
+
+def embed_text(text: str) -> np.ndarray:
+    """
+    Encode one text; inside the API concurrent calls are coalesced into a
+    single encoder batch by the "sentence_encoder" micro-batcher
+    """
+    return call_batched("sentence_encoder", text, lambda t: embed_texts([t])[0])
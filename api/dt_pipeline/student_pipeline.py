@@ -3,9 +3,16 @@ Student Digital Twin Pipeline
 Main AI pipeline for generating complete student digital twin profile
 Processes student input and generates personalized recommendations
 """
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+import logging
 import numpy as np
 
+from api.dt_pipeline.career_predictor import (
+    predict_student_careers, predict_students_careers, embed_student, embed_students
+)
+
+logger = logging.getLogger(__name__)
+
 def run_student_pipeline(student: Dict) -> Dict:
     """
     Main AI pipeline for generating the student's digital twin.
@@ -16,6 +23,46 @@ def run_student_pipeline(student: Dict) -> Dict:
     Returns:
         Complete digital twin profile with recommendations
     """
+    profile = _recommendations(student)
+    try:
+        career_predictions = predict_student_careers(
+            student, embed_student(student), {"missing_skills": profile["missing_skills"]}
+        )
+    except Exception as e:
+        logger.warning("Career model unavailable, using skill overlap: %s", e)
+        career_predictions = None
+    return _digital_twin(student, profile, career_predictions)
+
+
+def run_student_pipeline_batch(students: List[Dict]) -> List[Dict]:
+    """
+    Digital twins of several students, vectorized across the batch: one
+    encoder call for all skill texts and one booster call for all career
+    predictions. Same output as run_student_pipeline per student.
+    
+    Args:
+        students: StudentForm payloads
+        
+    Returns:
+        One digital twin per student, in input order
+    """
+    profiles = [_recommendations(student) for student in students]
+    try:
+        predictions = predict_students_careers(
+            students, embed_students(students),
+            [{"missing_skills": profile["missing_skills"]} for profile in profiles]
+        )
+    except Exception as e:
+        logger.warning("Career model unavailable, using skill overlap: %s", e)
+        predictions = [None] * len(students)
+    return [
+        _digital_twin(student, profile, career_predictions)
+        for student, profile, career_predictions in zip(students, profiles, predictions)
+    ]
+
+
+def _recommendations(student: Dict) -> Dict:
+    """Skill gaps and rule-based track / course / role / company recommendations"""
 
     # ========= 1) CLEAN BASIC INPUT =========
     name = student.get("name")
@@ -98,25 +145,49 @@ def run_student_pipeline(student: Dict) -> Dict:
 
     recommended_companies = companies.get(best_track, [])
 
-    # ========= 7) OUTPUT DIGITAL TWIN =========
-    # Format skills for dashboard (mock scores for now as we only have binary presence)
-    skills_with_scores = {skill: 85 for skill in technical_skills}
-    
-    # Normalize track scores to probabilities
-    total_score = sum(track_scores.values()) if sum(track_scores.values()) > 0 else 1
-    career_probabilities = {k: round(v / total_score, 2) for k, v in track_scores.items()}
-
-    digital_twin = {
+    return {
         "student_name": name,
         "best_track": best_track,
+        "track_scores": track_scores,
         "missing_skills": missing_skills,
         "recommended_courses": recommended_courses,
         "recommended_job_roles": recommended_job_roles,
         "recommended_companies": recommended_companies,
+    }
+
+
+def _digital_twin(student: Dict, profile: Dict,
+                  career_predictions: Optional[List[Tuple[str, float]]]) -> Dict:
+    """Assemble the digital twin; career_predictions None falls back to skill overlap"""
+
+    # ========= 7) OUTPUT DIGITAL TWIN =========
+    # Format skills for dashboard (mock scores for now as we only have binary presence)
+    skills_with_scores = {skill: 85 for skill in student.get("technical_skills", [])}
+    
+    # Career probabilities from the trained model; skill overlap per track
+    # if the model artifacts are unavailable
+    if career_predictions is not None:
+        career_probabilities = {career: round(p, 2) for career, p in career_predictions}
+    else:
+        career_predictions = []
+        track_scores = profile["track_scores"]
+        total_score = sum(track_scores.values()) if sum(track_scores.values()) > 0 else 1
+        career_probabilities = {k: round(v / total_score, 2) for k, v in track_scores.items()}
+
+    digital_twin = {
+        "student_name": profile["student_name"],
+        "best_track": profile["best_track"],
+        "missing_skills": profile["missing_skills"],
+        "recommended_courses": profile["recommended_courses"],
+        "recommended_job_roles": profile["recommended_job_roles"],
+        "recommended_companies": profile["recommended_companies"],
         "input_summary": student,
         # Added for Dashboard visualization
         "skills": skills_with_scores,
-        "career_probabilities": career_probabilities
+        "career_probabilities": career_probabilities,
+        "career_predictions": [
+            {"career": career, "probability": round(p, 4)} for career, p in career_predictions
+        ]
     }
 
     return digital_twin
@@ -1,23 +1,57 @@
+import io
 import os
+import csv
+import json
+import time
 import traceback
-from typing import Dict, Any
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Literal, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from fastapi.staticfiles import StaticFiles
 
 # Import StudentForm model
 from api.models.student_form_model import StudentForm
 
 # Import pipeline and utilities
-from api.dt_pipeline.student_pipeline import run_student_pipeline
-from api.utils.storage import next_student_id, save_student_json, append_student_csv, get_student_json
-from api.utils.pdf_wrapper import generate_student_pdf
+from api.dt_pipeline.student_pipeline import run_student_pipeline, run_student_pipeline_batch
+from api.utils.storage import next_student_id, create_students, save_student, get_student_json
+from api.utils.batch_input import parse_students
+from api.utils.pdf_wrapper import PDF_DIR as PDF_OUTPUT_DIR
+from api.utils import pdf_jobs, micro_batcher, stages, twin_export
+from api.utils.twin_cache import twin_cache, etag_for, artifact_version
+from api.dt_pipeline import model_registry
+
+# Models to load before serving: comma-separated registry names, or "all".
+# Unset keeps startup fast and loads each model on first use.
+WARM_MODELS = os.environ.get("WARM_MODELS", "")
+
+# Batch create: largest accepted batch, and students run through the
+# pipeline (and streamed back) per chunk
+BATCH_MAX_STUDENTS = int(os.environ.get("BATCH_MAX_STUDENTS", "10000"))
+BATCH_CHUNK_SIZE = int(os.environ.get("BATCH_CHUNK_SIZE", "256"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    names = [name.strip() for name in WARM_MODELS.split(",") if name.strip()]
+    if names:
+        model_registry.warm(None if names == ["all"] else names)
+    artifact_version(refresh=True)
+    await micro_batcher.start_all()
+    pdf_jobs.runner.start()
+    yield
+    pdf_jobs.runner.stop()
+    await micro_batcher.stop_all()
+    stages.shutdown()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Digital Twin AI API",
     description="API for generating student digital twins based on input form data.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -33,55 +67,188 @@ app.add_middleware(
 def health_check():
     return {"status": "ok"}
 
+@app.get("/health/models", summary="Model load status and timings")
+def model_health() -> Dict[str, Any]:
+    return model_registry.metrics()
+
+@app.get("/health/batching", summary="Inference micro-batcher queue depth and batch sizes")
+def batching_health() -> Dict[str, Any]:
+    return micro_batcher.metrics()
+
+@app.get("/health/stages", summary="Active and waiting calls per request stage")
+def stage_health() -> Dict[str, Any]:
+    return stages.metrics()
+
+@app.get("/health/cache", summary="Digital twin cache hit rates")
+def cache_health() -> Dict[str, Any]:
+    return twin_cache.metrics()
+
+def _store_new_twin(student_id: str, student_payload: Dict, digital_twin: Dict) -> int:
+    """Save the student, cache the twin and queue its PDF; returns the PDF job id"""
+    save_student(student_id, student_payload)
+    twin_cache.put(twin_cache.key(student_id, student_payload), digital_twin)
+    return pdf_jobs.enqueue(student_id, digital_twin)
+
+def _create_new_twins(payloads: List[Dict], twins: List[Dict]) -> Tuple[List[str], List[Optional[int]], Optional[str]]:
+    """
+    Allocate ids for new students and save them (one transaction), then
+    cache their twins and queue their PDFs.
+
+    Once the students are saved they are created: a failure to cache the
+    twins (recomputed on the next GET) or to queue the PDFs is not an error
+    of the students, so their ids are still returned and reported.
+
+    Returns:
+        (student ids, PDF job ids or None, PDF queueing error or None)
+    """
+    student_ids = create_students(payloads)
+    try:
+        twin_cache.put_many([(twin_cache.key(student_id, payload), twin)
+                             for student_id, payload, twin in zip(student_ids, payloads, twins)])
+    except Exception:
+        traceback.print_exc()
+    try:
+        return student_ids, pdf_jobs.enqueue_many(list(zip(student_ids, twins))), None
+    except Exception as e:
+        traceback.print_exc()
+        return student_ids, [None] * len(student_ids), f"PDF report not queued: {str(e)}"
+
+def _twin_response(student_id: str, digital_twin: Dict, job_id: Optional[int],
+                   pdf_error: Optional[str] = None) -> Dict[str, Any]:
+    """Create response: the twin plus its PDF, job status and dashboard links"""
+    pdf_path = os.path.join(PDF_OUTPUT_DIR, f"{student_id}_report.pdf")
+    if pdf_error is not None:
+        pdf_job = {"job_id": None, "status": "not_queued", "error": pdf_error}
+    else:
+        pdf_job = {"job_id": job_id, "status": "queued", "status_url": f"/pdf_status/{student_id}"}
+    return {
+        "student_id": student_id,
+        "digital_twin": digital_twin,
+        "pdf_path": pdf_path,
+        "pdf_url": f"/pdf_reports/{os.path.basename(pdf_path)}",
+        "pdf_job": pdf_job,
+        "dashboard_url": f"{os.environ.get('DASHBOARD_BASE','http://localhost:8501')}/pages/Dashboard?student={student_id}"
+    }
+
+def _load_student(student_id: str):
+    """Stored input of a student and its twin cache key, or (None, None)"""
+    data = get_student_json(student_id)
+    if not data:
+        return None, None
+    return data, twin_cache.key(student_id, data)
+
 @app.post("/create_digital_twin", summary="Create a new student digital twin")
-def create_digital_twin(form: StudentForm):
+async def create_digital_twin(form: StudentForm):
     try:
         # 1) Generate Student ID
-        student_id = next_student_id()
+        student_id = await stages.io.run(next_student_id)
         
         # 2) Run AI Pipeline
         student_payload = form.dict()
         # Add ID to payload
         student_payload["student_id"] = student_id
         
-        digital_twin = run_student_pipeline(student_payload)
+        digital_twin = await stages.pipeline.run(run_student_pipeline, student_payload)
         
-        # 3) save student raw input and append csv
-        save_student_json(student_id, student_payload)
-        append_student_csv(student_id, student_payload)
-
-        # 4) generate PDF (synchronous for demo)
-        pdf_path = generate_student_pdf(student_id, digital_twin)
-        # convert to URL path for dashboard assuming static serving from /pdf_reports
-        pdf_url = os.path.join("/pdf_reports", os.path.basename(pdf_path)).replace("\\", "/")
+        # 3) save student raw input and twin, queue the PDF report; the
+        # report is served from /pdf_reports once ready
+        job_id = await stages.io.run(_store_new_twin, student_id, student_payload, digital_twin)
 
-        # 5) add links and metadata to result
-        result = {
-            "student_id": student_id,
-            "digital_twin": digital_twin,
-            "pdf_path": pdf_path,
-            "pdf_url": pdf_url,
-            "dashboard_url": f"{os.environ.get('DASHBOARD_BASE','http://localhost:8501')}/pages/Dashboard?student={student_id}"
-        }
-        return result
+        # 4) add links and metadata to result
+        return _twin_response(student_id, digital_twin, job_id)
 
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Pipeline failed: {str(e)}")
 
+@app.post("/create_digital_twins:batch", summary="Create digital twins for a cohort of students")
+async def create_digital_twins_batch(request: Request):
+    """
+    Bulk version of /create_digital_twin.
+
+    The body is a JSON list of StudentForms, or an uploaded JSONL / CSV file
+    (see api/utils/batch_input.py). The pipeline runs vectorized per chunk
+    of BATCH_CHUNK_SIZE students; each chunk's ids are then allocated in the
+    transaction that saves its students, so a failed chunk uses no ids, and
+    its PDF reports are queued for the background workers. Results stream back as NDJSON, one line per input record in
+    input order: the /create_digital_twin response plus its "index", or
+    {"index", "error"} for a record that failed. A last line carries the
+    totals.
+    """
+    try:
+        records = parse_students(await request.body(), request.headers.get("content-type"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(records) > BATCH_MAX_STUDENTS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_STUDENTS} students per batch")
+
+    payloads: List[Optional[Dict]] = []
+    errors: Dict[int, Any] = {}
+    for index, record in enumerate(records):
+        try:
+            payloads.append(StudentForm.model_validate(record).dict())
+        except ValidationError as e:
+            payloads.append(None)
+            errors[index] = e.errors(include_url=False, include_input=False)
+
+    async def results():
+        started = time.perf_counter()
+        created = 0
+        for start in range(0, len(payloads), BATCH_CHUNK_SIZE):
+            chunk = [(index, payloads[index]) for index in range(start, min(start + BATCH_CHUNK_SIZE, len(payloads)))]
+            students = [payload for _, payload in chunk if payload is not None]
+            try:
+                twins = await stages.pipeline.run(run_student_pipeline_batch, students) if students else []
+                student_ids, job_ids, pdf_error = await stages.io.run(_create_new_twins, students, twins)
+                responses = iter([_twin_response(student_id, twin, job_id, pdf_error)
+                                  for student_id, twin, job_id in zip(student_ids, twins, job_ids)])
+            except Exception as e:
+                traceback.print_exc()
+                responses = iter([{"error": f"Pipeline failed: {str(e)}"}] * len(students))
+
+            for index, payload in chunk:
+                if payload is None:
+                    line = {"index": index, "error": errors[index]}
+                else:
+                    line = {"index": index, **next(responses)}
+                    created += "error" not in line
+                yield json.dumps(line, ensure_ascii=False, default=str) + "\n"
+
+        yield json.dumps({
+            "done": True,
+            "received": len(payloads),
+            "created": created,
+            "failed": len(payloads) - created,
+            "seconds": round(time.perf_counter() - started, 3),
+        }) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 @app.get("/get_digital_twin/{student_id}", summary="Get student digital twin")
-def get_digital_twin(student_id: str) -> Dict[str, Any]:
+async def get_digital_twin(student_id: str, response: Response,
+                           if_none_match: Optional[str] = Header(None)) -> Dict[str, Any]:
     """
     Retrieve an existing digital twin by Student ID.
+
+    The twin is served from the result cache and only recomputed when the
+    stored input or the model artifacts changed. Responses carry an ETag;
+    a request whose If-None-Match matches it gets 304 Not Modified.
     """
-    data = get_student_json(student_id)
+    data, key = await stages.io.run(_load_student, student_id)
     if not data:
         raise HTTPException(status_code=404, detail="Student not found")
-    
+
+    headers = {"ETag": etag_for(key), "Cache-Control": "no-cache"}
+    if twin_cache.not_modified(key, if_none_match):
+        return Response(status_code=304, headers=headers)
+
     try:
-        # Re-run pipeline to get digital twin data
-        digital_twin = run_student_pipeline(data)
-        
+        digital_twin = await stages.io.run(twin_cache.get, key)
+        if digital_twin is None:
+            digital_twin = await stages.pipeline.run(run_student_pipeline, data)
+            await stages.io.run(twin_cache.put, key, digital_twin)
+        response.headers.update(headers)
+
         return {
             "student_id": student_id,
             "digital_twin": digital_twin,
@@ -91,6 +258,105 @@ def get_digital_twin(student_id: str) -> Dict[str, Any]:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error regenerating twin: {str(e)}")
 
+@app.get("/digital_twins/export", summary="Stream stored digital twins as NDJSON or CSV")
+async def export_digital_twins(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    department: Optional[str] = None,
+    track: Optional[str] = Query(None, description="Only twins whose best_track is this track"),
+    created_from: Optional[str] = Query(None, description="ISO date / datetime, inclusive"),
+    created_to: Optional[str] = Query(None, description="ISO date / datetime, inclusive"),
+    cursor: Optional[str] = Query(None, description="Resume after the row carrying this cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Stop after this many twins"),
+):
+    """
+    Export every stored twin (or a filtered subset) in student_id order.
+
+    Students are read in keyset pages (api/utils/twin_export.py) and
+    streamed as they are read, so memory stays constant for any export
+    size. Twins come from the persistent twin cache; students whose twin is
+    missing or was computed by an older model are run through the batch
+    pipeline page by page and cached. Every row carries a cursor token; an
+    interrupted export resumes with ?cursor=<last received token>. The
+    NDJSON stream ends with a line holding the row count and next_cursor
+    (set when limit stopped the export before the last matching twin).
+    """
+    try:
+        after = twin_export.decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def twins(state: Dict[str, bool]):
+        # state["more"] is set once a matching row beyond limit is seen
+        last = after
+        remaining = limit
+        while True:
+            # With a limit, read one row past it to learn whether more remain
+            size = twin_export.PAGE_SIZE if remaining is None else min(twin_export.PAGE_SIZE, remaining + 1)
+            page = await stages.io.run(twin_export.fetch_page, last, size,
+                                       department, created_from, created_to, track)
+            if not page:
+                return
+            missing = [row for row in page if row["twin_json"] is None]
+            if missing:
+                computed = await stages.pipeline.run(run_student_pipeline_batch, [row["payload"] for row in missing])
+                await stages.io.run(twin_cache.put_many, [
+                    (twin_cache.key(row["student_id"], row["payload"]), twin) for row, twin in zip(missing, computed)
+                ])
+                for row, twin in zip(missing, computed):
+                    twin_export.set_twin(row, twin)
+            last = page[-1]["student_id"]
+            rows = [row for row in page if not track or row["best_track"] == track]
+            if remaining is not None:
+                if len(rows) > remaining:
+                    state["more"] = True
+                    rows = rows[:remaining]
+                remaining -= len(rows)
+            if rows:
+                yield rows
+            if state["more"] or len(page) < size:
+                return
+
+    async def ndjson():
+        state = {"more": False}
+        exported = 0
+        last = None
+        async for rows in twins(state):
+            exported += len(rows)
+            last = twin_export.encode_cursor(rows[-1]["student_id"])
+            yield "".join(twin_export.ndjson_line(row) for row in rows)
+        yield json.dumps({"done": True, "exported": exported,
+                          "next_cursor": last if state["more"] else None}) + "\n"
+
+    async def csv_rows():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=twin_export.CSV_COLUMNS)
+        writer.writeheader()
+        async for rows in twins({"more": False}):
+            writer.writerows(twin_export.csv_row(row) for row in rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    if fmt == "csv":
+        return StreamingResponse(csv_rows(), media_type="text/csv",
+                                 headers={"Content-Disposition": 'attachment; filename="digital_twins.csv"'})
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@app.get("/pdf_status/{student_id}", summary="PDF report generation status")
+async def pdf_status(student_id: str) -> Dict[str, Any]:
+    """
+    Status of the student's latest PDF job: queued (with queue position),
+    running, done (with the report URL) or failed (with the last error).
+    """
+    status = await stages.io.run(pdf_jobs.job_status, student_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="No PDF job for this student")
+    if status["status"] == "done":
+        status["pdf_url"] = f"/pdf_reports/{os.path.basename(status['pdf_path'])}"
+    return {"student_id": student_id, **status}
+
 # Mount static files for PDF serving
 PDF_DIR = os.environ.get("PDF_OUTPUT_DIR", "./pdf_reports")
 if not os.path.exists(PDF_DIR):
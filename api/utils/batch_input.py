@@ -0,0 +1,97 @@
+# api/utils/batch_input.py
+"""
+Request bodies of POST /create_digital_twins:batch.
+
+A cohort is sent as one body, selected by its Content-Type:
+- application/json: a list of StudentForm objects
+- application/x-ndjson (or application/jsonl): one StudentForm per line
+- text/csv: a header row of StudentForm field names, one student per row;
+  list fields are ';' separated (as in the datasets) and empty optional
+  fields are null
+
+Records are returned unvalidated; the endpoint validates each one, so a
+bad row fails only its own result line.
+"""
+import io
+import csv
+import json
+import typing
+from typing import Any, Dict, List
+
+from api.models.student_form_model import StudentForm
+
+JSON_TYPES = ("application/json",)
+JSONL_TYPES = ("application/x-ndjson", "application/jsonl", "application/x-jsonlines", "application/ndjson")
+CSV_TYPES = ("text/csv", "application/csv")
+
+
+def _is_list(annotation) -> bool:
+    return typing.get_origin(annotation) in (list, List)
+
+
+def _is_optional(annotation) -> bool:
+    return type(None) in typing.get_args(annotation)
+
+
+def csv_records(text: str) -> List[Dict[str, Any]]:
+    """StudentForm records of a CSV body"""
+    fields = StudentForm.model_fields
+    records = []
+    for row in csv.DictReader(io.StringIO(text)):
+        record = {}
+        for name, value in row.items():
+            if name is None:
+                continue
+            value = (value or "").strip()
+            annotation = fields[name].annotation if name in fields else None
+            if annotation is not None and _is_list(annotation):
+                record[name] = [item.strip() for item in value.split(";") if item.strip()]
+            elif annotation is not None and _is_optional(annotation) and not value:
+                record[name] = None
+            else:
+                record[name] = value
+        records.append(record)
+    return records
+
+
+def parse_students(body: bytes, content_type: str) -> List[Any]:
+    """
+    Student records of a batch request body
+
+    Args:
+        body: Raw request body
+        content_type: Request Content-Type header
+
+    Returns:
+        One record per student, in input order
+
+    Raises:
+        ValueError: Unsupported content type or malformed body
+    """
+    media_type = (content_type or "application/json").split(";")[0].strip().lower()
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("Body must be UTF-8")
+
+    if media_type in JSON_TYPES:
+        try:
+            records = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if not isinstance(records, list):
+            raise ValueError("JSON body must be a list of students")
+        return records
+    if media_type in JSONL_TYPES:
+        records = []
+        for line_number, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+        return records
+    if media_type in CSV_TYPES:
+        return csv_records(text)
+    raise ValueError(f"Unsupported content type {media_type!r}; send JSON, JSONL or CSV")
@@ -0,0 +1,276 @@
+# api/utils/micro_batcher.py
+"""
+Dynamic micro-batching for model inference.
+
+Concurrent requests each score one student, but the sentence encoder and
+the XGBoost booster are much faster per item on a batch. A MicroBatcher
+runs on the API event loop and coalesces the items submitted by
+concurrent requests: it waits up to max_wait_ms after the first item (or
+until max_batch items are queued), runs the batch function once in a
+thread and fans the results back out to the waiting requests.
+
+Request handlers that run in the threadpool (plain def endpoints and the
+pipeline code) use submit_sync(); async code awaits submit(). When no
+batcher is running (scripts, tests without the lifespan) callers use the
+direct, unbatched path.
+
+A batch that fails (including a batch function returning the wrong number
+of results) fails only its own requests, and the collector keeps running;
+stop() fails the items still queued or in flight, and submit_sync() gives
+up after BATCH_RESULT_TIMEOUT seconds, so a caller never blocks forever on
+a batch that will not complete.
+"""
+import os
+import time
+import asyncio
+import threading
+import concurrent.futures
+from typing import Any, Callable, Dict, List, Optional
+
+MAX_BATCH = int(os.environ.get("BATCH_MAX_SIZE", "32"))
+MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", "2"))
+BATCHING_ENABLED = os.environ.get("INFERENCE_BATCHING", "1") != "0"
+# Longest a submit_sync() caller waits for its result
+RESULT_TIMEOUT = float(os.environ.get("BATCH_RESULT_TIMEOUT", "60"))
+
+
+class MicroBatcher:
+    """
+    Coalesces single-item calls into batched calls of fn.
+
+    Args:
+        fn: Batch function; takes a list of items, returns one result per item
+        max_batch: Largest batch passed to fn
+        max_wait_ms: How long the first item of a batch waits for company
+        name: Name used in metrics
+    """
+
+    def __init__(self, fn: Callable[[List[Any]], List[Any]], max_batch: int = MAX_BATCH,
+                 max_wait_ms: float = MAX_WAIT_MS, name: str = "batcher"):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Items taken off the queue whose results are not delivered yet
+        self._inflight: List = []
+        self._stats = {"items": 0, "batches": 0, "max_batch_size": 0, "errors": 0,
+                       "wait_seconds": 0.0, "run_seconds": 0.0}
+        # batch size -> count, bucketed by powers of two
+        self._histogram: Dict[int, int] = {}
+
+    async def start(self) -> None:
+        """Start collecting batches on the running event loop"""
+        if self._task is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = self.loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the collector; queued and in-flight items are failed"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        pending = self._inflight
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._fail(pending, RuntimeError(f"{self.name} batcher stopped"))
+        self._inflight = []
+        self._task = None
+        self.loop = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result (call on the batcher's loop)"""
+        future = self.loop.create_future()
+        self._queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    def submit_sync(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Queue one item from another thread and block until its result
+
+        Raises:
+            TimeoutError: No result within timeout seconds (default
+                RESULT_TIMEOUT). An item still queued is skipped by the
+                collector; one already in a running batch is computed and
+                its result discarded
+        """
+        loop = self.loop
+        if loop is None:
+            raise RuntimeError(f"{self.name} batcher is not running")
+        future = asyncio.run_coroutine_threadsafe(self.submit(item), loop)
+        try:
+            return future.result(RESULT_TIMEOUT if timeout is None else timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"{self.name} batcher gave no result within the timeout")
+
+    async def _run(self) -> None:
+        while True:
+            batch = self._inflight = []
+            while not batch:
+                self._take(batch, await self._queue.get())
+            deadline = self.loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._take(batch, await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Items that arrived while waiting are taken without further delay
+            while len(batch) < self.max_batch and not self._queue.empty():
+                self._take(batch, self._queue.get_nowait())
+            try:
+                await self._execute(batch)
+            except Exception as e:
+                # Fail this batch's requests and keep collecting
+                self._stats["errors"] += 1
+                self._fail(batch, e)
+            self._inflight = []
+
+    @staticmethod
+    def _take(batch: List, entry: tuple) -> None:
+        # Items whose caller gave up (timed out or cancelled) are not run
+        if not entry[1].done():
+            batch.append(entry)
+
+    async def _execute(self, batch: List) -> None:
+        items = [item for item, _, _ in batch]
+        started = time.perf_counter()
+        try:
+            results = await self.loop.run_in_executor(None, self._call, items)
+            error = None
+        except Exception as e:
+            results, error = None, e
+        if error is not None and len(items) > 1:
+            # Retry one by one so a single bad item only fails its own request
+            results = await self.loop.run_in_executor(None, self._run_each, items)
+        finished = time.perf_counter()
+
+        size = len(batch)
+        bucket = 1 << (size - 1).bit_length()
+        self._stats["items"] += size
+        self._stats["batches"] += 1
+        self._stats["max_batch_size"] = max(self._stats["max_batch_size"], size)
+        self._stats["wait_seconds"] += sum(started - queued for _, _, queued in batch)
+        self._stats["run_seconds"] += finished - started
+        self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+        if error is not None:
+            self._stats["errors"] += 1
+
+        for i, (_, future, _) in enumerate(batch):
+            if future.done():
+                continue
+            result = results[i] if results is not None else error
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _call(self, items: List) -> List:
+        results = list(self.fn(items))
+        if len(results) != len(items):
+            raise ValueError(f"{self.name} batch function returned {len(results)} results for {len(items)} items")
+        return results
+
+    def _run_each(self, items: List) -> List:
+        results = []
+        for item in items:
+            try:
+                results.append(self._call([item])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    @staticmethod
+    def _fail(batch: List, error: Exception) -> None:
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, batch size distribution and timing"""
+        stats = dict(self._stats)
+        batches = stats["batches"] or 1
+        items = stats["items"] or 1
+        return {
+            "running": self.running,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "items": stats["items"],
+            "batches": stats["batches"],
+            "errors": stats["errors"],
+            "mean_batch_size": round(stats["items"] / batches, 2),
+            "max_batch_size": stats["max_batch_size"],
+            "batch_size_histogram": {f"<={k}": v for k, v in sorted(self._histogram.items())},
+            "mean_queue_wait_ms": round(stats["wait_seconds"] / items * 1000, 3),
+            "mean_batch_run_ms": round(stats["run_seconds"] / batches * 1000, 3),
+        }
+
+
+_batchers: Dict[str, MicroBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def register_batcher(name: str, fn: Callable[[List[Any]], List[Any]], **options) -> MicroBatcher:
+    """Create (not start) the named batcher"""
+    with _batchers_lock:
+        if name not in _batchers:
+            _batchers[name] = MicroBatcher(fn, name=name, **options)
+        return _batchers[name]
+
+
+def get_batcher(name: str) -> Optional[MicroBatcher]:
+    """The named batcher if it is running, else None"""
+    batcher = _batchers.get(name)
+    return batcher if batcher is not None and batcher.running else None
+
+
+def call_batched(name: str, item: Any, direct: Callable[[Any], Any]) -> Any:
+    """
+    Run item through the named batcher, or direct(item) when batching is
+    unavailable (not started, or called on the event loop thread itself)
+    """
+    batcher = get_batcher(name)
+    if batcher is None or _on_loop(batcher.loop):
+        return direct(item)
+    return batcher.submit_sync(item)
+
+
+def _on_loop(loop: Optional[asyncio.AbstractEventLoop]) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+async def start_all() -> None:
+    """Start every registered batcher (API lifespan)"""
+    if BATCHING_ENABLED:
+        for batcher in list(_batchers.values()):
+            await batcher.start()
+
+
+async def stop_all() -> None:
+    """Stop every registered batcher"""
+    for batcher in list(_batchers.values()):
+        await batcher.stop()
+
+
+def metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every registered batcher"""
+    return {name: batcher.metrics() for name, batcher in _batchers.items()}
@@ -0,0 +1,304 @@
+# api/utils/pdf_jobs.py
+"""
+Background PDF generation jobs.
+
+POST /create_digital_twin queues a job instead of rendering the report
+inline. Jobs live in the pdf_jobs table of the student database, so they
+survive restarts and are visible to every API worker:
+- queued -> running -> done, or back to queued on failure until
+  PDF_JOB_MAX_ATTEMPTS is reached (then failed)
+- a claimed job holds a lease of PDF_JOB_TIMEOUT seconds; jobs whose
+  worker process or API process died are requeued when it expires
+
+PdfJobRunner (started by the API lifespan) claims jobs and renders them in
+a process pool, so matplotlib and the data generate_pdf_report loads at
+import time stay out of the request path and are loaded once per worker.
+"""
+import os
+import json
+import time
+import socket
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from api.utils.storage import get_pool, transaction
+
+logger = logging.getLogger(__name__)
+
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", "1"))
+JOB_TIMEOUT = float(os.environ.get("PDF_JOB_TIMEOUT", "300"))
+MAX_ATTEMPTS = int(os.environ.get("PDF_JOB_MAX_ATTEMPTS", "3"))
+POLL_INTERVAL = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdf_jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    digital_twin TEXT NOT NULL,
+    pdf_path TEXT,
+    error TEXT,
+    worker TEXT,
+    lease_until REAL,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pdf_jobs_student ON pdf_jobs(student_id, job_id);
+CREATE INDEX IF NOT EXISTS idx_pdf_jobs_status ON pdf_jobs(status, job_id);
+"""
+
+_schema_pid = None
+_wake = threading.Event()
+
+
+def _ensure_schema(conn) -> None:
+    global _schema_pid
+    if _schema_pid != os.getpid():
+        conn.executescript(SCHEMA)
+        _schema_pid = os.getpid()
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def enqueue(student_id: str, digital_twin: Dict) -> int:
+    """Queue a PDF report for a student; returns the job id"""
+    return enqueue_many([(student_id, digital_twin)])[0]
+
+
+def enqueue_many(reports: List[Tuple[str, Dict]]) -> List[int]:
+    """Queue PDF reports for several (student_id, digital_twin) pairs in one transaction"""
+    now = _now()
+    with get_pool().connection() as conn:
+        _ensure_schema(conn)
+        with transaction(conn):
+            job_ids = [
+                conn.execute(
+                    "INSERT INTO pdf_jobs (student_id, status, digital_twin, created_at) VALUES (?, 'queued', ?, ?)",
+                    (student_id, json.dumps(digital_twin, ensure_ascii=False), now)
+                ).lastrowid
+                for student_id, digital_twin in reports
+            ]
+    _wake.set()
+    return job_ids
+
+
+def requeue_expired(conn) -> int:
+    """Requeue running jobs whose lease expired (inside the caller's transaction)"""
+    expired = conn.execute(
+        "SELECT job_id, attempts FROM pdf_jobs WHERE status = 'running' AND lease_until < ?",
+        (time.time(),)
+    ).fetchall()
+    for row in expired:
+        _retry_or_fail(conn, row["job_id"], row["attempts"], "Job lease expired (worker died or timed out)")
+    return len(expired)
+
+
+def _retry_or_fail(conn, job_id: int, attempts: int, error: str) -> None:
+    if attempts < MAX_ATTEMPTS:
+        conn.execute("UPDATE pdf_jobs SET status = 'queued', error = ?, worker = NULL, lease_until = NULL "
+                     "WHERE job_id = ?", (error, job_id))
+    else:
+        conn.execute("UPDATE pdf_jobs SET status = 'failed', error = ?, lease_until = NULL, finished_at = ? "
+                     "WHERE job_id = ?", (error, _now(), job_id))
+
+
+def claim(worker: str) -> Optional[Dict[str, Any]]:
+    """Take the oldest queued job and lease it to worker"""
+    with get_pool().connection() as conn:
+        _ensure_schema(conn)
+        with transaction(conn):
+            requeue_expired(conn)
+            row = conn.execute(
+                "SELECT job_id, student_id, digital_twin, attempts FROM pdf_jobs "
+                "WHERE status = 'queued' ORDER BY job_id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE pdf_jobs SET status = 'running', attempts = attempts + 1, worker = ?, "
+                "lease_until = ?, started_at = ? WHERE job_id = ?",
+                (worker, time.time() + JOB_TIMEOUT, _now(), row["job_id"])
+            )
+    return {"job_id": row["job_id"], "student_id": row["student_id"],
+            "digital_twin": json.loads(row["digital_twin"]), "attempts": row["attempts"] + 1}
+
+
+def complete(job_id: int, pdf_path: str, worker: str) -> bool:
+    """
+    Mark a job done
+
+    Only the worker still holding the job's lease can complete it: once the
+    lease expired the job may have been requeued or claimed by another
+    worker, and a late result must not overwrite that attempt.
+
+    Returns:
+        True if the job was marked done
+    """
+    with get_pool().connection() as conn, transaction(conn):
+        cursor = conn.execute(
+            "UPDATE pdf_jobs SET status = 'done', pdf_path = ?, error = NULL, lease_until = NULL, "
+            "finished_at = ? WHERE job_id = ? AND worker = ? AND status = 'running'",
+            (pdf_path, _now(), job_id, worker)
+        )
+    return cursor.rowcount > 0
+
+
+def fail(job_id: int, error: str, worker: str) -> bool:
+    """
+    Record a failed attempt of the worker holding the job's lease; the job
+    is retried until MAX_ATTEMPTS
+
+    Returns:
+        True if the attempt was recorded (False if the lease was lost)
+    """
+    with get_pool().connection() as conn, transaction(conn):
+        row = conn.execute("SELECT attempts FROM pdf_jobs WHERE job_id = ? AND worker = ? AND status = 'running'",
+                           (job_id, worker)).fetchone()
+        if row is None:
+            return False
+        _retry_or_fail(conn, job_id, row["attempts"], error)
+    return True
+
+
+def release(worker: str) -> int:
+    """Requeue the running jobs of a worker that is shutting down"""
+    with get_pool().connection() as conn:
+        _ensure_schema(conn)
+        with transaction(conn):
+            cursor = conn.execute(
+                "UPDATE pdf_jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), worker = NULL, "
+                "lease_until = NULL WHERE status = 'running' AND worker = ?", (worker,)
+            )
+    return cursor.rowcount
+
+
+def job_status(student_id: str) -> Optional[Dict[str, Any]]:
+    """Latest PDF job of a student, with its position in the queue"""
+    with get_pool().connection() as conn:
+        _ensure_schema(conn)
+        row = conn.execute(
+            "SELECT job_id, status, attempts, pdf_path, error, created_at, started_at, finished_at "
+            "FROM pdf_jobs WHERE student_id = ? ORDER BY job_id DESC LIMIT 1", (student_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        status = dict(row)
+        if row["status"] == "queued":
+            status["queue_position"] = conn.execute(
+                "SELECT COUNT(*) FROM pdf_jobs WHERE status = 'queued' AND job_id < ?", (row["job_id"],)
+            ).fetchone()[0] + 1
+    return status
+
+
+def _render(student_id: str, digital_twin: Dict) -> str:
+    """Render one report (runs in a pool process)"""
+    from api.utils.pdf_wrapper import generate_student_pdf
+    return generate_student_pdf(student_id, digital_twin)
+
+
+class PdfJobRunner:
+    """
+    Claims queued jobs and renders them in a process pool.
+
+    Args:
+        workers: Pool processes (jobs rendered at once)
+    """
+
+    def __init__(self, workers: int = PDF_WORKERS):
+        self.workers = workers
+        self.worker_id = None
+        self._slots = threading.Semaphore(workers)
+        self._stop = threading.Event()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the dispatcher thread"""
+        if self._thread is not None or self.workers <= 0:
+            return
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._dispatch, name="pdf-jobs", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop dispatching and hand running jobs back to the queue"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        _wake.set()
+        self._thread.join()
+        self._thread = None
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+        release(self.worker_id)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def _reset_pool(self, broken: ProcessPoolExecutor) -> None:
+        with self._executor_lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _dispatch(self) -> None:
+        while not self._stop.is_set():
+            if not self._slots.acquire(timeout=POLL_INTERVAL):
+                continue
+            try:
+                job = claim(self.worker_id)
+            except Exception:
+                logger.exception("Could not claim a PDF job")
+                job = None
+            if job is None:
+                self._slots.release()
+                _wake.wait(POLL_INTERVAL)
+                _wake.clear()
+                continue
+            self._submit(job)
+
+    def _submit(self, job: Dict[str, Any]) -> None:
+        executor = self._pool()
+        try:
+            future = executor.submit(_render, job["student_id"], job["digital_twin"])
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._finish(job, executor, error=e)
+            return
+        future.add_done_callback(lambda f: self._finish(job, executor, future=f))
+
+    def _finish(self, job, executor, future=None, error=None) -> None:
+        try:
+            if future is not None and not future.cancelled():
+                error = future.exception()
+                if error is None:
+                    if not complete(job["job_id"], future.result(), self.worker_id):
+                        logger.warning("PDF job %s for %s finished after its lease was lost; result discarded",
+                                       job["job_id"], job["student_id"])
+                    return
+            if isinstance(error, BrokenProcessPool):
+                # The pool process died mid-job: start a fresh pool, retry the job
+                self._reset_pool(executor)
+            if error is not None and not self._stop.is_set():
+                logger.warning("PDF job %s for %s failed: %s", job["job_id"], job["student_id"], error)
+                fail(job["job_id"], f"{type(error).__name__}: {error}", self.worker_id)
+        finally:
+            self._slots.release()
+
+
+runner = PdfJobRunner()
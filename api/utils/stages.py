@@ -0,0 +1,125 @@
+# api/utils/stages.py
+"""
+Executors and concurrency limits for the blocking stages of a request.
+
+The API handlers are async; everything that blocks runs in a stage, and
+each stage has its own executor and its own limit. A burst of slow
+pipeline runs then queues on the pipeline limit instead of taking every
+worker thread, and cheap lookups keep flowing through the I/O stage:
+- io: SQLite reads / writes (storage, twin cache, PDF job queue) on a
+  dedicated thread pool (IO_WORKERS)
+- pipeline: run_student_pipeline (PIPELINE_WORKERS at once). Threads by
+  default, since the heavy parts (sentence encoder, XGBoost) release the
+  GIL and share the process's models and micro-batchers;
+  PIPELINE_EXECUTOR=process runs it in a bounded process pool instead
+  (each process loads its own models and predicts unbatched)
+
+PDF rendering is not a request stage: it runs in the background job queue
+(api/utils/pdf_jobs.py).
+"""
+import os
+import time
+import asyncio
+import functools
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+IO_WORKERS = int(os.environ.get("IO_WORKERS", "16"))
+PIPELINE_WORKERS = int(os.environ.get("PIPELINE_WORKERS", str(min(8, os.cpu_count() or 1))))
+PIPELINE_EXECUTOR = os.environ.get("PIPELINE_EXECUTOR", "thread")
+
+
+class Stage:
+    """
+    A named executor with a concurrency limit.
+
+    Args:
+        name: Stage name (thread names and metrics)
+        workers: Executor size and number of calls running at once
+        kind: 'thread' or 'process'
+    """
+
+    def __init__(self, name: str, workers: int, kind: str = "thread"):
+        self.name = name
+        self.workers = workers
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        # (loop, semaphore): a semaphore belongs to one event loop
+        self._semaphore: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self._stats = {"active": 0, "waiting": 0, "completed": 0, "errors": 0,
+                       "wait_seconds": 0.0, "run_seconds": 0.0}
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+                else:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix=self.name)
+            return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) in the stage once a slot is free"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(self.workers))
+        queued = time.perf_counter()
+        self._stats["waiting"] += 1
+        async with self._semaphore[1]:
+            self._stats["waiting"] -= 1
+            self._stats["active"] += 1
+            started = time.perf_counter()
+            try:
+                return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+            finally:
+                self._stats["active"] -= 1
+                self._stats["completed"] += 1
+                self._stats["wait_seconds"] += started - queued
+                self._stats["run_seconds"] += time.perf_counter() - started
+
+    def shutdown(self) -> None:
+        """Stop the executor (it is recreated on the next call)"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+        self._semaphore = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Active / waiting calls and mean wait / run time"""
+        stats = dict(self._stats)
+        completed = stats["completed"] or 1
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "active": stats["active"],
+            "waiting": stats["waiting"],
+            "completed": stats["completed"],
+            "errors": stats["errors"],
+            "mean_wait_ms": round(stats["wait_seconds"] / completed * 1000, 3),
+            "mean_run_ms": round(stats["run_seconds"] / completed * 1000, 3),
+        }
+
+
+io = Stage("io", IO_WORKERS)
+pipeline = Stage("pipeline", PIPELINE_WORKERS, PIPELINE_EXECUTOR)
+
+STAGES = {stage.name: stage for stage in (io, pipeline)}
+
+
+def shutdown() -> None:
+    """Stop every stage executor (API lifespan)"""
+    for stage in STAGES.values():
+        stage.shutdown()
+
+
+def metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every stage"""
+    return {name: stage.metrics() for name, stage in STAGES.items()}
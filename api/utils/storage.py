@@ -1,57 +1,327 @@
 # api/utils/storage.py
+"""
+Student storage backed by an embedded SQLite database.
+
+All API workers share one database file (DATA_DIR/digital_twin.db, or
+STORAGE_DB) opened in WAL mode, so readers never block the single writer
+and writes from several uvicorn workers are serialized by SQLite:
+- student_ids: AUTOINCREMENT sequence; inserting a row hands out the next
+  id atomically across processes (S1501, S1502, ...)
+- students: one indexed row per student with the summary columns of the
+  former student_inputs.csv and the raw input payload as JSON
+
+The first connection migrates the legacy flat files (student_inputs.csv
+and student_inputs/*.json) if the database is empty.
+"""
 import os
-import json
 import csv
+import glob
+import json
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Iterator, List, Optional, Tuple
 
 DATA_DIR = os.environ.get("DATA_DIR", "./data")
 PDF_DIR = os.environ.get("PDF_OUTPUT_DIR", "./pdf_reports")
 STUDENT_JSON_DIR = os.path.join(DATA_DIR, "student_inputs")
-os.makedirs(STUDENT_JSON_DIR, exist_ok=True)
+os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(PDF_DIR, exist_ok=True)
 CSV_FILE = os.path.join(DATA_DIR, "student_inputs.csv")
+DB_PATH = os.environ.get("STORAGE_DB", os.path.join(DATA_DIR, "digital_twin.db"))
+POOL_SIZE = int(os.environ.get("STORAGE_POOL_SIZE", "4"))
+
+# Generated ids continue the dataset's S0001..S1500 numbering
+ID_OFFSET = 1500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS student_ids (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS students (
+    student_id TEXT PRIMARY KEY,
+    name TEXT,
+    email TEXT,
+    department TEXT,
+    level TEXT,
+    gpa TEXT,
+    payload TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_students_email ON students(email);
+CREATE INDEX IF NOT EXISTS idx_students_department ON students(department);
+CREATE INDEX IF NOT EXISTS idx_students_department_id ON students(department, student_id);
+CREATE INDEX IF NOT EXISTS idx_students_created_at ON students(created_at);
+"""
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """Open a connection configured for concurrent access"""
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of SQLite connections shared by the threads of one process.
+
+    Connections are opened lazily; the schema is created (and legacy files
+    migrated) by the first one.
+    """
+
+    def __init__(self, path: str = DB_PATH, size: int = POOL_SIZE):
+        self.path = path
+        self.size = size
+        self.pid = os.getpid()
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                conn = _connect(self.path)
+                if not self._ready:
+                    init_schema(conn)
+                    self._ready = True
+                return conn
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the duration of the block"""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        """Close the idle connections"""
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._opened = 0
+            self._ready = False
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+    """BEGIN (IMMEDIATE takes the write lock up front) ... COMMIT / ROLLBACK"""
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Process-wide connection pool (reopened after a fork)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = ConnectionPool()
+        return _pool
+
+
+def init_schema(conn: sqlite3.Connection) -> None:
+    """Create the tables and import the legacy flat files into an empty database"""
+    conn.executescript(SCHEMA)
+    with transaction(conn):
+        empty = conn.execute("SELECT 1 FROM students LIMIT 1").fetchone() is None
+        if empty and (os.path.exists(CSV_FILE) or os.path.isdir(STUDENT_JSON_DIR)):
+            migrate_flat_files(conn)
+
+
+def _id_seq(student_id: str) -> Optional[int]:
+    """Sequence number of a generated id (S1501 -> 1), None for other ids"""
+    try:
+        seq = int(str(student_id).lstrip("S")) - ID_OFFSET
+    except ValueError:
+        return None
+    return seq if seq > 0 else None
+
+
+def _summary(payload: Dict) -> Dict:
+    """Summary columns of a student payload (the former CSV columns)"""
+    return {
+        "name": payload.get("name") or payload.get("full_name", ""),
+        "email": payload.get("email", ""),
+        "department": payload.get("department", ""),
+        "level": str(payload.get("academic_level", "")),
+        "gpa": str(payload.get("gpa", "")),
+    }
+
+
+def _upsert(conn: sqlite3.Connection, student_id: str, summary: Dict,
+            payload: Optional[Dict], created_at: str) -> None:
+    """Insert or update a student row (payload None keeps the stored one)"""
+    conn.execute(
+        """
+        INSERT INTO students (student_id, name, email, department, level, gpa, payload,
+                              created_at, updated_at)
+        VALUES (:student_id, :name, :email, :department, :level, :gpa, :payload,
+                :created_at, :created_at)
+        ON CONFLICT(student_id) DO UPDATE SET
+            name = excluded.name, email = excluded.email, department = excluded.department,
+            level = excluded.level, gpa = excluded.gpa,
+            payload = COALESCE(excluded.payload, students.payload),
+            updated_at = excluded.updated_at
+        """,
+        dict(summary, student_id=student_id, created_at=created_at,
+             payload=None if payload is None else json.dumps(payload, ensure_ascii=False))
+    )
+
+
+def migrate_flat_files(conn: sqlite3.Connection, data_dir: str = DATA_DIR) -> Dict[str, int]:
+    """
+    Import student_inputs.csv and student_inputs/*.json.
+
+    Existing rows are updated, so the migration can be re-run. Generated
+    ids (S1501...) are registered in the id sequence, so new ids continue
+    after them. Runs inside the caller's transaction.
+
+    Returns:
+        Counts of imported CSV rows and JSON payloads
+    """
+    counts = {"csv_rows": 0, "json_files": 0}
+    now = datetime.utcnow().isoformat()
+    csv_path = os.path.join(data_dir, "student_inputs.csv")
+    seqs = set()
+
+    if os.path.exists(csv_path):
+        with open(csv_path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                student_id = row.get("student_id")
+                if not student_id:
+                    continue
+                summary = {key: row.get(key, "") for key in ("name", "email", "department", "level", "gpa")}
+                _upsert(conn, student_id, summary, None, row.get("created_at") or now)
+                seqs.add(_id_seq(student_id))
+                counts["csv_rows"] += 1
+
+    for path in sorted(glob.glob(os.path.join(data_dir, "student_inputs", "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        student_id = payload.get("student_id") or os.path.splitext(os.path.basename(path))[0]
+        created_at = datetime.utcfromtimestamp(os.path.getmtime(path)).isoformat()
+        _upsert(conn, student_id, _summary(payload), payload, created_at)
+        seqs.add(_id_seq(student_id))
+        counts["json_files"] += 1
+
+    conn.executemany(
+        "INSERT OR IGNORE INTO student_ids (seq, created_at) VALUES (?, ?)",
+        [(seq, now) for seq in sorted(s for s in seqs if s is not None)]
+    )
+    return counts
+
 
 def next_student_id() -> str:
-    """Create a new sequential student id S1501 etc based on existing csv or json."""
-    # Simple logic: if csv exists, use count+1, else start S1501
-    if os.path.exists(CSV_FILE):
-        with open(CSV_FILE, "r", newline="", encoding="utf-8") as f:
-            rows = list(csv.reader(f))
-            count = max(0, len(rows)-1)  # minus header
-            return f"S{count+1501:04d}"
-    # fallback
-    return "S1501"
+    """Allocate the next sequential student id (S1501 etc), unique across processes."""
+    with get_pool().connection() as conn:
+        cursor = conn.execute("INSERT INTO student_ids (created_at) VALUES (?)",
+                              (datetime.utcnow().isoformat(),))
+        return f"S{cursor.lastrowid + ID_OFFSET:04d}"
+
+
+def _allocate_ids(conn: sqlite3.Connection, count: int) -> List[str]:
+    """Insert count ids into the sequence (inside the caller's transaction)"""
+    conn.execute(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+        "INSERT INTO student_ids (created_at) SELECT ? FROM n",
+        (count, datetime.utcnow().isoformat())
+    )
+    last = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return [f"S{seq + ID_OFFSET:04d}" for seq in range(last - count + 1, last + 1)]
+
+
+def next_student_ids(count: int) -> List[str]:
+    """
+    Allocate count consecutive student ids in one transaction; the write
+    lock keeps other workers from interleaving their ids.
+    """
+    if count <= 0:
+        return []
+    with get_pool().connection() as conn, transaction(conn):
+        return _allocate_ids(conn, count)
+
+
+def create_students(payloads: List[Dict]) -> List[str]:
+    """
+    Allocate consecutive ids for new students and store them in the same
+    transaction, so a failed save hands out no ids. Each payload gets its
+    student_id.
+
+    Returns:
+        The ids, in payload order
+    """
+    if not payloads:
+        return []
+    now = datetime.utcnow().isoformat()
+    with get_pool().connection() as conn, transaction(conn):
+        student_ids = _allocate_ids(conn, len(payloads))
+        for student_id, payload in zip(student_ids, payloads):
+            payload["student_id"] = student_id
+            _upsert(conn, student_id, _summary(payload), payload, now)
+    return student_ids
+
+
+def save_student(student_id: str, payload: Dict) -> str:
+    """Store a student's summary columns and raw input in one transaction."""
+    with get_pool().connection() as conn, transaction(conn):
+        _upsert(conn, student_id, _summary(payload), payload, datetime.utcnow().isoformat())
+    return DB_PATH
+
+
+def save_students(students: List[Tuple[str, Dict]]) -> str:
+    """Store several (student_id, payload) pairs in one transaction."""
+    now = datetime.utcnow().isoformat()
+    with get_pool().connection() as conn, transaction(conn):
+        for student_id, payload in students:
+            _upsert(conn, student_id, _summary(payload), payload, now)
+    return DB_PATH
+
 
 def save_student_json(student_id: str, payload: Dict):
-    path = os.path.join(STUDENT_JSON_DIR, f"{student_id}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-    return path
+    """Store a student's raw input payload."""
+    return save_student(student_id, payload)
+
 
 def append_student_csv(student_id: str, payload: Dict):
-    header = ["student_id","name","email","department","level","gpa","created_at"]
-    row = [
-        student_id,
-        payload.get("name",""),
-        payload.get("email",""),
-        payload.get("department",""),
-        str(payload.get("academic_level","")),
-        str(payload.get("gpa","")),
-        datetime.utcnow().isoformat()
-    ]
-    exists = os.path.exists(CSV_FILE)
-    with open(CSV_FILE, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        if not exists:
-            writer.writerow(header)
-        writer.writerow(row)
-    return CSV_FILE
+    """Store a student's summary columns (the former CSV row)."""
+    with get_pool().connection() as conn, transaction(conn):
+        _upsert(conn, student_id, _summary(payload), None, datetime.utcnow().isoformat())
+    return DB_PATH
+
 
 def get_student_json(student_id: str) -> Dict:
-    """Retrieve student data from JSON file."""
-    path = os.path.join(STUDENT_JSON_DIR, f"{student_id}.json")
-    if not os.path.exists(path):
+    """Retrieve a student's raw input payload."""
+    with get_pool().connection() as conn:
+        row = conn.execute("SELECT payload FROM students WHERE student_id = ?",
+                           (student_id,)).fetchone()
+    if row is None or row["payload"] is None:
         return None
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return json.loads(row["payload"])
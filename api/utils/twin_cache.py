@@ -0,0 +1,230 @@
+# api/utils/twin_cache.py
+"""
+Digital twin result cache.
+
+A twin is a pure function of the student's input payload and the pipeline
+code / model artifacts, so results are cached under
+(student_id, hash of the payload, artifact version):
+- memory: per-process LRU of the most recently served twins
+- persistent: twin_cache table in the student database, one row per
+  student, shared by every API worker and kept across restarts
+
+The ETag is derived from the same key, so a client revalidating with
+If-None-Match can be answered 304 without loading or computing the twin.
+Re-submitting a student changes the payload hash and upgrading a model
+file changes the artifact version; either way stale entries stop matching
+and are replaced on the next computation.
+"""
+import os
+import glob
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from api.utils.storage import get_pool, transaction
+
+CACHE_SIZE = int(os.environ.get("TWIN_CACHE_SIZE", "1024"))
+# Seconds an artifact_version() result is reused before the files are
+# stat'ed again
+VERSION_TTL = float(os.environ.get("ARTIFACT_VERSION_TTL", "30"))
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EMBEDDINGS_DIR = os.environ.get("EMBEDDINGS_DIR", "./embeddings")
+
+# Files whose contents determine pipeline output; stat'ed for the version:
+# pipeline code and the shared utils it runs (skill matcher / parser,
+# aliases table, encoder, job index), model artifacts, the job / course
+# catalogs and the job embeddings the internship matcher searches
+ARTIFACT_PATTERNS = [
+    os.path.join(API_DIR, "dt_pipeline", "*.py"),
+    os.path.join(os.path.dirname(API_DIR), "utils", "*.py"),
+    os.path.join(os.path.dirname(API_DIR), "utils", "*.json"),
+    os.path.join(os.environ.get("MODELS_DIR", "./models"), "*.pkl"),
+    os.environ.get("JOB_DATA_PATH", "./egypt_jobs_full_1500_cleaned.csv"),
+    os.environ.get("COURSE_DATA_PATH", "./digital_twin_courses_1500_cleaned.csv"),
+    os.path.join(EMBEDDINGS_DIR, "embeddings_jobs.meta.json"),
+    os.path.join(EMBEDDINGS_DIR, "embeddings_jobs.pkl"),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS twin_cache (
+    student_id TEXT PRIMARY KEY,
+    input_hash TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+CacheKey = Tuple[str, str, str]
+
+
+def payload_hash(payload: Dict) -> str:
+    """Stable hash of a student's input payload"""
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+_version: Tuple[float, str] = (0.0, "")
+
+
+def artifact_version(refresh: bool = False) -> str:
+    """
+    Version of the pipeline code and model artifacts.
+
+    MODEL_VERSION overrides it; otherwise it is a hash of the name, size and
+    mtime of every artifact file, so replacing a model invalidates the cache.
+    The hash is recomputed at most every VERSION_TTL seconds (or when
+    refresh is set, as the API lifespan does at startup), keeping the
+    file stats off the request path.
+    """
+    global _version
+    if os.environ.get("MODEL_VERSION"):
+        return os.environ["MODEL_VERSION"]
+    expires, version = _version
+    now = time.monotonic()
+    if refresh or now >= expires:
+        digest = hashlib.sha256()
+        for pattern in ARTIFACT_PATTERNS:
+            for path in sorted(glob.glob(pattern)):
+                stat = os.stat(path)
+                digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        version = digest.hexdigest()[:16]
+        _version = (now + VERSION_TTL, version)
+    return version
+
+
+def etag_for(key: CacheKey) -> str:
+    """Quoted strong ETag of a cache key"""
+    return '"' + hashlib.sha256("|".join(key).encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (weak comparison)"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
+class TwinCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of digital twin results.
+
+    Args:
+        capacity: Entries kept in the in-memory tier
+    """
+
+    def __init__(self, capacity: int = CACHE_SIZE):
+        self.capacity = capacity
+        # student_id -> (key, result): a student has one current entry
+        self._memory: "OrderedDict[str, Tuple[CacheKey, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._schema_pid = None
+        self.stats = {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "not_modified": 0}
+
+    def key(self, student_id: str, payload: Dict) -> CacheKey:
+        """Cache key of a student's current input"""
+        return (student_id, payload_hash(payload), artifact_version())
+
+    def _ensure_schema(self, conn) -> None:
+        if self._schema_pid != os.getpid():
+            conn.executescript(SCHEMA)
+            self._schema_pid = os.getpid()
+
+    def not_modified(self, key: CacheKey, if_none_match: Optional[str]) -> bool:
+        """True if the client's If-None-Match already names the current result"""
+        if not etag_matches(if_none_match, etag_for(key)):
+            return False
+        with self._lock:
+            self.stats["not_modified"] += 1
+        return True
+
+    def get(self, key: CacheKey) -> Optional[Dict]:
+        """Cached result for key, from memory or the database"""
+        with self._lock:
+            entry = self._memory.get(key[0])
+            if entry is not None and entry[0] == key:
+                self._memory.move_to_end(key[0])
+                self.stats["memory_hits"] += 1
+                return entry[1]
+
+        with get_pool().connection() as conn:
+            self._ensure_schema(conn)
+            row = conn.execute(
+                "SELECT result FROM twin_cache WHERE student_id = ? AND input_hash = ? AND model_version = ?",
+                key
+            ).fetchone()
+        if row is None:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        result = json.loads(row["result"])
+        with self._lock:
+            self.stats["persistent_hits"] += 1
+            self._remember(key, result)
+        return result
+
+    def put(self, key: CacheKey, result: Dict) -> None:
+        """Store a result in both tiers (replacing the student's previous entry)"""
+        self.put_many([(key, result)])
+
+    def put_many(self, entries: List[Tuple[CacheKey, Dict]]) -> None:
+        """Store several (key, result) pairs, in one database transaction"""
+        with self._lock:
+            for key, result in entries:
+                self._remember(key, result)
+        now = datetime.utcnow().isoformat()
+        with get_pool().connection() as conn:
+            self._ensure_schema(conn)
+            with transaction(conn):
+                conn.executemany(
+                    "INSERT OR REPLACE INTO twin_cache (student_id, input_hash, model_version, result, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [key + (json.dumps(result, ensure_ascii=False), now) for key, result in entries]
+                )
+
+    def get_or_compute(self, key: CacheKey, compute: Callable[[], Dict]) -> Dict:
+        """Cached result for key, computing and storing it on a miss"""
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def invalidate(self, student_id: str) -> None:
+        """Drop every cached result of a student"""
+        with self._lock:
+            self._memory.pop(student_id, None)
+        with get_pool().connection() as conn:
+            self._ensure_schema(conn)
+            with transaction(conn):
+                conn.execute("DELETE FROM twin_cache WHERE student_id = ?", (student_id,))
+
+    def clear(self) -> None:
+        """Drop every cached result"""
+        with self._lock:
+            self._memory.clear()
+        with get_pool().connection() as conn:
+            self._ensure_schema(conn)
+            with transaction(conn):
+                conn.execute("DELETE FROM twin_cache")
+
+    def metrics(self) -> Dict[str, int]:
+        """Hit / miss counters and memory tier size"""
+        with self._lock:
+            return dict(self.stats, memory_entries=len(self._memory), capacity=self.capacity)
+
+    def _remember(self, key: CacheKey, result: Dict) -> None:
+        self._memory[key[0]] = (key, result)
+        self._memory.move_to_end(key[0])
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+
+twin_cache = TwinCache()
@@ -0,0 +1,158 @@
+# api/utils/twin_export.py
+"""
+Bulk export of stored digital twins (GET /digital_twins/export).
+
+Students are read in keyset pages ordered by student_id: each page is one
+short indexed query (student_id > last id LIMIT n) joined with the
+persistent twin cache, so an export of any size holds one page in memory
+and never keeps a read transaction open while the client is slow.
+Cached twins are returned as their stored JSON text, so NDJSON lines are
+written without decoding and re-encoding each twin. Students without a
+current cached twin (never computed, or computed by an older model
+version) are returned with their payload so the caller can run the
+pipeline for the page. A track filter is applied in the query to cached
+twins; uncached rows are returned regardless and filtered by the caller
+once their twin is computed.
+
+The cursor token of a row is its student_id, url-safe base64 encoded;
+passing it back as ?cursor= resumes the export after that row.
+"""
+import os
+import json
+import base64
+import binascii
+from typing import Any, Dict, List, Optional
+
+from api.utils.storage import get_pool
+from api.utils.twin_cache import SCHEMA as TWIN_CACHE_SCHEMA, artifact_version
+
+PAGE_SIZE = int(os.environ.get("EXPORT_PAGE_SIZE", "500"))
+
+CSV_COLUMNS = [
+    "student_id", "name", "department", "created_at", "best_track", "top_career",
+    "top_career_probability", "career_predictions", "missing_skills", "recommended_courses",
+    "recommended_job_roles", "recommended_companies", "cursor",
+]
+
+_schema_pid = None
+
+
+def encode_cursor(student_id: str) -> str:
+    """Opaque resume token of a row"""
+    return base64.urlsafe_b64encode(student_id.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> str:
+    """student_id of a resume token; ValueError if malformed"""
+    try:
+        return base64.b64decode(token + "=" * (-len(token) % 4), altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def fetch_page(after: Optional[str] = None, limit: int = PAGE_SIZE, department: Optional[str] = None,
+               created_from: Optional[str] = None, created_to: Optional[str] = None,
+               track: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Next page of students in student_id order
+
+    Args:
+        after: Return students after this id (None: from the start)
+        limit: Page size
+        department: Only this department
+        created_from / created_to: Inclusive created_at range (ISO 8601
+            strings; a date alone covers the whole day for created_to)
+        track: Only cached twins whose best_track is this track (rows
+            without a current twin are kept)
+
+    Returns:
+        Rows with student_id, name, department, created_at and either the
+        cached twin (twin_json text and its best_track) or, if none is
+        current, the input payload
+    """
+    global _schema_pid
+    clauses, params = ["s.payload IS NOT NULL"], {"version": artifact_version(), "limit": limit}
+    if after is not None:
+        clauses.append("s.student_id > :after")
+        params["after"] = after
+    if department:
+        clauses.append("s.department = :department")
+        params["department"] = department
+    if created_from:
+        clauses.append("s.created_at >= :created_from")
+        params["created_from"] = created_from
+    if created_to:
+        # '~' sorts after the time part, so a bare date includes its whole day
+        clauses.append("s.created_at <= :created_to")
+        params["created_to"] = created_to + "~" if "T" not in created_to else created_to
+    if track:
+        clauses.append("(t.result IS NULL OR json_extract(t.result, '$.best_track') = :track)")
+        params["track"] = track
+
+    with get_pool().connection() as conn:
+        if _schema_pid != os.getpid():
+            conn.executescript(TWIN_CACHE_SCHEMA)
+            _schema_pid = os.getpid()
+        rows = conn.execute(
+            f"""
+            SELECT s.student_id, s.name, s.department, s.created_at, t.result,
+                   json_extract(t.result, '$.best_track') AS best_track,
+                   CASE WHEN t.result IS NULL THEN s.payload END AS payload
+            FROM students s
+            LEFT JOIN twin_cache t ON t.student_id = s.student_id AND t.model_version = :version
+            WHERE {" AND ".join(clauses)}
+            ORDER BY s.student_id
+            LIMIT :limit
+            """,
+            params
+        ).fetchall()
+
+    return [{
+        "student_id": row["student_id"],
+        "name": row["name"],
+        "department": row["department"],
+        "created_at": row["created_at"],
+        "best_track": row["best_track"],
+        "twin_json": row["result"],
+        "payload": json.loads(row["payload"]) if row["payload"] is not None else None,
+    } for row in rows]
+
+
+def set_twin(row: Dict[str, Any], twin: Dict) -> None:
+    """Attach a freshly computed twin to a row of fetch_page"""
+    row["twin_json"] = json.dumps(twin, ensure_ascii=False)
+    row["best_track"] = twin.get("best_track")
+
+
+def ndjson_line(row: Dict[str, Any]) -> str:
+    """NDJSON line of an exported row; the twin JSON is spliced in as stored"""
+    head = json.dumps({
+        "student_id": row["student_id"],
+        "name": row["name"],
+        "department": row["department"],
+        "created_at": row["created_at"],
+        "cursor": encode_cursor(row["student_id"]),
+    }, ensure_ascii=False)
+    return f'{head[:-1]}, "digital_twin": {row["twin_json"]}}}\n'
+
+
+def csv_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Flat CSV columns of an exported twin (lists ';' separated)"""
+    twin = json.loads(row["twin_json"])
+    predictions = twin.get("career_predictions") or []
+    top = predictions[0] if predictions else {}
+    return {
+        "student_id": row["student_id"],
+        "name": row["name"],
+        "department": row["department"],
+        "created_at": row["created_at"],
+        "best_track": twin.get("best_track"),
+        "top_career": top.get("career"),
+        "top_career_probability": top.get("probability"),
+        "career_predictions": ";".join(f"{p['career']}:{p['probability']}" for p in predictions),
+        "missing_skills": ";".join(twin.get("missing_skills") or []),
+        "recommended_courses": ";".join(twin.get("recommended_courses") or []),
+        "recommended_job_roles": ";".join(twin.get("recommended_job_roles") or []),
+        "recommended_companies": ";".join(twin.get("recommended_companies") or []),
+        "cursor": encode_cursor(row["student_id"]),
+    }
@@ -0,0 +1,153 @@
+"""
+API Concurrency Load Test
+=========================
+Bundled asyncio load generator for the FastAPI app: C concurrent clients
+send a mix of POST /create_digital_twin and GET /get_digital_twin for a
+fixed duration; requests/sec and p50 / p95 latency are reported per
+endpoint.
+
+Each --app-dir is served by its own uvicorn process on a fresh temporary
+DATA_DIR / STORAGE_DB, so two checkouts (e.g. a git worktree of the
+previous commit and the current tree) can be compared under the same load.
+
+Usage:
+    python benchmark_api_concurrency.py [--app-dir . /tmp/before] [--concurrency 8 32 128]
+                                        [--duration 10] [--post-ratio 0.2] [--uvicorn-workers 1]
+    python benchmark_api_concurrency.py --url http://127.0.0.1:8000
+
+--url load tests an already running API instead of starting one.
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+import httpx
+
+from benchmark_micro_batching import closed_loop
+
+SEED_STUDENTS = 50
+
+
+def student_form(i):
+    """A valid StudentForm payload"""
+    return {
+        "full_name": f"Load Student {i}", "student_id": "", "email": f"load{i}@test", "phone": None,
+        "department": "CS", "academic_level": "3", "gpa": round(2.5 + (i % 15) / 10, 2),
+        "completed_courses": ["Algorithms", "Databases"], "completed_grades": [85.0, 72.0],
+        "current_courses": [], "core_subjects_taken": [], "core_subjects_missing": [], "electives_taken": [],
+        "academic_weaknesses": None, "technical_skills": ["Python", "SQL", "Pandas"][:1 + i % 3],
+        "technical_skill_levels": ["Intermediate"], "soft_skills": ["Teamwork"], "languages": ["English"],
+        "certifications": [], "desired_career_path": "Data Science", "preferred_track": "Data Science",
+        "desired_job_role": "Data Analyst", "target_company": None, "preferred_location": None,
+        "preferred_country": None, "work_type": "Remote", "external_courses": [], "internships": [],
+        "hackathons": [], "clubs": [], "volunteer_work": [], "projects": ["Dashboard"], "github_link": None,
+        "enjoy_tasks": "analysis", "hate_tasks": "none", "introvert_or_extrovert": "introvert",
+        "teamwork_or_solo": "teamwork", "enjoy_logic": True, "enjoy_creativity": True,
+        "dream_job": "Data Scientist", "favourite_tech": ["Python"], "industries_loved": ["Tech"],
+        "hobbies": ["Chess"], "learning_style": "visual", "learning_speed": "fast", "daily_hours": 2,
+        "weekly_days": 5, "goal_6_months": "Internship", "goal_2_years": "Job",
+        "why_this_career": "I like data", "biggest_challenge": "Time", "grad_year": 2027,
+    }
+
+
+def start_server(app_dir, port, workers, data_dir):
+    """Start uvicorn for app_dir; returns the process once /health answers"""
+    env = dict(os.environ, DATA_DIR=data_dir, STORAGE_DB=os.path.join(data_dir, "digital_twin.db"),
+               PDF_OUTPUT_DIR=os.path.join(data_dir, "pdf_reports"), PYTHONPATH=os.path.abspath(app_dir))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"API in {app_dir} did not start")
+
+
+async def load_test(url, concurrency, duration, post_ratio):
+    """Run the mixed workload; returns {endpoint: latencies}"""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        seeded = []
+        for i in range(SEED_STUDENTS):
+            response = await client.post("/create_digital_twin", json=student_form(i))
+            response.raise_for_status()
+            seeded.append(response.json()["student_id"])
+
+        rng = random.Random(42)
+        latencies = {"POST create": [], "GET twin": []}
+
+        async def request(_):
+            start = time.perf_counter()
+            if rng.random() < post_ratio:
+                response = await client.post("/create_digital_twin", json=student_form(rng.randrange(1000)))
+                endpoint = "POST create"
+            else:
+                response = await client.get(f"/get_digital_twin/{rng.choice(seeded)}")
+                endpoint = "GET twin"
+            response.raise_for_status()
+            latencies[endpoint].append(time.perf_counter() - start)
+
+        await closed_loop(request, [None], concurrency, duration)
+    return latencies
+
+
+def report(label, concurrency, latencies, duration):
+    everything = [t for samples in latencies.values() for t in samples]
+    for endpoint, samples in list(latencies.items()) + [("all", everything)]:
+        if not samples:
+            continue
+        p50, p95 = np.percentile(np.asarray(samples) * 1000, [50, 95])
+        print(f"{label:>16} {concurrency:>5} {endpoint:>12} {len(samples) / duration:>8.0f}/s "
+              f"{p50:>8.1f} ms {p95:>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API with concurrent clients")
+    parser.add_argument('--app-dir', nargs='+', default=['.'])
+    parser.add_argument('--url', help="Load test a running API instead of starting one per --app-dir")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 32, 128])
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--post-ratio', type=float, default=0.2)
+    parser.add_argument('--uvicorn-workers', type=int, default=1)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'app':>16} {'conc':>5} {'endpoint':>12} {'rate':>10} {'p50':>11} {'p95':>11}")
+    targets = [(args.url, args.url)] if args.url else [(d, None) for d in args.app_dir]
+    for label, url in targets:
+        for concurrency in args.concurrency:
+            process = data_dir = None
+            if url is None:
+                data_dir = tempfile.mkdtemp(prefix="api_load_")
+                process, target = start_server(label, args.port, args.uvicorn_workers, data_dir)
+            else:
+                target = url
+            try:
+                latencies = asyncio.run(load_test(target, concurrency, args.duration, args.post_ratio))
+                report(os.path.basename(os.path.abspath(label)) if url is None else "api",
+                       concurrency, latencies, args.duration)
+            finally:
+                if process is not None:
+                    process.terminate()
+                    process.wait()
+                    shutil.rmtree(data_dir)
+
+
+if __name__ == "__main__":
+    main()
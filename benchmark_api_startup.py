@@ -0,0 +1,71 @@
+"""
+API Startup Benchmark
+=====================
+Measures cold import time of the API and its pipeline modules in fresh
+interpreters, and the cost of warming the registry models, i.e. what
+every import of skill_extractor paid when it loaded the model eagerly.
+
+Usage:
+    python benchmark_api_startup.py [--runs 5]
+"""
+
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+IMPORT_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{'seconds': time.perf_counter() - start}}))
+"""
+
+WARM_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import api.main
+from api.dt_pipeline import model_registry
+timings = model_registry.warm([{name!r}])
+print(json.dumps({{'seconds': time.perf_counter() - start, 'load': timings[{name!r}]}}))
+"""
+
+
+def run(snippet, runs):
+    """Median seconds of a snippet over fresh interpreters (None if it failed)"""
+    seconds = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, '-c', snippet], capture_output=True, text=True)
+        if proc.returncode != 0:
+            return None, proc.stderr.strip().splitlines()[-1]
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if result.get('load', 0) is None:
+            return None, "model failed to load"
+        seconds.append(result['seconds'])
+    return statistics.median(seconds), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API import and model warm-up time")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        ("import api.main", IMPORT_SNIPPET.format(module='api.main')),
+        ("import skill_extractor", IMPORT_SNIPPET.format(module='api.dt_pipeline.skill_extractor')),
+        ("import internship_matcher", IMPORT_SNIPPET.format(module='api.dt_pipeline.internship_matcher')),
+        ("api.main + warm sentence_encoder", WARM_SNIPPET.format(name='sentence_encoder')),
+        ("api.main + warm job_index", WARM_SNIPPET.format(name='job_index')),
+    ]
+    print(f"Median of {args.runs} fresh interpreters:")
+    for label, snippet in cases:
+        seconds, error = run(snippet, args.runs)
+        if error:
+            print(f"  {label:<34} skipped ({error})")
+        else:
+            print(f"  {label:<34} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
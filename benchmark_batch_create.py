@@ -0,0 +1,130 @@
+"""
+Batch Create Benchmark
+======================
+Ingestion throughput of a cohort of N students: N sequential
+POST /create_digital_twin calls, the same N calls from C concurrent
+clients, and one POST /create_digital_twins:batch per body format (JSON,
+JSONL, CSV). Reports students/sec, and for the batch endpoint the time to
+the first streamed result line.
+
+The API is started with uvicorn on a fresh temporary DATA_DIR for each
+mode (see benchmark_api_concurrency.start_server), so every mode starts
+from an empty database and PDF queue; one warm-up create loads the
+models before timing.
+
+Usage:
+    python benchmark_batch_create.py [--students 1000] [--concurrency 8]
+                                     [--formats json jsonl csv] [--app-dir .]
+    python benchmark_batch_create.py --url http://127.0.0.1:8000
+"""
+
+import io
+import csv
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+import httpx
+
+from benchmark_api_concurrency import student_form, start_server
+
+CONTENT_TYPES = {"json": "application/json", "jsonl": "application/x-ndjson", "csv": "text/csv"}
+
+
+def batch_body(forms, body_format):
+    """Request body of a cohort in the given format"""
+    if body_format == "json":
+        return json.dumps(forms)
+    if body_format == "jsonl":
+        return "\n".join(json.dumps(form) for form in forms)
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(forms[0]))
+    writer.writeheader()
+    for form in forms:
+        writer.writerow({key: ";".join(map(str, value)) if isinstance(value, list) else ("" if value is None else value)
+                         for key, value in form.items()})
+    return out.getvalue()
+
+
+def run_sequential(url, forms):
+    with httpx.Client(base_url=url, timeout=120) as client:
+        start = time.perf_counter()
+        for form in forms:
+            client.post("/create_digital_twin", json=form).raise_for_status()
+        return time.perf_counter() - start, None
+
+
+async def run_concurrent(url, forms, concurrency):
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        pending = iter(forms)
+
+        async def worker():
+            for form in pending:
+                (await client.post("/create_digital_twin", json=form)).raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start, None
+
+
+def run_batch(url, forms, body_format):
+    body = batch_body(forms, body_format)
+    with httpx.Client(base_url=url, timeout=600) as client:
+        start = time.perf_counter()
+        first = None
+        created = 0
+        with client.stream("POST", "/create_digital_twins:batch", content=body,
+                           headers={"content-type": CONTENT_TYPES[body_format]}) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                first = first or time.perf_counter() - start
+                created += "student_id" in json.loads(line)
+        if created != len(forms):
+            raise RuntimeError(f"batch created {created} of {len(forms)} students")
+        return time.perf_counter() - start, first
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single vs batch digital twin creation")
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--formats', nargs='+', choices=list(CONTENT_TYPES), default=list(CONTENT_TYPES))
+    parser.add_argument('--app-dir', default='.')
+    parser.add_argument('--url', help="Benchmark a running API instead of starting one per mode")
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    forms = [student_form(i) for i in range(args.students)]
+    modes = [("sequential", lambda url: run_sequential(url, forms)),
+             (f"concurrent x{args.concurrency}",
+              lambda url: asyncio.run(run_concurrent(url, forms, args.concurrency)))]
+    modes += [(f"batch {fmt}", lambda url, fmt=fmt: run_batch(url, forms, fmt)) for fmt in args.formats]
+
+    print(f"{'mode':>16} {'students':>9} {'seconds':>9} {'students/s':>11} {'first line':>11}")
+    for label, run in modes:
+        process = data_dir = None
+        url = args.url
+        if url is None:
+            data_dir = tempfile.mkdtemp(prefix="batch_create_")
+            process, url = start_server(args.app_dir, args.port, 1, data_dir)
+        try:
+            # Load the models outside the measurement
+            httpx.post(f"{url}/create_digital_twin", json=forms[0], timeout=120).raise_for_status()
+            seconds, first = run(url)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+                shutil.rmtree(data_dir)
+        first_line = f"{first * 1000:>8.0f} ms" if first is not None else f"{'-':>11}"
+        print(f"{label:>16} {args.students:>9} {seconds:>9.2f} {args.students / seconds:>11.0f} {first_line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Career Inference Benchmark
+==========================
+Single-student latency of the API career predictor
+(api/dt_pipeline/career_predictor.py: feature vector + PCA projection +
+booster.inplace_predict) against the sklearn wrapper path used by
+train_career_model.predict_career (DataFrame row + pca.transform +
+XGBClassifier.predict_proba). Embedding is excluded: both paths get the
+precomputed student vectors.
+
+Also checks that the fast path reproduces the wrapper: the projection
+against pca.transform and the probabilities on every row of
+models/features_all.csv.
+
+Usage:
+    python benchmark_career_inference.py [--requests 2000] [--top-k 5]
+"""
+
+import time
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.embedding_store import load_embedding_set
+from api.dt_pipeline.career_predictor import predict_student_careers, get_career_model
+
+STUDENTS_PATH = 'digital_twin_students_1500_cleaned.csv'
+FEATURES_PATH = 'models/features_all.csv'
+
+
+def form_payload(row):
+    """StudentForm-like payload from a dataset row"""
+    return {
+        'gpa': float(row['GPA']),
+        'attendance_percent': float(row['AttendancePercent']),
+        'technical_skills': str(row['Skills']),
+        'completed_courses': str(row['CoursesCompleted']),
+        'projects': str(row['Projects']),
+        'internships': str(row['Internships']),
+    }
+
+
+def percentiles(samples):
+    """p50 / p95 / p99 of latency samples in ms"""
+    return np.percentile(np.asarray(samples) * 1000, [50, 95, 99])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-student career inference")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--top-k', type=int, default=5)
+    args = parser.parse_args()
+
+    model = get_career_model()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        import joblib
+        classifier = joblib.load('models/career_model_xgb.pkl')
+        pca = joblib.load('models/emb_pca.pkl')
+
+    features_all = pd.read_csv(FEATURES_PATH)
+    embeddings = load_embedding_set('students')
+    rows = [embeddings['id_to_row'][sid] for sid in features_all['StudentID']]
+    vectors = np.asarray(embeddings['embeddings'][rows], dtype=np.float32)
+
+    # Correctness: projection and probabilities match the sklearn path
+    pca_cols = [f'emb_pca_{i}' for i in range(model.pca_components.shape[1])]
+    projected = (vectors - model.pca_mean) @ model.pca_components
+    projection_error = np.abs(projected - pca.transform(vectors)).max()
+    X = features_all[model.feature_names]
+    probability_error = np.abs(model.predict_proba(X.to_numpy()) - classifier.predict_proba(X)).max()
+    print(f"max |projection - pca.transform| = {projection_error:.2e}")
+    print(f"max |inplace_predict - predict_proba| = {probability_error:.2e}")
+
+    df_students = pd.read_csv(STUDENTS_PATH).drop_duplicates('StudentID').set_index('StudentID')
+    payloads = [form_payload(df_students.loc[sid]) for sid in features_all['StudentID']]
+    rng = np.random.default_rng(42)
+    picks = rng.integers(0, len(payloads), args.requests)
+
+    fast = []
+    for i in picks:
+        start = time.perf_counter()
+        predict_student_careers(payloads[i], vectors[i], top_k=args.top_k)
+        fast.append(time.perf_counter() - start)
+
+    wrapper = []
+    classes = model.classes
+    for i in picks:
+        start = time.perf_counter()
+        row = pd.DataFrame([model.features(payloads[i], None)[0]], columns=model.feature_names)
+        row[pca_cols] = pca.transform(vectors[i:i + 1])
+        probs = classifier.predict_proba(row)[0]
+        [(classes[j], float(probs[j])) for j in probs.argsort()[::-1][:args.top_k]]
+        wrapper.append(time.perf_counter() - start)
+
+    print(f"\n{'path':>16} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, samples in (('sklearn wrapper', wrapper), ('inplace_predict', fast)):
+        p50, p95, p99 = percentiles(samples)
+        print(f"{name:>16} {p50:>6.3f} ms {p95:>6.3f} ms {p99:>6.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
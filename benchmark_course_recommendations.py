@@ -0,0 +1,112 @@
+"""
+Course Recommendation Benchmark
+===============================
+Compares the per-student recommend_courses loop with the batch CourseScorer
+and checks that both produce the same recommendations.
+
+Usage:
+    python benchmark_course_recommendations.py [--students N]
+
+Uses skill_gap_profiles/student_profiles.jsonl when it exists, otherwise
+synthetic profiles whose missing skills are sampled from the course and job
+catalogs.
+"""
+
+import os
+import time
+import random
+import argparse
+import numpy as np
+import pandas as pd
+
+from utils.skill_parser import parse_skill_list
+from utils.embedding_store import load_embedding_set
+from utils.record_store import has_records, read_records
+from recommendation_engine import (
+    CourseScorer, recommend_courses,
+    INPUT_DIR, EMBEDDING_DIR, COURSE_DATA_PATH, JOB_DATA_PATH
+)
+
+
+def load_inputs(num_students):
+    """Load course catalog, student embeddings and profiles"""
+    student_embeddings = load_embedding_set("students", EMBEDDING_DIR)['embeddings']
+    course_data = load_embedding_set("courses", EMBEDDING_DIR)
+
+    df_courses = pd.read_csv(COURSE_DATA_PATH).iloc[course_data['ids']].reset_index(drop=True)
+
+    profiles_path = os.path.join(INPUT_DIR, "student_profiles.jsonl")
+    if has_records(profiles_path):
+        profiles = read_records(profiles_path)
+    else:
+        profiles = synthetic_profiles(len(student_embeddings), df_courses)
+
+    # Tile embeddings/profiles when asking for more students than we have
+    reps = -(-num_students // len(profiles))
+    profiles = (profiles * reps)[:num_students]
+    student_embeddings = np.tile(student_embeddings, (reps, 1))[:num_students]
+    return profiles, student_embeddings, course_data['embeddings'], df_courses
+
+
+def synthetic_profiles(num_students, df_courses):
+    """Build profiles with missing skills drawn from the course and job catalogs"""
+    rng = random.Random(42)
+    course_skills = sorted({s for v in df_courses['SkillsGained'] for s in parse_skill_list(str(v))})
+    job_skills = sorted({s for v in pd.read_csv(JOB_DATA_PATH)['required_skills']
+                         for s in parse_skill_list(str(v))})
+    profiles = []
+    for i in range(num_students):
+        missing = rng.sample(course_skills, rng.randint(0, 4)) + rng.sample(job_skills, rng.randint(0, 4))
+        profiles.append({
+            'student_id': f"S{i + 1:04d}",
+            'skill_gaps': {'missing_skills': sorted(set(missing))}
+        })
+    return profiles
+
+
+def compare(loop_results, batch_results):
+    """Return (identical ranking count, max absolute score difference)"""
+    same = 0
+    max_diff = 0.0
+    for loop_recs, batch_recs in zip(loop_results, batch_results):
+        loop_names = [r['course_name'] for r in loop_recs]
+        batch_names = [r['course_name'] for r in batch_recs]
+        if loop_names == batch_names:
+            same += 1
+        for a, b in zip(loop_recs, batch_recs):
+            max_diff = max(max_diff, abs(a['score'] - b['score']))
+    return same, max_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark course recommendation scoring")
+    parser.add_argument("--students", type=int, default=1500)
+    args = parser.parse_args()
+
+    profiles, student_embeddings, course_embeddings, df_courses = load_inputs(args.students)
+    print(f"Students: {len(profiles)}, Courses: {len(df_courses)}")
+
+    start = time.perf_counter()
+    loop_results = [
+        recommend_courses(p, student_embeddings[i], course_embeddings, df_courses)
+        for i, p in enumerate(profiles)
+    ]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scorer = CourseScorer(course_embeddings, df_courses)
+    build_time = time.perf_counter() - start
+    batch_results = scorer.recommend(profiles, student_embeddings)
+    batch_time = time.perf_counter() - start
+
+    same, max_diff = compare(loop_results, batch_results)
+
+    print(f"Loop path:   {loop_time:8.3f}s ({loop_time / len(profiles) * 1000:.3f} ms/student)")
+    print(f"Batch path:  {batch_time:8.3f}s ({batch_time / len(profiles) * 1000:.3f} ms/student, "
+          f"index build {build_time:.3f}s)")
+    print(f"Speedup:     {loop_time / batch_time:8.1f}x")
+    print(f"Identical rankings: {same}/{len(profiles)}, max score diff: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Embedding Load Benchmark
+========================
+Compares loading the embedding sets from the legacy pickles with opening
+the memory-mapped store, and measures how much of each worker's memory is
+private when several processes read the same sets.
+
+Usage:
+    python migrate_embeddings.py        # once, to create the store
+    python benchmark_embedding_load.py [--workers 4] [--repeat 5]
+
+Worker memory comes from /proc/self/status (Linux): RssAnon is private
+memory, RssFile is file-backed page cache shared between workers.
+"""
+
+import os
+import time
+import pickle
+import argparse
+import multiprocessing as mp
+import numpy as np
+
+from utils.embedding_store import EMBEDDINGS_DIR, EMBEDDING_SETS, store_paths, has_store, load_embedding_set
+
+
+def load_pickles():
+    """Load every set from the legacy pickles"""
+    sets = {}
+    for name in EMBEDDING_SETS:
+        with open(store_paths(name)['pickle'], 'rb') as f:
+            sets[name] = pickle.load(f)
+    return sets
+
+
+def load_store():
+    """Open every set from the memory-mapped store"""
+    return {name: load_embedding_set(name, EMBEDDINGS_DIR) for name in EMBEDDING_SETS}
+
+
+def timed(loader, repeat):
+    """Best-of-n wall time of a loader, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loader()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def memory_status():
+    """RssAnon / RssFile of the current process in MB (None if unavailable)"""
+    status = {}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('RssAnon', 'RssFile'):
+                    status[key] = int(value.split()[0]) / 1024
+    except OSError:
+        return None
+    return status
+
+
+def worker(mode, queue):
+    """Load the sets, touch every row (like a similarity pass), report memory"""
+    baseline = memory_status()
+    sets = load_pickles() if mode == 'pickle' else load_store()
+    checksum = sum(float(np.asarray(s['embeddings']).sum()) for s in sets.values())
+    status = memory_status()
+    if status and baseline:
+        status = {key: status[key] - baseline[key] for key in status}
+    queue.put((status, checksum))
+
+
+def run_workers(mode, workers):
+    """Start workers concurrently and collect their memory deltas"""
+    queue = mp.Queue()
+    procs = [mp.Process(target=worker, args=(mode, queue)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pickle vs memory-mapped embedding loading")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if not all(has_store(name) for name in EMBEDDING_SETS):
+        print("Embedding store not found; run migrate_embeddings.py first")
+        return
+
+    total_mb = sum(os.path.getsize(store_paths(name)['vectors']) for name in EMBEDDING_SETS) / 1024 ** 2
+    print(f"Sets: {', '.join(EMBEDDING_SETS)} ({total_mb:.1f} MB of vectors)")
+    print(f"Load pickle: {timed(load_pickles, args.repeat):8.2f} ms")
+    print(f"Open mmap:   {timed(load_store, args.repeat):8.2f} ms")
+
+    if memory_status() is None:
+        print("/proc/self/status not available; skipping worker memory report")
+        return
+
+    print(f"\nPer-worker memory after loading and scanning all sets ({args.workers} workers):")
+    for mode in ('pickle', 'mmap'):
+        results = run_workers(mode, args.workers)
+        anon = [status['RssAnon'] for status, _ in results]
+        shared = [status['RssFile'] for status, _ in results]
+        print(f"  {mode:<6} private (RssAnon) {np.mean(anon):7.1f} MB/worker, "
+              f"file-backed (RssFile) {np.mean(shared):7.1f} MB/worker, "
+              f"total private {sum(anon):7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
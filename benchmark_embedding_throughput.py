@@ -0,0 +1,95 @@
+"""
+Embedding Throughput Benchmark
+==============================
+Measures encoding throughput (texts/sec) of the parallel encoder for a
+range of worker counts, on the four 1500-row Step 1 corpora and on a
+synthetic corpus built from them.
+
+Usage:
+    python benchmark_embedding_throughput.py [--workers 1 2 4 8] [--batch-size 32]
+                                             [--synthetic 50000]
+
+The baseline is a single in-process SentenceTransformer.encode call, as
+build_embeddings.py ran before --workers. Pool start-up and
+model loading are excluded from the timings (each pool is warmed first).
+"""
+
+import time
+import random
+import argparse
+import pandas as pd
+from sentence_transformers import SentenceTransformer
+
+from build_embeddings import (
+    MODEL_NAME, STUDENT_FILE, JOB_FILE, COURSE_FILE,
+    combine_student_skills, combine_job_skills, combine_course_skills, combine_student_interests
+)
+from utils.parallel_encoder import ParallelEncoder
+
+
+def load_corpora():
+    """Texts of the four embedding sets"""
+    df_students = pd.read_csv(STUDENT_FILE)
+    return {
+        'students': df_students.apply(combine_student_skills, axis=1).tolist(),
+        'jobs': pd.read_csv(JOB_FILE).apply(combine_job_skills, axis=1).tolist(),
+        'courses': pd.read_csv(COURSE_FILE).apply(combine_course_skills, axis=1).tolist(),
+        'interests': df_students.apply(combine_student_interests, axis=1).tolist(),
+    }
+
+
+def synthetic_corpus(texts, size, seed=42):
+    """Distinct texts with the length mix of the real corpora (shuffled words)"""
+    rng = random.Random(seed)
+    corpus = []
+    while len(corpus) < size:
+        words = rng.choice(texts).split()
+        rng.shuffle(words)
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def baseline(texts, batch_size):
+    """Texts/sec of a single in-process encode call"""
+    model = SentenceTransformer(MODEL_NAME, device='cpu')
+    model.encode(texts[:batch_size], batch_size=batch_size)
+    start = time.perf_counter()
+    model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def parallel(texts, workers, batch_size):
+    """Texts/sec of the parallel encoder with a warmed pool"""
+    with ParallelEncoder(MODEL_NAME, workers=workers, batch_size=batch_size) as encoder:
+        encoder.encode(texts[:batch_size * workers])
+        start = time.perf_counter()
+        encoder.encode(texts)
+        return len(texts) / (time.perf_counter() - start)
+
+
+def report(label, texts, workers, batch_size):
+    """Print a throughput table for one corpus"""
+    print(f"\n{label}: {len(texts)} texts, batch size {batch_size}")
+    base = baseline(texts, batch_size)
+    print(f"  {'baseline':>10} {base:10.1f} texts/s")
+    for count in workers:
+        rate = parallel(texts, count, batch_size)
+        print(f"  {count:>3} worker{'s' if count > 1 else ' '} {rate:10.1f} texts/s  ({rate / base:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel embedding throughput")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--synthetic', type=int, default=50000, help="synthetic corpus size (0 to skip)")
+    args = parser.parse_args()
+
+    corpora = load_corpora()
+    all_texts = [text for texts in corpora.values() for text in texts]
+    report("Step 1 corpora (students, jobs, courses, interests)", all_texts, args.workers, args.batch_size)
+    if args.synthetic:
+        report("Synthetic corpus", synthetic_corpus(all_texts, args.synthetic), args.workers, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
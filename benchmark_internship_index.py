@@ -0,0 +1,66 @@
+"""
+Internship Index Benchmark
+==========================
+Compares the per-student recommend_internships scan with the precomputed
+JobIndex, for the full student batch and for single live-student queries.
+
+Usage:
+    python benchmark_internship_index.py [--queries N]
+"""
+
+import time
+import argparse
+import numpy as np
+
+from recommendation_engine import recommend_internships, EMBEDDING_DIR, JOB_DATA_PATH
+from utils.job_index import load_job_index
+from utils.embedding_store import load_embedding_set
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark internship matching")
+    parser.add_argument("--queries", type=int, default=1000, help="single-student queries to time")
+    args = parser.parse_args()
+
+    student_embeddings = load_embedding_set("students", EMBEDDING_DIR)['embeddings']
+
+    start = time.perf_counter()
+    index = load_job_index(EMBEDDING_DIR, JOB_DATA_PATH)
+    build_time = time.perf_counter() - start
+    job_embeddings = load_embedding_set("jobs", EMBEDDING_DIR)['embeddings']
+
+    print(f"Students: {len(student_embeddings)}, Jobs: {len(index.df_jobs)}, "
+          f"entry-level jobs: {len(index.bucket_indices['entry'])}")
+    print(f"Index build (load + masks + normalize): {build_time:.3f}s")
+
+    start = time.perf_counter()
+    loop_results = [recommend_internships(e, job_embeddings, index.df_jobs) for e in student_embeddings]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_results = index.recommend_internships(student_embeddings)
+    batch_time = time.perf_counter() - start
+
+    same = sum(
+        [r['role'] for r in a] == [r['role'] for r in b] and [r['company'] for r in a] == [r['company'] for r in b]
+        for a, b in zip(loop_results, batch_results)
+    )
+    max_diff = max(abs(x['match'] - y['match']) for a, b in zip(loop_results, batch_results) for x, y in zip(a, b))
+
+    print(f"Loop path:  {loop_time:8.3f}s")
+    print(f"Batch path: {batch_time:8.3f}s  ({loop_time / batch_time:.0f}x faster)")
+    print(f"Identical rankings: {same}/{len(student_embeddings)}, max match diff: {max_diff:.2e}")
+
+    latencies = []
+    for i in range(args.queries):
+        e = student_embeddings[i % len(student_embeddings)]
+        start = time.perf_counter()
+        index.recommend_internships(e)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies = np.array(latencies)
+    print(f"Single student: p50 {np.percentile(latencies, 50):.3f} ms, "
+          f"p99 {np.percentile(latencies, 99):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Micro-Batching Load Test
+========================
+Closed-loop load test of the inference micro-batcher
+(api/utils/micro_batcher.py): C concurrent clients each submit one
+student at a time for a fixed duration, first unbatched (one model call
+per request in the threadpool, as the API did before) and then through a
+MicroBatcher for each max-wait setting. Prints throughput vs latency per
+concurrency level.
+
+Usage:
+    python benchmark_micro_batching.py [--target career] [--concurrency 1 4 16 64 256]
+                                       [--max-wait-ms 1 2 5] [--max-batch 32] [--duration 3]
+    python benchmark_micro_batching.py --url http://127.0.0.1:8000 [--concurrency 1 8 32]
+
+--target encoder batches the sentence encoder instead of the career model
+(needs sentence-transformers). --url drives POST /create_digital_twin on a
+running API and reports its /health/batching counters.
+"""
+
+import time
+import asyncio
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from api.utils.micro_batcher import MicroBatcher
+
+FEATURES_PATH = 'models/features_all.csv'
+STUDENTS_PATH = 'digital_twin_students_1500_cleaned.csv'
+
+
+def career_workload():
+    """(batch function, items) for the career model"""
+    from api.dt_pipeline.career_predictor import get_career_model, predict_proba_rows
+    model = get_career_model()
+    rows = pd.read_csv(FEATURES_PATH)[model.feature_names].to_numpy(dtype=np.float32)
+    return predict_proba_rows, list(rows)
+
+
+def encoder_workload():
+    """(batch function, items) for the sentence encoder"""
+    from api.dt_pipeline.skill_extractor import encoder
+    texts = pd.read_csv(STUDENTS_PATH)['Skills'].astype(str).tolist()
+    # Bypass the text -> vector cache so every request really encodes
+    return (lambda batch: list(encoder.model.encode(batch, batch_size=len(batch)))), texts
+
+
+async def closed_loop(call, items, concurrency, duration):
+    """Run concurrency clients for duration seconds; return latencies"""
+    latencies = []
+    stop_at = time.perf_counter() + duration
+
+    async def client(offset):
+        i = offset
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            await call(items[i % len(items)])
+            latencies.append(time.perf_counter() - start)
+            i += concurrency
+
+    await asyncio.gather(*(client(c) for c in range(concurrency)))
+    return latencies
+
+
+def report(label, concurrency, latencies, duration, batch=None):
+    p50, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 99])
+    mean_batch = f"{batch['mean_batch_size']:>7.1f}" if batch else f"{'-':>7}"
+    print(f"{label:>14} {concurrency:>6} {len(latencies) / duration:>9.0f}/s "
+          f"{p50:>7.2f} ms {p99:>7.2f} ms {mean_batch}")
+
+
+async def run_local(args):
+    fn, items = encoder_workload() if args.target == 'encoder' else career_workload()
+    fn(items[:args.max_batch])  # load the model outside the measurement
+    loop = asyncio.get_running_loop()
+
+    async def unbatched(item):
+        return await loop.run_in_executor(None, fn, [item])
+
+    print(f"{'mode':>14} {'conc':>6} {'throughput':>11} {'p50':>10} {'p99':>10} {'batch':>7}")
+    for concurrency in args.concurrency:
+        latencies = await closed_loop(unbatched, items, concurrency, args.duration)
+        report('unbatched', concurrency, latencies, args.duration)
+        for max_wait in args.max_wait_ms:
+            batcher = MicroBatcher(fn, max_batch=args.max_batch, max_wait_ms=max_wait, name=args.target)
+            await batcher.start()
+            latencies = await closed_loop(batcher.submit, items, concurrency, args.duration)
+            await batcher.stop()
+            report(f'wait {max_wait:g} ms', concurrency, latencies, args.duration, batcher.metrics())
+
+
+async def run_api(args):
+    import httpx
+    from benchmark_api_concurrency import student_form
+    payload = student_form(0)
+    async with httpx.AsyncClient(base_url=args.url, timeout=120) as client:
+        async def post(_):
+            response = await client.post("/create_digital_twin", json=payload)
+            response.raise_for_status()
+
+        print(f"{'mode':>14} {'conc':>6} {'throughput':>11} {'p50':>10} {'p99':>10} {'batch':>7}")
+        for concurrency in args.concurrency:
+            latencies = await closed_loop(post, [None], concurrency, args.duration)
+            batching = (await client.get("/health/batching")).json().get("career_model")
+            report('api', concurrency, latencies, args.duration, batching)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the inference micro-batcher")
+    parser.add_argument('--target', choices=['career', 'encoder'], default='career')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64, 256])
+    parser.add_argument('--max-wait-ms', type=float, nargs='+', default=[1, 2, 5])
+    parser.add_argument('--max-batch', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--url', help="Load test a running API instead")
+    args = parser.parse_args()
+    asyncio.run(run_api(args) if args.url else run_local(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Record Store Benchmark
+======================
+Compares the legacy indented JSON array with the JSONL record store for
+a growing number of student profiles: write time, peak Python memory of
+a full pass (json.load vs lazy iteration) and single-student lookup
+latency (scan of the loaded list vs seek through the offset index).
+
+Usage:
+    python benchmark_record_store.py [--sizes 1500 20000 100000]
+
+Synthetic profiles are copies of skill_gap_profiles/student_profiles.jsonl
+with fresh student ids.
+"""
+
+import os
+import json
+import time
+import shutil
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+from utils.record_store import open_records, write_records, export_json_array
+
+PROFILES_PATH = 'skill_gap_profiles/student_profiles.jsonl'
+
+
+def synthetic_profiles(base, size):
+    """Yield size profiles cycling through base with new ids"""
+    for i in range(size):
+        profile = dict(base[i % len(base)])
+        profile['student_id'] = f"S{i + 1:06d}"
+        yield profile
+
+
+def peak_mb(function):
+    """Run function and return (result, peak traced MB)"""
+    tracemalloc.start()
+    result = function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak / 1024 ** 2
+
+
+def full_pass_legacy(path):
+    """Load the JSON array and touch every profile"""
+    with open(path, 'r', encoding='utf-8') as f:
+        profiles = json.load(f)
+    return sum(len(p['skill_gaps']['missing_skills']) for p in profiles)
+
+
+def full_pass_records(path):
+    """Iterate the records lazily and touch every profile"""
+    return sum(len(p['skill_gaps']['missing_skills']) for p in open_records(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the JSONL record store")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1500, 20000, 100000])
+    parser.add_argument('--lookups', type=int, default=200)
+    args = parser.parse_args()
+
+    base = list(open_records(PROFILES_PATH))
+    workdir = tempfile.mkdtemp(prefix='record_store_')
+    rng = random.Random(42)
+
+    print(f"{'students':>9} {'write':>8} {'json.load peak':>15} {'jsonl pass peak':>16} "
+          f"{'list lookup':>12} {'index lookup':>13}")
+    try:
+        for size in args.sizes:
+            records_path = os.path.join(workdir, f'profiles_{size}.jsonl')
+            start = time.perf_counter()
+            write_records(records_path, synthetic_profiles(base, size))
+            write_time = time.perf_counter() - start
+            legacy_path = export_json_array(records_path)
+
+            total_legacy, legacy_peak = peak_mb(lambda: full_pass_legacy(legacy_path))
+            total_records, records_peak = peak_mb(lambda: full_pass_records(records_path))
+            assert total_legacy == total_records
+
+            ids = [f"S{rng.randint(1, size):06d}" for _ in range(args.lookups)]
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                profiles = json.load(f)
+            start = time.perf_counter()
+            for sid in ids:
+                next(p for p in profiles if p['student_id'] == sid)
+            list_ms = (time.perf_counter() - start) * 1000 / len(ids)
+            del profiles
+
+            reader = open_records(records_path)
+            reader.index()
+            start = time.perf_counter()
+            for sid in ids:
+                reader[sid]
+            index_ms = (time.perf_counter() - start) * 1000 / len(ids)
+
+            print(f"{size:>9} {write_time:>7.2f}s {legacy_peak:>12.1f} MB {records_peak:>13.2f} MB "
+                  f"{list_ms:>9.3f} ms {index_ms:>10.3f} ms")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Skill Gap Batch Benchmark
+=========================
+Compares the per-student analyze_skill_gaps loop with the sparse
+SkillGapEngine (F = M.J masked by S) at 1.5k and 100k students and checks
+that both produce the same skill_gaps.
+
+Usage:
+    python benchmark_skill_gap_batch.py [--sizes 1500 100000] [--multi-skill-jobs]
+
+--multi-skill-jobs splits the comma-separated required_skills of each job
+into separate skills, so jobs require ~8 skills instead of one combined
+string and the gap sets are realistically sized.
+"""
+
+import io
+import json
+import time
+import argparse
+import contextlib
+
+from skill_gap_analysis import (
+    load_embeddings, load_datasets, compute_top_job_matches, build_job_matches,
+    analyze_skill_gaps, JobCatalog, StudentCatalog, SkillGapEngine
+)
+from benchmark_skill_gap_scaling import make_synthetic
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch skill gap analysis")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1500, 100000])
+    parser.add_argument('--multi-skill-jobs', action='store_true')
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        embeddings = load_embeddings()
+        datasets = load_datasets()
+    if args.multi_skill_jobs:
+        datasets['jobs']['required_skills'] = datasets['jobs']['required_skills'].str.replace(', ', ';')
+    job_catalog = JobCatalog(datasets['jobs'])
+
+    print(f"{'students':>9} {'loop':>9} {'engine':>9} {'speedup':>8} {'identical':>10}")
+    for size in args.sizes:
+        syn_embeddings, syn_datasets = make_synthetic(embeddings, datasets, size)
+        student_catalog = StudentCatalog(syn_datasets['students'])
+        with contextlib.redirect_stdout(io.StringIO()):
+            top_indices, top_scores = compute_top_job_matches(
+                syn_embeddings['students']['embeddings'], syn_embeddings['jobs']['embeddings']
+            )
+            matches = build_job_matches(top_indices, top_scores, syn_embeddings['jobs']['ids'], job_catalog)
+        skill_lists = [student_catalog.skills(sid) for sid in syn_embeddings['students']['ids']]
+
+        start = time.perf_counter()
+        legacy = [analyze_skill_gaps(skills, m, job_catalog) for skills, m in zip(skill_lists, matches)]
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = SkillGapEngine(job_catalog).analyze(skill_lists, matches)
+        engine_time = time.perf_counter() - start
+
+        identical = sum(json.dumps(a) == json.dumps(b) for a, b in zip(legacy, batch))
+        print(f"{size:>9} {loop_time:>8.2f}s {engine_time:>8.2f}s {loop_time / engine_time:>7.1f}x "
+              f"{identical:>5}/{size}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Step 2 Scaling Report
+=====================
+Times the skill gap analysis (streaming top-k similarity, match
+formatting, profile generation) on synthetic student sets from 1.5k up to
+50k students, and the legacy per-row DataFrame lookups for comparison on
+the smaller sizes.
+
+Usage:
+    python benchmark_skill_gap_scaling.py [--sizes 1500 5000 10000 25000 50000] [--legacy-max 5000]
+
+Synthetic students are copies of the real dataset with fresh ids and
+slightly perturbed embeddings.
+"""
+
+import io
+import time
+import argparse
+import contextlib
+import numpy as np
+import pandas as pd
+
+from skill_gap_analysis import (
+    load_embeddings, load_datasets, compute_top_job_matches, build_job_matches,
+    generate_skill_gap_profiles, extract_student_skills, extract_job_skills,
+    JobCatalog, StudentCatalog
+)
+
+
+def make_synthetic(embeddings, datasets, num_students, seed=42):
+    """Tile the real students up to num_students with new ids"""
+    rng = np.random.default_rng(seed)
+    base_df = datasets['students']
+    base_emb = embeddings['students']['embeddings']
+    reps = -(-num_students // len(base_df))
+
+    student_df = pd.concat([base_df] * reps, ignore_index=True).iloc[:num_students].copy()
+    student_ids = [f"S{i + 1:06d}" for i in range(num_students)]
+    student_df['StudentID'] = student_ids
+
+    student_emb = np.tile(base_emb, (reps, 1))[:num_students]
+    student_emb = student_emb + rng.normal(0, 0.01, student_emb.shape).astype(np.float32)
+
+    synthetic_embeddings = dict(embeddings)
+    synthetic_embeddings['students'] = {'ids': student_ids, 'embeddings': student_emb}
+    synthetic_datasets = dict(datasets)
+    synthetic_datasets['students'] = student_df
+    return synthetic_embeddings, synthetic_datasets
+
+
+def run_indexed(embeddings, datasets):
+    """Run Step 2 with the id-indexed catalogs; return per-stage timings"""
+    timings = {}
+    start = time.perf_counter()
+    datasets = dict(datasets)
+    datasets['job_catalog'] = JobCatalog(datasets['jobs'])
+    datasets['student_catalog'] = StudentCatalog(datasets['students'])
+    timings['index'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    top_indices, top_scores = compute_top_job_matches(
+        embeddings['students']['embeddings'], embeddings['jobs']['embeddings']
+    )
+    timings['similarity'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches = build_job_matches(top_indices, top_scores, embeddings['jobs']['ids'], datasets['job_catalog'])
+    timings['top_matches'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    generate_skill_gap_profiles(embeddings, datasets, matches)
+    timings['profiles'] = time.perf_counter() - start
+    return timings, matches
+
+
+def run_legacy_lookups(embeddings, datasets, matches):
+    """Time the pre-index lookup pattern: boolean-mask scans per row"""
+    student_df = datasets['students']
+    job_df = datasets['jobs']
+    start = time.perf_counter()
+    for idx, student_id in enumerate(embeddings['students']['ids']):
+        student_row = student_df[student_df['StudentID'] == student_id].iloc[0]
+        extract_student_skills(student_row)
+        for match in matches[idx]:
+            # Once in get_top_job_matches, once in analyze_skill_gaps
+            job_df[job_df['job_id'] == match['job_id']].iloc[0]
+            extract_job_skills(job_df[job_df['job_id'] == match['job_id']].iloc[0])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step 2 scaling report")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1500, 5000, 10000, 25000, 50000])
+    parser.add_argument("--legacy-max", type=int, default=5000,
+                        help="largest size to also time the legacy DataFrame lookups for")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        embeddings = load_embeddings()
+        datasets = load_datasets()
+
+    print(f"{'students':>9} {'index':>8} {'similarity':>11} {'top_matches':>12} "
+          f"{'profiles':>9} {'total':>8} {'legacy lookups':>15}")
+    for size in args.sizes:
+        syn_embeddings, syn_datasets = make_synthetic(embeddings, datasets, size)
+        with contextlib.redirect_stdout(io.StringIO()):
+            timings, matches = run_indexed(syn_embeddings, syn_datasets)
+        legacy = "-"
+        if size <= args.legacy_max:
+            legacy = f"{run_legacy_lookups(syn_embeddings, syn_datasets, matches):.2f}s"
+        total = sum(timings.values())
+        print(f"{size:>9} {timings['index']:>7.2f}s {timings['similarity']:>10.2f}s "
+              f"{timings['top_matches']:>11.2f}s {timings['profiles']:>8.2f}s {total:>7.2f}s {legacy:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Skill Matcher Micro-benchmark
+=============================
+Compares the per-pattern re.search loop that extract_skills used with the
+compiled SkillMatcher, at vocabulary sizes of 60, 5k and 50k skills, and
+checks that both find the same skills.
+
+Usage:
+    python benchmark_skill_matcher.py [--sizes 60 5000 50000] [--texts 300] [--legacy-texts 30]
+
+Vocabularies start from SKILL_PATTERNS and the catalog skills and are
+padded with synthetic multi-word skills; texts are student skill and
+project descriptions.
+"""
+
+import re
+import time
+import random
+import argparse
+import pandas as pd
+
+from api.dt_pipeline.skill_extractor import SKILL_PATTERNS
+from utils.skill_matcher import SkillMatcher, catalog_vocabulary
+
+STUDENT_FILE = 'students_1500_PRODUCTION_READY.csv'
+
+
+def build_vocabulary(size, seed=42):
+    """SKILL_PATTERNS + catalog skills, padded with synthetic skills to size"""
+    base = list(dict.fromkeys(SKILL_PATTERNS + catalog_vocabulary(student_data_path=STUDENT_FILE)))
+    words = sorted({w for skill in base for w in skill.split()})
+    rng = random.Random(seed)
+    vocabulary = base[:size]
+    seen = set(vocabulary)
+    while len(vocabulary) < size:
+        skill = " ".join(rng.sample(words, rng.randint(1, 3))) + f" {rng.randint(0, 999)}"
+        if skill not in seen:
+            seen.add(skill)
+            vocabulary.append(skill)
+    return vocabulary
+
+
+def load_texts(count):
+    """Free-text style student descriptions"""
+    df = pd.read_csv(STUDENT_FILE).head(count)
+    return (
+        "I know " + df['Skills'].fillna('').str.replace(';', ', ') +
+        ". Projects: " + df['Projects'].fillna('').str.replace(';', ', ') +
+        ". Tools: " + df['TechnicalSkills'].fillna('').str.replace(';', ', ')
+    ).tolist()
+
+
+def legacy_find(vocabulary, text):
+    """The previous extract_skills loop: one regex search per skill"""
+    text_lower = text.lower()
+    return {skill for skill in vocabulary if re.search(r'\b' + re.escape(skill) + r'\b', text_lower)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark skill matching")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[60, 5000, 50000])
+    parser.add_argument('--texts', type=int, default=300)
+    parser.add_argument('--legacy-texts', type=int, default=30,
+                        help="texts timed with the per-pattern loop (it is slow at large sizes)")
+    args = parser.parse_args()
+
+    texts = load_texts(args.texts)
+    print(f"{'patterns':>9} {'build':>9} {'matcher':>14} {'re.search loop':>16} {'speedup':>8} {'agree':>7}")
+    for size in args.sizes:
+        vocabulary = build_vocabulary(size)
+
+        start = time.perf_counter()
+        matcher = SkillMatcher(vocabulary)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = [{matcher.patterns[i] for _, _, i in matcher.find_all(t)} for t in texts]
+        matcher_us = (time.perf_counter() - start) / len(texts) * 1e6
+
+        legacy_texts = texts[:args.legacy_texts]
+        start = time.perf_counter()
+        legacy = [legacy_find(vocabulary, t) for t in legacy_texts]
+        legacy_us = (time.perf_counter() - start) / len(legacy_texts) * 1e6
+
+        agree = sum(a == b for a, b in zip(found, legacy))
+        print(f"{len(matcher):>9} {build_time * 1000:>7.1f}ms {matcher_us:>10.1f} us/t "
+              f"{legacy_us:>12.1f} us/t {legacy_us / matcher_us:>7.1f}x {agree:>3}/{len(legacy)}")
+
+
+if __name__ == "__main__":
+    main()
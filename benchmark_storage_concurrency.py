@@ -0,0 +1,124 @@
+"""
+Student Storage Concurrency Benchmark
+=====================================
+Creates students from several processes x threads at once (like uvicorn
+--workers N handling parallel POSTs) and counts duplicate student ids:
+- legacy: the former flat-file scheme (id = CSV row count + 1, then append
+  the row), which hands the same id to concurrent requests
+- sqlite: api/utils/storage.py (AUTOINCREMENT id sequence in WAL mode)
+
+Usage:
+    python benchmark_storage_concurrency.py [--processes 4] [--threads 8] [--requests 50]
+    python benchmark_storage_concurrency.py --url http://127.0.0.1:8000 [--threads 16] [--requests 20]
+
+--url POSTs minimal forms to a running API instead and checks the
+student_ids it returns.
+"""
+
+import os
+import csv
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+
+PAYLOAD = {"name": "Benchmark Student", "email": "bench@example.com",
+           "department": "Computer Science", "academic_level": 3, "gpa": 3.2}
+
+
+def legacy_create(csv_file):
+    """One student through the former next_student_id + append_student_csv"""
+    count = 0
+    if os.path.exists(csv_file):
+        with open(csv_file, "r", newline="", encoding="utf-8") as f:
+            count = max(0, len(list(csv.reader(f))) - 1)
+    student_id = f"S{count + 1501:04d}"
+    exists = os.path.exists(csv_file)
+    with open(csv_file, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if not exists:
+            writer.writerow(["student_id", "name", "email", "department", "level", "gpa", "created_at"])
+        writer.writerow([student_id, PAYLOAD["name"], PAYLOAD["email"], PAYLOAD["department"],
+                         PAYLOAD["academic_level"], PAYLOAD["gpa"], datetime.utcnow().isoformat()])
+    return student_id
+
+
+def sqlite_create(_):
+    """One student through api.utils.storage"""
+    from api.utils.storage import next_student_id, save_student
+    student_id = next_student_id()
+    save_student(student_id, dict(PAYLOAD, student_id=student_id))
+    return student_id
+
+
+def run_process(scheme, csv_file, threads, requests):
+    """Create threads x requests students in this process; return their ids"""
+    create = legacy_create if scheme == "legacy" else sqlite_create
+    with ThreadPoolExecutor(threads) as pool:
+        return list(pool.map(create, [csv_file] * (threads * requests)))
+
+
+def run_local(scheme, workdir, processes, threads, requests):
+    """Run one scheme from several processes; return (ids, seconds)"""
+    csv_file = os.path.join(workdir, f"{scheme}.csv")
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(processes, mp_context=context) as pool:
+        futures = [pool.submit(run_process, scheme, csv_file, threads, requests)
+                   for _ in range(processes)]
+        ids = [sid for future in futures for sid in future.result()]
+    return ids, time.perf_counter() - start
+
+
+def post_student(url):
+    """POST one minimal form to the API; return the student_id"""
+    import httpx
+    response = httpx.post(f"{url}/create_digital_twin", json={"full_name": "Benchmark Student"},
+                          timeout=300)
+    response.raise_for_status()
+    return response.json()["student_id"]
+
+
+def report(label, ids, seconds):
+    """Print the duplicate count for a run"""
+    duplicates = sum(n - 1 for n in Counter(ids).values() if n > 1)
+    print(f"{label:>8} {len(ids):>9} {len(set(ids)):>7} {duplicates:>11} "
+          f"{seconds:>8.2f}s {len(ids) / seconds:>9.0f}/s")
+    return duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent student id allocation")
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50, help="Students per thread")
+    parser.add_argument('--url', help="Benchmark a running API instead of the storage module")
+    args = parser.parse_args()
+
+    print(f"{'scheme':>8} {'students':>9} {'unique':>7} {'duplicates':>11} {'time':>9} {'rate':>11}")
+    if args.url:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            ids = list(pool.map(post_student, [args.url] * (args.threads * args.requests)))
+        report("api", ids, time.perf_counter() - start)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="student_storage_")
+    # Read by api.utils.storage when the spawned workers import it
+    os.environ["DATA_DIR"] = workdir
+    os.environ["STORAGE_DB"] = os.path.join(workdir, "digital_twin.db")
+    try:
+        for scheme in ("legacy", "sqlite"):
+            ids, seconds = run_local(scheme, workdir, args.processes, args.threads, args.requests)
+            duplicates = report(scheme, ids, seconds)
+        assert duplicates == 0, "sqlite storage handed out duplicate student ids"
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
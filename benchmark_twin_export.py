@@ -0,0 +1,147 @@
+"""
+Digital Twin Export Benchmark
+=============================
+Fills a temporary student database with N students and their cached
+twins, serves it with uvicorn and measures GET /digital_twins/export:
+rows/sec, MB/sec, time to first byte and the server's resident memory
+while streaming (sampled from /proc), for NDJSON, CSV, a department
+filter and an export resumed from a cursor token. The baseline is the
+former way to pull twins: one GET /get_digital_twin per student, timed
+on a sample and extrapolated to N.
+
+Usage:
+    python benchmark_twin_export.py [--students 100000] [--sample 2000] [--app-dir .]
+"""
+
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+import httpx
+
+from benchmark_api_concurrency import student_form, start_server
+
+DEPARTMENTS = ["CS", "IS", "AI", "IT"]
+DISTINCT_FORMS = 1000
+CHUNK = 5000
+
+
+def populate(data_dir, students):
+    """Store students with current cached twins; returns the student ids"""
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["STORAGE_DB"] = os.path.join(data_dir, "digital_twin.db")
+    from api.utils.storage import next_student_ids, save_students
+    from api.utils.twin_cache import twin_cache
+    from api.dt_pipeline.student_pipeline import run_student_pipeline_batch
+
+    forms = [dict(student_form(i), department=DEPARTMENTS[i % len(DEPARTMENTS)]) for i in range(DISTINCT_FORMS)]
+    twins = run_student_pipeline_batch(forms)
+    student_ids = next_student_ids(students)
+    for start in range(0, students, CHUNK):
+        rows = []
+        for i in range(start, min(start + CHUNK, students)):
+            payload = dict(forms[i % DISTINCT_FORMS], student_id=student_ids[i])
+            rows.append((student_ids[i], payload, dict(twins[i % DISTINCT_FORMS], input_summary=payload)))
+        save_students([(sid, payload) for sid, payload, _ in rows])
+        twin_cache.put_many([(twin_cache.key(sid, payload), twin) for sid, payload, twin in rows])
+    return student_ids
+
+
+def rss_mb(pid):
+    """Resident memory of a process in MB"""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def export(url, pid, params):
+    """Stream one export; returns (rows, bytes, seconds, first byte s, peak RSS MB, last cursor)"""
+    peak = [rss_mb(pid)]
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], rss_mb(pid))
+            time.sleep(0.05)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    rows = size = 0
+    first = cursor = None
+    start = time.perf_counter()
+    with httpx.stream("GET", f"{url}/digital_twins/export", params=params, timeout=600) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            first = first or time.perf_counter() - start
+            size += len(line) + 1
+            if params.get("format") == "csv":
+                rows += 1
+            elif line:
+                record = json.loads(line)
+                rows += "student_id" in record
+                cursor = record.get("cursor", record.get("next_cursor"))
+    seconds = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    if params.get("format") == "csv":
+        rows -= 1  # header
+    return rows, size, seconds, first, peak[0], cursor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming digital twin export")
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--sample', type=int, default=2000, help="Students fetched one by one for the baseline")
+    parser.add_argument('--app-dir', default='.')
+    parser.add_argument('--port', type=int, default=8767)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="twin_export_")
+    process = None
+    try:
+        start = time.perf_counter()
+        student_ids = populate(data_dir, args.students)
+        db_mb = os.path.getsize(os.path.join(data_dir, "digital_twin.db")) / 1e6
+        print(f"populated {args.students} students in {time.perf_counter() - start:.1f} s ({db_mb:.0f} MB database)")
+
+        process, url = start_server(args.app_dir, args.port, 1, data_dir)
+        print(f"server RSS at start: {rss_mb(process.pid):.0f} MB\n")
+        print(f"{'export':>22} {'rows':>8} {'seconds':>8} {'rows/s':>8} {'MB/s':>7} {'first byte':>11} {'peak RSS':>9}")
+
+        half = {"format": "ndjson", "limit": args.students // 2}
+        _, _, _, _, _, cursor = export(url, process.pid, half)
+        runs = [
+            ("ndjson", {"format": "ndjson"}),
+            ("csv", {"format": "csv"}),
+            ("ndjson department=CS", {"format": "ndjson", "department": "CS"}),
+            ("ndjson resumed at 50%", {"format": "ndjson", "cursor": cursor}),
+        ]
+        for label, params in runs:
+            rows, size, seconds, first, peak, _ = export(url, process.pid, params)
+            print(f"{label:>22} {rows:>8} {seconds:>8.2f} {rows / seconds:>8.0f} {size / 1e6 / seconds:>7.1f} "
+                  f"{first * 1000:>8.0f} ms {peak:>6.0f} MB")
+
+        sample = student_ids[::max(1, len(student_ids) // args.sample)][:args.sample]
+        with httpx.Client(base_url=url, timeout=120) as client:
+            start = time.perf_counter()
+            for student_id in sample:
+                client.get(f"/get_digital_twin/{student_id}").raise_for_status()
+            seconds = time.perf_counter() - start
+        rate = len(sample) / seconds
+        print(f"{'GET per student':>22} {len(sample):>8} {seconds:>8.2f} {rate:>8.0f} {'':>7} {'':>11} {'':>9}"
+              f"  (~{args.students / rate:.0f} s for all {args.students})")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        shutil.rmtree(data_dir)
+
+
+if __name__ == "__main__":
+    main()
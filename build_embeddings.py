@@ -6,10 +6,22 @@ into 384-dimensional numerical vectors using Sentence Transformers.
 
 Model: all-MiniLM-L6-v2 (lightweight, fast, perfect for similarity matching)
 Used by: LinkedIn, Coursera, Udemy recommendation systems
+
+Usage:
+    python build_embeddings.py [--incremental] [--no-cache] [--workers N] [--batch-size N]
+
+With --incremental, each row's combined text is hashed and vectors whose
+text is unchanged are reused from the previous store; only new or changed
+texts are encoded. All encoding goes through the shared text -> vector
+cache (embeddings/encoder_cache.sqlite) unless --no-cache is given.
+With --workers N > 1 the four sets are encoded together on N processes in
+length-sorted batches.
 """
 
 import sys
 import os
+import hashlib
+import argparse
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -17,13 +29,16 @@ if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
 import pandas as pd
-from sentence_transformers import SentenceTransformer
-import pickle
 import numpy as np
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.embedding_store import save_embedding_set, load_embedding_set, load_text_hashes
+from utils.vector_index import remove_indexes
+from utils.encoder_cache import CachedEncoder, DEFAULT_CACHE_PATH
+from utils.parallel_encoder import ParallelEncoder
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -79,20 +94,223 @@ def filter_high_grades(grades_str):
     
     return " ".join(high_grade_subjects)
 
+# ============================================================================
+# TEXT BUILDERS
+# ============================================================================
+
+def combine_student_skills(row):
+    """Student skill text: skills, completed courses, high-grade subjects, projects"""
+    parts = []
+
+    # Core skills
+    parts.append(safe_str(row.get('Skills')))
+    parts.append(safe_str(row.get('TechnicalSkills')))
+    parts.append(safe_str(row.get('SoftSkills')))
+
+    # Completed courses show acquired skills
+    parts.append(safe_str(row.get('CoursesCompleted')))
+
+    # High-grade subjects indicate strengths
+    if 'MajorCourseGrades' in row:
+        high_grade_subjects = filter_high_grades(row['MajorCourseGrades'])
+        parts.append(high_grade_subjects)
+
+    # Projects show applied skills
+    parts.append(safe_str(row.get('Projects')))
+
+    return " ".join([p for p in parts if p])
+
+def combine_job_skills(row):
+    """Job skill text: title, required skills, certificates, responsibilities"""
+    parts = []
+
+    parts.append(safe_str(row.get('job_title')))
+    parts.append(safe_str(row.get('required_skills')))
+
+    # Check for various possible column names
+    for cert_col in ['certificates', 'certificates_required', 'required_certificates']:
+        if cert_col in row:
+            parts.append(safe_str(row.get(cert_col)))
+            break
+
+    for resp_col in ['responsibilities', 'job_description', 'description']:
+        if resp_col in row:
+            parts.append(safe_str(row.get(resp_col)))
+            break
+
+    return " ".join([p for p in parts if p])
+
+def combine_course_skills(row):
+    """Course skill text: title, description, skills gained, level, track"""
+    parts = []
+
+    # Check for various possible column names
+    for title_col in ['CourseTitle', 'CourseName', 'Title', 'title']:
+        if title_col in row:
+            parts.append(safe_str(row.get(title_col)))
+            break
+
+    parts.append(safe_str(row.get('Description')))
+    parts.append(safe_str(row.get('SkillsGained')))
+    parts.append(safe_str(row.get('Level')))
+    parts.append(safe_str(row.get('Track')))
+
+    return " ".join([p for p in parts if p])
+
+def combine_student_interests(row):
+    """Student interest text: interests, preferred track, extracurriculars, projects"""
+    parts = []
+
+    # Check for various possible column names
+    for interest_col in ['UserInterests', 'Interests', 'interests']:
+        if interest_col in row:
+            parts.append(safe_str(row.get(interest_col)))
+            break
+
+    parts.append(safe_str(row.get('PreferredTrack')))
+    parts.append(safe_str(row.get('Extracurriculars')))
+    parts.append(safe_str(row.get('Projects')))
+
+    return " ".join([p for p in parts if p])
+
+# ============================================================================
+# INCREMENTAL ENCODING
+# ============================================================================
+
+def text_hash(text):
+    """Content hash of an embedding source text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def load_previous(name, ids):
+    """
+    Vectors of the previous store keyed by text hash.
+
+    Returns:
+        Tuple of (hash -> row dict, previous embeddings, deleted row count);
+        empty when the set has no hashes yet or used another model
+    """
+    previous_hashes = load_text_hashes(name, OUTPUT_DIR)
+    if previous_hashes is None:
+        log(f"  No previous hashes for {name}, encoding all rows")
+        return {}, None, 0
+
+    previous = load_embedding_set(name, OUTPUT_DIR)
+    if previous['metadata'].get('model_name') != MODEL_NAME:
+        log(f"  Previous {name} embeddings used another model, encoding all rows")
+        return {}, None, 0
+
+    deleted = len(set(previous['ids']) - set(ids))
+    rows = {h: row for row, h in enumerate(previous_hashes)}
+    return rows, previous['embeddings'], deleted
+
+def plan_encoding(name, ids, texts, incremental=False):
+    """
+    Work out which texts of an embedding set still need encoding.
+
+    Each distinct text is encoded once. In incremental mode texts whose hash
+    is in the previous store reuse the stored vector instead.
+
+    Returns:
+        Dictionary with the set's ids, text hashes, previous vectors and the
+        distinct texts to encode
+    """
+    hashes = [text_hash(t) for t in texts]
+    previous_rows, previous_embeddings, deleted = {}, None, 0
+    if incremental:
+        previous_rows, previous_embeddings, deleted = load_previous(name, ids)
+
+    text_by_hash = dict(zip(hashes, texts))
+    to_encode = [h for h in text_by_hash if h not in previous_rows]
+    return {
+        'name': name,
+        'ids': ids,
+        'hashes': hashes,
+        'previous_rows': previous_rows,
+        'previous_embeddings': previous_embeddings,
+        'deleted': deleted,
+        'to_encode': to_encode,
+        'texts': [text_by_hash[h] for h in to_encode],
+    }
+
+def assemble_embeddings(plan, encoded):
+    """
+    Combine reused and newly encoded vectors in row order.
+
+    Returns:
+        Tuple of (embeddings, counts) where counts holds the number of
+        'reused', 'encoded' and 'deleted' rows
+    """
+    hashes = plan['hashes']
+    previous_rows = plan['previous_rows']
+    encoded_rows = {h: row for row, h in enumerate(plan['to_encode'])}
+
+    embeddings = np.empty((len(hashes), 384), dtype=np.float32)
+    reused = [i for i, h in enumerate(hashes) if h in previous_rows]
+    fresh = [i for i, h in enumerate(hashes) if h not in previous_rows]
+    if reused:
+        embeddings[reused] = plan['previous_embeddings'][[previous_rows[hashes[i]] for i in reused]]
+    if fresh:
+        embeddings[fresh] = encoded[[encoded_rows[hashes[i]] for i in fresh]]
+
+    counts = {'reused': len(reused), 'encoded': len(fresh), 'deleted': plan['deleted']}
+    log(f"  {plan['name']}: reused {counts['reused']}, re-encoded {counts['encoded']} "
+        f"({len(plan['to_encode'])} distinct texts), deleted {counts['deleted']}")
+    return embeddings, counts
+
+def encode_corpora(model, plans, batch_size=32):
+    """
+    Encode the pending texts of all embedding sets in a single call.
+
+    With a parallel encoder the length-sorted batches of every corpus are
+    spread over the workers together, so the sets are encoded concurrently.
+
+    Returns:
+        Dictionary of set name -> (embeddings, counts)
+    """
+    pending = [text for plan in plans for text in plan['texts']]
+    encoded = np.zeros((0, 384), dtype=np.float32)
+    if pending:
+        log(f"Encoding {len(pending)} texts from {len(plans)} sets...")
+        encoded = model.encode(
+            pending,
+            show_progress_bar=True,
+            batch_size=batch_size,
+            convert_to_numpy=True
+        )
+
+    results = {}
+    offset = 0
+    for plan in plans:
+        count = len(plan['texts'])
+        results[plan['name']] = assemble_embeddings(plan, encoded[offset:offset + count])
+        offset += count
+    return results
+
 # ============================================================================
 # MAIN EMBEDDING GENERATION
 # ============================================================================
 
-def generate_embeddings():
+def generate_embeddings(incremental=False, use_cache=True, workers=1, batch_size=32):
     log("="*70)
-    log("SKILL EMBEDDINGS GENERATION - STEP 1")
+    log("SKILL EMBEDDINGS GENERATION - STEP 1" + (" (INCREMENTAL)" if incremental else ""))
     log("="*70)
     
     # Load model
     log(f"Loading Sentence Transformer model: {MODEL_NAME}")
     log("This may take a few minutes on first run (downloading model)...")
     try:
-        model = SentenceTransformer(MODEL_NAME, device='cpu')
+        if workers > 1:
+            # Each worker process loads its own copy on first use
+            encoder = ParallelEncoder(MODEL_NAME, workers=workers, batch_size=batch_size)
+            log(f"[OK] Encoding with {workers} worker processes, batch size {batch_size}")
+        else:
+            from sentence_transformers import SentenceTransformer
+            encoder = SentenceTransformer(MODEL_NAME, device='cpu')
+        model = CachedEncoder(
+            MODEL_NAME,
+            cache_path=DEFAULT_CACHE_PATH if use_cache else None,
+            model=encoder
+        )
         log(f"[OK] Model loaded successfully (embedding dimension: 384)")
     except Exception as e:
         log(f"[ERROR] Failed to load model: {e}")
@@ -116,153 +334,27 @@ def generate_embeddings():
     }
     
     # ========================================================================
-    # 1. STUDENT SKILL EMBEDDINGS
+    # 1. TEXTS FOR ALL EMBEDDING SETS
     # ========================================================================
     log("\n" + "="*70)
-    log("1. GENERATING STUDENT SKILL EMBEDDINGS")
+    log("1. BUILDING STUDENT, JOB, COURSE AND INTEREST TEXTS")
     log("="*70)
     
     try:
         df_students = pd.read_csv(STUDENT_FILE)
         log(f"[OK] Loaded {len(df_students)} students from {STUDENT_FILE}")
-        
-        # Combine fields for Student Skill Vector
-        # Fields: Skills, TechnicalSkills, SoftSkills, CoursesCompleted, 
-        #         MajorCourseGrades (high grades), Projects
-        def combine_student_skills(row):
-            parts = []
-            
-            # Core skills
-            parts.append(safe_str(row.get('Skills')))
-            parts.append(safe_str(row.get('TechnicalSkills')))
-            parts.append(safe_str(row.get('SoftSkills')))
-            
-            # Completed courses show acquired skills
-            parts.append(safe_str(row.get('CoursesCompleted')))
-            
-            # High-grade subjects indicate strengths
-            if 'MajorCourseGrades' in row:
-                high_grade_subjects = filter_high_grades(row['MajorCourseGrades'])
-                parts.append(high_grade_subjects)
-            
-            # Projects show applied skills
-            parts.append(safe_str(row.get('Projects')))
-            
-            return " ".join([p for p in parts if p])
-        
         student_texts = df_students.apply(combine_student_skills, axis=1).tolist()
         student_ids = df_students['StudentID'].tolist()
+        # Same IDs as students
+        interest_texts = df_students.apply(combine_student_interests, axis=1).tolist()
         
-        log(f"Processing {len(student_texts)} student skill vectors...")
-        student_embeddings = model.encode(
-            student_texts, 
-            show_progress_bar=True,
-            batch_size=32,
-            convert_to_numpy=True
-        )
-        
-        # Save
-        output_path = os.path.join(OUTPUT_DIR, 'embeddings_students.pkl')
-        with open(output_path, 'wb') as f:
-            pickle.dump({
-                'ids': student_ids,
-                'embeddings': student_embeddings,
-                'metadata': metadata
-            }, f)
-        
-        log(f"[OK] Saved {len(student_embeddings)} student embeddings to {output_path}")
-        log(f"  Shape: {student_embeddings.shape}")
-        
-    except Exception as e:
-        log(f"[ERROR] Failed to generate student embeddings: {e}")
-        return
-    
-    # ========================================================================
-    # 2. JOB SKILL EMBEDDINGS
-    # ========================================================================
-    log("\n" + "="*70)
-    log("2. GENERATING JOB SKILL EMBEDDINGS")
-    log("="*70)
-    
-    try:
         df_jobs = pd.read_csv(JOB_FILE)
         log(f"[OK] Loaded {len(df_jobs)} jobs from {JOB_FILE}")
-        
-        # Combine: job_title, required_skills, certificates, responsibilities
-        def combine_job_skills(row):
-            parts = []
-            
-            parts.append(safe_str(row.get('job_title')))
-            parts.append(safe_str(row.get('required_skills')))
-            
-            # Check for various possible column names
-            for cert_col in ['certificates', 'certificates_required', 'required_certificates']:
-                if cert_col in row:
-                    parts.append(safe_str(row.get(cert_col)))
-                    break
-            
-            for resp_col in ['responsibilities', 'job_description', 'description']:
-                if resp_col in row:
-                    parts.append(safe_str(row.get(resp_col)))
-                    break
-            
-            return " ".join([p for p in parts if p])
-        
         job_texts = df_jobs.apply(combine_job_skills, axis=1).tolist()
         job_ids = df_jobs['job_id'].tolist() if 'job_id' in df_jobs.columns else list(range(len(df_jobs)))
         
-        log(f"Processing {len(job_texts)} job skill vectors...")
-        job_embeddings = model.encode(
-            job_texts,
-            show_progress_bar=True,
-            batch_size=32,
-            convert_to_numpy=True
-        )
-        
-        # Save
-        output_path = os.path.join(OUTPUT_DIR, 'embeddings_jobs.pkl')
-        with open(output_path, 'wb') as f:
-            pickle.dump({
-                'ids': job_ids,
-                'embeddings': job_embeddings,
-                'metadata': metadata
-            }, f)
-        
-        log(f"[OK] Saved {len(job_embeddings)} job embeddings to {output_path}")
-        log(f"  Shape: {job_embeddings.shape}")
-        
-    except Exception as e:
-        log(f"[ERROR] Failed to generate job embeddings: {e}")
-        return
-    
-    # ========================================================================
-    # 3. COURSE SKILL EMBEDDINGS
-    # ========================================================================
-    log("\n" + "="*70)
-    log("3. GENERATING COURSE SKILL EMBEDDINGS")
-    log("="*70)
-    
-    try:
         df_courses = pd.read_csv(COURSE_FILE)
         log(f"[OK] Loaded {len(df_courses)} courses from {COURSE_FILE}")
-        
-        # Combine: CourseTitle, Description, SkillsGained, Level, Track
-        def combine_course_skills(row):
-            parts = []
-            
-            # Check for various possible column names
-            for title_col in ['CourseTitle', 'CourseName', 'Title', 'title']:
-                if title_col in row:
-                    parts.append(safe_str(row.get(title_col)))
-                    break
-            
-            parts.append(safe_str(row.get('Description')))
-            parts.append(safe_str(row.get('SkillsGained')))
-            parts.append(safe_str(row.get('Level')))
-            parts.append(safe_str(row.get('Track')))
-            
-            return " ".join([p for p in parts if p])
-        
         course_texts = df_courses.apply(combine_course_skills, axis=1).tolist()
         
         # Try to get CourseID, fall back to index
@@ -273,78 +365,53 @@ def generate_embeddings():
         else:
             course_ids = list(range(len(df_courses)))
         
-        log(f"Processing {len(course_texts)} course skill vectors...")
-        course_embeddings = model.encode(
-            course_texts,
-            show_progress_bar=True,
-            batch_size=32,
-            convert_to_numpy=True
-        )
-        
-        # Save
-        output_path = os.path.join(OUTPUT_DIR, 'embeddings_courses.pkl')
-        with open(output_path, 'wb') as f:
-            pickle.dump({
-                'ids': course_ids,
-                'embeddings': course_embeddings,
-                'metadata': metadata
-            }, f)
-        
-        log(f"[OK] Saved {len(course_embeddings)} course embeddings to {output_path}")
-        log(f"  Shape: {course_embeddings.shape}")
+        plans = [
+            plan_encoding('students', student_ids, student_texts, incremental),
+            plan_encoding('jobs', job_ids, job_texts, incremental),
+            plan_encoding('courses', course_ids, course_texts, incremental),
+            plan_encoding('interests', student_ids, interest_texts, incremental),
+        ]
         
     except Exception as e:
-        log(f"[ERROR] Failed to generate course embeddings: {e}")
+        log(f"[ERROR] Failed to build embedding texts: {e}")
         return
     
     # ========================================================================
-    # 4. STUDENT INTEREST EMBEDDINGS
+    # 2. ENCODE ALL SETS
     # ========================================================================
     log("\n" + "="*70)
-    log("4. GENERATING STUDENT INTEREST EMBEDDINGS")
+    log("2. GENERATING SKILL AND INTEREST EMBEDDINGS")
     log("="*70)
     
     try:
-        # Combine: UserInterests, PreferredTrack, Extracurriculars, Projects
-        def combine_student_interests(row):
-            parts = []
-            
-            # Check for various possible column names
-            for interest_col in ['UserInterests', 'Interests', 'interests']:
-                if interest_col in row:
-                    parts.append(safe_str(row.get(interest_col)))
-                    break
-            
-            parts.append(safe_str(row.get('PreferredTrack')))
-            parts.append(safe_str(row.get('Extracurriculars')))
-            parts.append(safe_str(row.get('Projects')))
-            
-            return " ".join([p for p in parts if p])
-        
-        interest_texts = df_students.apply(combine_student_interests, axis=1).tolist()
-        
-        log(f"Processing {len(interest_texts)} interest vectors...")
-        interest_embeddings = model.encode(
-            interest_texts,
-            show_progress_bar=True,
-            batch_size=32,
-            convert_to_numpy=True
-        )
-        
-        # Save
-        output_path = os.path.join(OUTPUT_DIR, 'embeddings_interests.pkl')
-        with open(output_path, 'wb') as f:
-            pickle.dump({
-                'ids': student_ids,  # Same IDs as students
-                'embeddings': interest_embeddings,
-                'metadata': metadata
-            }, f)
-        
-        log(f"[OK] Saved {len(interest_embeddings)} interest embeddings to {output_path}")
-        log(f"  Shape: {interest_embeddings.shape}")
-        
+        results = encode_corpora(model, plans, batch_size=batch_size)
+    except Exception as e:
+        log(f"[ERROR] Failed to generate embeddings: {e}")
+        return
+    finally:
+        if isinstance(encoder, ParallelEncoder):
+            encoder.close()
+    
+    # ========================================================================
+    # 3. SAVE
+    # ========================================================================
+    log("\n" + "="*70)
+    log("3. SAVING EMBEDDINGS")
+    log("="*70)
+    
+    counts = {}
+    try:
+        for plan in plans:
+            embeddings, counts[plan['name']] = results[plan['name']]
+            output_path = save_embedding_set(plan['name'], plan['ids'], embeddings, metadata, OUTPUT_DIR,
+                                             text_hashes=plan['hashes'])
+            log(f"[OK] Saved {len(embeddings)} {plan['name']} embeddings to {output_path}")
+            log(f"  Shape: {embeddings.shape}")
+            # Persisted vector indexes map positions of the old rows
+            for path in remove_indexes(plan['name'], os.path.join(OUTPUT_DIR, 'index')):
+                log(f"  Removed stale vector index {path}")
     except Exception as e:
-        log(f"[ERROR] Failed to generate interest embeddings: {e}")
+        log(f"[ERROR] Failed to save embeddings: {e}")
         return
     
     # ========================================================================
@@ -356,13 +423,31 @@ def generate_embeddings():
     log(f"All embeddings saved to: {OUTPUT_DIR}/")
     log(f"")
     log(f"Files created:")
-    log(f"  - embeddings_students.pkl   ({len(student_embeddings)} vectors)")
-    log(f"  - embeddings_jobs.pkl       ({len(job_embeddings)} vectors)")
-    log(f"  - embeddings_courses.pkl    ({len(course_embeddings)} vectors)")
-    log(f"  - embeddings_interests.pkl  ({len(interest_embeddings)} vectors)")
+    log(f"  - embeddings_students.npy   ({len(results['students'][0])} vectors)")
+    log(f"  - embeddings_jobs.npy       ({len(results['jobs'][0])} vectors)")
+    log(f"  - embeddings_courses.npy    ({len(results['courses'][0])} vectors)")
+    log(f"  - embeddings_interests.npy  ({len(results['interests'][0])} vectors)")
+    log(f"")
+    log(f"Rows reused / re-encoded / deleted:")
+    for name, c in counts.items():
+        log(f"  - {name:<10} {c['reused']:>6} / {c['encoded']:>6} / {c['deleted']:>6}")
+    log(f"")
+    cache = model.stats()
+    log(f"Encoder cache: {cache['requested']} texts, {cache['encoded']} encoded, "
+        f"hit rate {cache['hit_rate']:.1%}, saved {cache['dedup_rate']:.1%} of encodes")
     log(f"")
     log(f"Next step: Run verify_embeddings.py to validate the embeddings")
     log("="*70)
 
 if __name__ == "__main__":
-    generate_embeddings()
+    parser = argparse.ArgumentParser(description="Generate Step 1 skill embeddings")
+    parser.add_argument('--incremental', action='store_true',
+                        help="reuse vectors of unchanged texts from the previous store")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="bypass the persistent text -> vector cache")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="encoding processes (1 encodes in this process)")
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+    generate_embeddings(incremental=args.incremental, use_cache=not args.no_cache,
+                        workers=args.workers, batch_size=args.batch_size)
@@ -0,0 +1,91 @@
+"""
+Skill Vocabulary Builder
+========================
+Interns every normalized skill of the student, job and course catalogs
+into one SkillVocabulary and encodes each catalog's skill sets as sorted
+int32 id arrays, persisted next to the embeddings:
+
+    embeddings/skill_vocabulary.json
+    embeddings/skill_sets_students.npz   (keyed by StudentID)
+    embeddings/skill_sets_jobs.npz       (keyed by job_id)
+    embeddings/skill_sets_courses.npz    (keyed by course row)
+
+Usage:
+    python build_skill_vocabulary.py [--embedding-dir embeddings]
+
+Consumers:
+    recommendation_engine.py (course coverage)
+"""
+
+import time
+import argparse
+from datetime import datetime
+
+import pandas as pd
+
+from skill_gap_analysis import extract_student_skills, extract_job_skills
+from utils.skill_parser import parse_skill_list
+from utils.skill_vocabulary import (
+    VOCABULARY_DIR, SkillVocabulary, SkillSets, save_skill_vocabulary, vocabulary_paths
+)
+
+FILES = {
+    'students': 'students_1500_PRODUCTION_READY.csv',
+    'jobs': 'egypt_jobs_full_1500_cleaned.csv',
+    'courses': 'digital_twin_courses_1500_cleaned.csv',
+}
+
+
+def log(message):
+    """Print timestamped log message"""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+
+def catalog_skill_lists():
+    """
+    Skill lists of every catalog, extracted the way the pipeline does.
+
+    Returns:
+        Dictionary of name -> (ids, skill lists)
+    """
+    df_students = pd.read_csv(FILES['students'], encoding='utf-8')
+    # Students can appear on several rows; the pipeline uses the first one
+    df_students = df_students.drop_duplicates(subset='StudentID', keep='first')
+    df_jobs = pd.read_csv(FILES['jobs'], encoding='utf-8')
+    df_courses = pd.read_csv(FILES['courses'], encoding='utf-8')
+
+    return {
+        'students': (df_students['StudentID'].tolist(),
+                     [extract_student_skills(row) for _, row in df_students.iterrows()]),
+        'jobs': (df_jobs['job_id'].tolist(),
+                 [extract_job_skills(row) for _, row in df_jobs.iterrows()]),
+        'courses': (list(range(len(df_courses))),
+                    [parse_skill_list(str(s)) for s in df_courses['SkillsGained']]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the shared skill vocabulary")
+    parser.add_argument('--embedding-dir', default=VOCABULARY_DIR)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalogs = catalog_skill_lists()
+    vocabulary = SkillVocabulary.from_skill_lists(*(lists for _, lists in catalogs.values()))
+    log(f"Vocabulary: {len(vocabulary)} skills")
+
+    sets = {}
+    for name, (ids, skill_lists) in catalogs.items():
+        sets[name] = SkillSets.from_lists(ids, skill_lists, vocabulary)
+        counts = sets[name].counts()
+        log(f"{name}: {len(ids)} rows, {counts.sum()} skill ids "
+            f"(avg {counts.mean():.1f} per row)")
+
+    save_skill_vocabulary(vocabulary, sets, args.embedding_dir)
+    log(f"Saved {vocabulary_paths(args.embedding_dir)['vocabulary']} "
+        f"and {len(sets)} skill set files in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
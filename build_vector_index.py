@@ -0,0 +1,85 @@
+"""
+Vector Index Builder
+====================
+Builds exact (flat) and approximate (IVF / HNSW) vector indexes over the
+Step 1 embedding sets, persists them under embeddings/index/ and reports
+recall@k and query latency of each approximate index against exact search.
+
+Usage:
+    python build_vector_index.py [--backend ivf] [--sets jobs courses students] [--k 5]
+                                 [--nlist N] [--nprobe N]
+
+Consumers:
+    skill_gap_analysis.py --index-backend ivf
+    recommendation_engine.py --index-backend ivf
+    VECTOR_INDEX_BACKEND=ivf uvicorn api.main:app
+"""
+
+import time
+import argparse
+from datetime import datetime
+
+from utils.embedding_store import load_embedding_set
+from utils.vector_index import BACKENDS, INDEX_DIR, build_index, index_path, recall_at_k, embedding_fingerprint
+
+EMBEDDINGS_DIR = 'embeddings'
+
+
+def log(message):
+    """Print timestamped log message"""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+
+def timed_search(index, queries, k):
+    """Return average milliseconds per query for a batch search"""
+    start = time.perf_counter()
+    index.search(queries, k)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build vector indexes over the embedding sets")
+    parser.add_argument('--backend', choices=sorted(b for b in BACKENDS if b != 'flat'), default='ivf')
+    parser.add_argument('--sets', nargs='+', default=['jobs', 'courses', 'students'])
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--nlist', type=int, default=None, help="IVF lists")
+    parser.add_argument('--nprobe', type=int, default=None, help="IVF lists probed per query")
+    args = parser.parse_args()
+
+    params = {}
+    if args.backend == 'ivf':
+        if args.nlist:
+            params['nlist'] = args.nlist
+        if args.nprobe:
+            params['nprobe'] = args.nprobe
+
+    # Students are the query workload for every catalog
+    queries = load_embedding_set('students', EMBEDDINGS_DIR)['embeddings']
+
+    for name in args.sets:
+        data = load_embedding_set(name, EMBEDDINGS_DIR)
+        log(f"{name}: {len(data['ids'])} vectors")
+
+        fingerprint = embedding_fingerprint(data)
+
+        flat = build_index(data['embeddings'], data['ids'], 'flat')
+        flat.source = fingerprint
+        flat.save(index_path(name, 'flat'))
+
+        start = time.perf_counter()
+        approx = build_index(data['embeddings'], data['ids'], args.backend, **params)
+        build_time = time.perf_counter() - start
+        approx.source = fingerprint
+        approx.save(index_path(name, args.backend))
+
+        recall = recall_at_k(approx, flat, queries, args.k)
+        log(f"  {args.backend}: built in {build_time:.2f}s, recall@{args.k} = {recall:.3f}, "
+            f"{timed_search(approx, queries, args.k):.3f} ms/query "
+            f"(flat {timed_search(flat, queries, args.k):.3f} ms/query)")
+
+    log(f"Indexes saved to {INDEX_DIR}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ import numpy as np
 import re
 from datetime import datetime
 
+from utils.skill_parser import normalize_skill
+
 # Configuration
 DATASETS = {
     'courses': 'digital_twin_courses_1500.csv',
@@ -41,7 +43,7 @@ def clean_text(text):
     return text.strip()
 
 def standardize_skills(skills_text):
-    """Standardize skill lists"""
+    """Standardize skill lists, mapping aliases through the shared skill alias table"""
     if pd.isna(skills_text):
         return skills_text
     
@@ -50,16 +52,16 @@ def standardize_skills(skills_text):
     # Split by common delimiters
     skills = re.split(r'[,;|]', skills_text)
     
-    # Clean each skill
-    skills = [clean_text(skill).title() for skill in skills if skill.strip()]
+    # Clean each skill and map it to its canonical name (same table as matching)
+    skills = [normalize_skill(clean_text(skill)) for skill in skills if skill.strip()]
     
     # Remove duplicates while preserving order
     seen = set()
     unique_skills = []
     for skill in skills:
-        if skill.lower() not in seen:
-            seen.add(skill.lower())
-            unique_skills.append(skill)
+        if skill and skill not in seen:
+            seen.add(skill)
+            unique_skills.append(skill.title())
     
     return ', '.join(unique_skills)
 
@@ -5,12 +5,13 @@ Groups students into 7 clusters based on skills, embeddings, and academic featur
 import pandas as pd
 import numpy as np
 import json
-import pickle
 from pathlib import Path
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans, DBSCAN
 from sklearn.metrics import silhouette_score, davies_bouldin_score
-from sklearn.metrics.pairwise import cosine_similarity
+from utils.vector_index import FlatIndex
+from utils.embedding_store import load_embedding_set
+from utils.record_store import open_records
 from collections import Counter
 import warnings
 warnings.filterwarnings('ignore')
@@ -31,15 +32,12 @@ df_features = pd.read_csv(BASE / "models" / "features_all.csv")
 print(f"   Loaded {len(df_features)} student features")
 
 # Load embeddings from Step 1
-with open(BASE / "embeddings" / "embeddings_students.pkl", "rb") as f:
-    emb_students = pickle.load(f)
+emb_students = load_embedding_set("students", str(BASE / "embeddings"))
 print(f"   Loaded student embeddings")
 
 # Load skill gap profiles from Step 2
-with open(BASE / "skill_gap_profiles" / "student_profiles.json", "r") as f:
-    profiles = json.load(f)
-profiles_map = {p['student_id']: p for p in profiles}
-print(f"   Loaded {len(profiles)} skill gap profiles")
+profiles_map = open_records(str(BASE / "skill_gap_profiles" / "student_profiles.jsonl"))
+print(f"   Indexed {len(profiles_map)} skill gap profiles")
 
 # Load student data
 df_students = pd.read_csv(BASE / "digital_twin_students_1500_cleaned.csv", low_memory=False)
@@ -165,17 +163,16 @@ for cluster_id in range(n_clusters):
 # ============================================================================
 print("\n6️⃣  Computing student similarities...")
 
-# Compute cosine similarity matrix
-similarity_matrix = cosine_similarity(X_scaled)
+# Exact cosine index over the scaled features; top 11 per student
+# (the best hit is the student itself)
+peer_index = FlatIndex(X_scaled, student_ids)
+peer_indices, _ = peer_index.search(X_scaled, 11)
 
 # Find top 10 similar students for each student
 similar_students = {}
 for i, student_id in enumerate(student_ids):
-    # Get similarity scores for this student
-    similarities = similarity_matrix[i]
-    
-    # Get indices of top 11 (excluding self)
-    top_indices = np.argsort(similarities)[::-1][1:11]
+    # Drop self, keep the next 10
+    top_indices = [idx for idx in peer_indices[i] if idx != i][:10]
     
     # Get student IDs
     similar_ids = [student_ids[idx] for idx in top_indices]
@@ -402,7 +402,13 @@ elif st.session_state.step == 8:
                             mime="application/pdf"
                         )
                     else:
-                        st.warning("PDF generated but could not be downloaded directly.")
+                        # PDFs are rendered in the background; report the job's progress
+                        status = requests.get(f"{API_BASE_URL}/pdf_status/{res.get('student_id')}").json()
+                        if status.get("status") in ("queued", "running"):
+                            st.info(f"📄 PDF report is being generated ({status['status']}). "
+                                    "It will be available on the Results page shortly.")
+                        else:
+                            st.warning("PDF generated but could not be downloaded directly.")
                 except:
                      st.warning("Could not connect to download PDF.")
 
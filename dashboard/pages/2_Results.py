@@ -58,15 +58,21 @@ if not student_id:
     st.stop()
 
 # Load Digital Twin data from API
-@st.cache_data(ttl=60)
+# Revalidated on every rerun: the API answers 304 while the twin is unchanged
 def get_digital_twin(sid):
     try:
-        r = requests.get(f"{API_BASE_URL}/get_digital_twin/{sid}")
+        cached = st.session_state.setdefault("digital_twins", {}).get(sid)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        r = requests.get(f"{API_BASE_URL}/get_digital_twin/{sid}", headers=headers)
+        if r.status_code == 304:
+            return cached[1]
         if r.status_code == 200:
-            return r.json()
+            data = r.json()
+            st.session_state["digital_twins"][sid] = (r.headers.get("ETag"), data)
+            return data
+        return None
     except:
         return None
-    return None
 
 with st.spinner("Loading your digital twin..."):
     data = get_digital_twin(student_id)
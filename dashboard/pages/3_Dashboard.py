@@ -23,11 +23,17 @@ if not student_id:
 # -----------------------------
 # Load Digital Twin
 # -----------------------------
-@st.cache_data(ttl=60)
+# Revalidated on every rerun: the API answers 304 while the twin is unchanged
 def get_twin(sid):
-    r = requests.get(f"{API_BASE_URL}/get_digital_twin/{sid}")
+    cached = st.session_state.setdefault("digital_twins", {}).get(sid)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    r = requests.get(f"{API_BASE_URL}/get_digital_twin/{sid}", headers=headers)
+    if r.status_code == 304:
+        return cached[1]
     if r.status_code == 200:
-        return r.json()
+        data = r.json()
+        st.session_state["digital_twins"][sid] = (r.headers.get("ETag"), data)
+        return data
     return None
 
 data = get_twin(student_id)
@@ -1,28 +1,86 @@
 """
 Dashboard Utilities - Data Loading and Helper Functions
+
+Files are loaded once per process and kept in a cache keyed by path and
+invalidated when the file's mtime or size changes, so page loads only pay
+an os.stat per file. Profiles and recommendations are read per student
+through the record store's offset index; cached objects are shared and
+must be treated as read-only.
 """
+import os
 import json
 import pickle
+import threading
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from utils.record_store import open_records, record_paths
+
 # Base directory (parent of dashboard folder)
 BASE = Path(__file__).parent.parent
 
+PROFILES_PATH = "skill_gap_profiles/student_profiles.jsonl"
+RECOMMENDATIONS_PATH = "recommendations/recommendations.jsonl"
+STUDENTS_PATH = "digital_twin_students_1500_cleaned.csv"
+FEATURES_PATH = "models/features_all.csv"
+
+# path -> ((mtime_ns, size), value)
+_cache = {}
+_cache_lock = threading.Lock()
+
+def cached(path, loader):
+    """Return loader(path), reloading only when the file changed"""
+    path = BASE / path
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        entry = _cache.get(path)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+    value = loader(path)
+    with _cache_lock:
+        _cache[path] = (signature, value)
+    return value
+
+def clear_cache():
+    """Drop every cached file"""
+    with _cache_lock:
+        _cache.clear()
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _read_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+def _open_indexed(path):
+    """Record reader with its offset index already loaded"""
+    reader = open_records(str(path))
+    reader.index()
+    return reader
+
+def _records(path):
+    """Cached reader of a record set (JSONL, or a legacy JSON array)"""
+    paths = record_paths(str(BASE / path))
+    # The index is replaced after the records, so it marks a finished write
+    source = next((paths[key] for key in ('index', 'records') if os.path.exists(paths[key])),
+                  paths['json'])
+    return cached(source, lambda _: _open_indexed(paths['records']))
+
 def load_json(path):
     """Load JSON file"""
-    with open(BASE / path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return cached(path, _read_json)
 
 def load_pickle(path):
     """Load pickle file"""
-    with open(BASE / path, "rb") as f:
-        return pickle.load(f)
+    return cached(path, _read_pickle)
 
 def load_student_features():
     """Load student features CSV"""
-    return pd.read_csv(BASE / "models" / "features_all.csv")
+    return cached(FEATURES_PATH, pd.read_csv)
 
 def get_student_roadmap(student_id):
     """Get roadmap for specific student"""
@@ -33,24 +91,19 @@ def get_student_roadmap(student_id):
 
 def get_student_profile(student_id):
     """Get skill gap profile for student"""
-    profiles = load_json("skill_gap_profiles/student_profiles.json")
-    for profile in profiles:
-        if profile.get('student_id') == student_id:
-            return profile
-    return None
+    return _records(PROFILES_PATH).get(student_id)
 
 def get_student_recommendations(student_id):
     """Get recommendations for student"""
-    recs = load_json("recommendations/recommendations.json")
-    for rec in recs:
-        if rec.get('student_id') == student_id:
-            return rec
-    return None
+    return _records(RECOMMENDATIONS_PATH).get(student_id)
 
 def get_all_students():
     """Get list of all student IDs"""
-    df = pd.read_csv(BASE / "digital_twin_students_1500_cleaned.csv", low_memory=False)
-    return df['StudentID'].tolist()
+    student_ids = cached(
+        STUDENTS_PATH,
+        lambda path: pd.read_csv(path, usecols=['StudentID'], low_memory=False)['StudentID'].tolist()
+    )
+    return list(student_ids)
 
 def normalize_skills(skill_dict, max_val=100):
     """Normalize skill values to 0-1 range"""
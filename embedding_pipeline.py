@@ -2,13 +2,21 @@ from sentence_transformers import SentenceTransformer
 import pandas as pd
 import numpy as np
 
+from utils.encoder_cache import CachedEncoder, DEFAULT_CACHE_PATH
+
 class SkillEmbeddingBuilder:
-    def __init__(self, model_name="all-MiniLM-L6-v2"):
+    def __init__(self, model_name="all-MiniLM-L6-v2", cache_path=DEFAULT_CACHE_PATH):
         self.model = SentenceTransformer(model_name)
+        # Identical texts are encoded once and reused across calls and runs
+        self.encoder = CachedEncoder(model_name, cache_path=cache_path, model=self.model)
 
     def embed_text_list(self, texts):
         # Embed a list of texts into vectors
-        return self.model.encode(texts, show_progress_bar=True)
+        return self.encoder.encode(texts, show_progress_bar=True)
+
+    def cache_stats(self):
+        # Hit-rate metrics of the text -> vector cache
+        return self.encoder.stats()
 
     def build_student_skill_vector(self, student_data):
         # Combine relevant student fields into one text per student
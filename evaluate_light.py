@@ -1,9 +1,9 @@
 import pandas as pd
 import joblib
 import numpy as np
-import json
 from sklearn.metrics import accuracy_score, f1_score, classification_report
 from pathlib import Path
+from utils.record_store import read_records
 
 print("Loading artifacts...")
 model = joblib.load("models/career_model_xgb.pkl")
@@ -14,8 +14,7 @@ df_features = pd.read_csv("models/features_all.csv")
 print("Loading profiles (subset)...")
 BASE = Path(".")
 # Load profiles
-with open(BASE / "skill_gap_profiles" / "student_profiles.json", "r") as f:
-    profiles = json.load(f)
+profiles = read_records(str(BASE / "skill_gap_profiles" / "student_profiles.jsonl"))
 
 # Create labels for ALL students (it's fast enough in memory usually, the issue might be the CSV reading of the big file)
 # We don't need the big CSV if we have profiles and features_all.csv (which has StudentID)
@@ -1,9 +1,9 @@
 import pandas as pd
 import joblib
-import json
 import numpy as np
 from sklearn.metrics import accuracy_score, f1_score, confusion_matrix
 from pathlib import Path
+from utils.record_store import read_records
 
 # Load artifacts
 print("Loading model artifacts...")
@@ -17,8 +17,7 @@ df_features = pd.read_csv("models/features_all.csv")
 
 # Load profiles for labels
 print("Loading profiles...")
-with open("skill_gap_profiles/student_profiles.json", "r") as f:
-    profiles = json.load(f)
+profiles = read_records("skill_gap_profiles/student_profiles.jsonl")
 
 # Re-create labels
 print("Re-creating labels...")
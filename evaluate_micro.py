@@ -1,8 +1,8 @@
 import pandas as pd
 import joblib
-import json
 import numpy as np
 from sklearn.metrics import accuracy_score, f1_score, confusion_matrix
+from utils.record_store import read_records
 
 try:
     # Load artifacts
@@ -19,8 +19,7 @@ try:
     # We need the labels.
     
     # Let's try to load profiles again but be quick.
-    with open("skill_gap_profiles/student_profiles.json", "r") as f:
-        profiles = json.load(f)
+    profiles = read_records("skill_gap_profiles/student_profiles.jsonl")
     
     # Map labels
     def map_job_to_class(job_title):
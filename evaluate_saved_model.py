@@ -33,14 +33,13 @@ import sys
 # Okay, I need to re-generate the labels to evaluate.
 # I will copy the label generation logic.
 
-import json
 import re
 from pathlib import Path
+from utils.record_store import read_records
 
 BASE = Path(".")
 df = pd.read_csv(BASE / "digital_twin_students_1500_cleaned.csv", low_memory=False)
-with open(BASE / "skill_gap_profiles" / "student_profiles.json", "r") as f:
-    profiles = json.load(f)
+profiles = read_records(str(BASE / "skill_gap_profiles" / "student_profiles.jsonl"))
 
 def map_job_to_class(job_title):
     t = str(job_title).lower()
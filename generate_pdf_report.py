@@ -19,6 +19,8 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.record_store import open_records
+
 # Try to import QR code library
 try:
     import qrcode
@@ -57,9 +59,7 @@ df_students = pd.read_csv(BASE / "digital_twin_students_1500_cleaned.csv", low_m
 roadmaps_dir = BASE / "roadmaps"
 
 # Load skill gap profiles
-with open(BASE / "skill_gap_profiles" / "student_profiles.json", "r") as f:
-    profiles = json.load(f)
-profiles_map = {p['student_id']: p for p in profiles}
+profiles_map = open_records(str(BASE / "skill_gap_profiles" / "student_profiles.jsonl"))
 
 # Load career predictions
 try:
@@ -20,6 +20,8 @@ import sys
 from pathlib import Path
 from tqdm import tqdm
 
+from utils.record_store import has_records, open_records
+
 # Set encoding for Windows
 if sys.platform == 'win32':
     os.environ['PYTHONIOENCODING'] = 'utf-8'
@@ -94,8 +96,6 @@ def validate_environment():
     print("\n1️⃣  Validating environment...")
     required_files = [
         BASE_DIR / "digital_twin_students_1500_cleaned.csv",
-        PROFILES_DIR / "student_profiles.json",
-        RECS_DIR / "recommendations.json",
         MODELS_DIR / "career_model_xgb.pkl",
         MODELS_DIR / "label_encoder.pkl",
         MODELS_DIR / "feature_list.pkl",
@@ -106,6 +106,11 @@ def validate_environment():
     for f in required_files:
         if not f.exists():
             missing.append(str(f))
+    
+    # Record stores (.jsonl, or a legacy .json array)
+    for f in [PROFILES_DIR / "student_profiles.jsonl", RECS_DIR / "recommendations.jsonl"]:
+        if not has_records(str(f)):
+            missing.append(str(f))
             
     if missing:
         print("❌ CRITICAL ERROR: Missing required files:")
@@ -127,17 +132,13 @@ def load_data():
     df_students = pd.read_csv(BASE_DIR / "digital_twin_students_1500_cleaned.csv", low_memory=False)
     print(f"   Loaded {len(df_students)} students")
     
-    # Profiles
-    with open(PROFILES_DIR / "student_profiles.json", "r") as f:
-        profiles = json.load(f)
-    profiles_map = {p['student_id']: p for p in profiles}
-    print(f"   Loaded {len(profiles)} profiles")
+    # Profiles (lazy: records are read by offset as each student is processed)
+    profiles_map = open_records(str(PROFILES_DIR / "student_profiles.jsonl"))
+    print(f"   Indexed {len(profiles_map)} profiles")
     
     # Recommendations
-    with open(RECS_DIR / "recommendations.json", "r") as f:
-        recommendations = json.load(f)
-    recs_map = {r['student_id']: r for r in recommendations}
-    print(f"   Loaded {len(recommendations)} recommendations")
+    recs_map = open_records(str(RECS_DIR / "recommendations.jsonl"))
+    print(f"   Indexed {len(recs_map)} recommendations")
     
     # Models
     print("   Loading career models...")
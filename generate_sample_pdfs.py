@@ -18,6 +18,8 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.record_store import open_records
+
 print("=" * 70)
 print("STEP 8: PDF REPORT GENERATOR (SAMPLE)")
 print("=" * 70)
@@ -36,9 +38,7 @@ print("\n1️⃣  Loading data...")
 df_students = pd.read_csv(BASE / "digital_twin_students_1500_cleaned.csv", low_memory=False)
 roadmaps_dir = BASE / "roadmaps"
 
-with open(BASE / "skill_gap_profiles" / "student_profiles.json", "r") as f:
-    profiles = json.load(f)
-profiles_map = {p['student_id']: p for p in profiles}
+profiles_map = open_records(str(BASE / "skill_gap_profiles" / "student_profiles.jsonl"))
 
 print(f"   Loaded data for {len(df_students)} students")
 
@@ -0,0 +1,76 @@
+"""
+Embedding Store Migration
+=========================
+Converts the legacy embeddings_<name>.pkl files into the memory-mapped
+store (embeddings_<name>.npy + .ids.json + .meta.json) and checks that the
+migrated sets load back identical to the pickles.
+
+Usage:
+    python migrate_embeddings.py [--sets students jobs courses interests] [--dtype float32]
+
+float16 halves the file size and the resident memory of every worker at a
+small precision cost; the verification then reports the max absolute error
+instead of requiring an exact match.
+"""
+
+import os
+import pickle
+import argparse
+import numpy as np
+from datetime import datetime
+
+from utils.embedding_store import (
+    EMBEDDINGS_DIR, EMBEDDING_SETS, store_paths, save_embedding_set, load_embedding_set
+)
+
+
+def log(message):
+    """Print timestamped log message"""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+
+def migrate(name, embedding_dir, dtype):
+    """Convert one pickle to the store; return True if it verifies"""
+    paths = store_paths(name, embedding_dir)
+    if not os.path.exists(paths['pickle']):
+        log(f"  {name}: {paths['pickle']} not found, skipped")
+        return False
+
+    with open(paths['pickle'], 'rb') as f:
+        data = pickle.load(f)
+    original = np.asarray(data['embeddings'])
+    save_embedding_set(name, list(data['ids']), original, data.get('metadata', {}),
+                       embedding_dir, dtype=dtype)
+
+    migrated = load_embedding_set(name, embedding_dir)
+    same_ids = list(migrated['ids']) == [i.item() if hasattr(i, 'item') else i for i in data['ids']]
+    if np.dtype(dtype) == original.dtype:
+        ok = same_ids and np.array_equal(migrated['embeddings'], original)
+        detail = "exact match" if ok else "MISMATCH"
+    else:
+        max_error = float(np.max(np.abs(migrated['embeddings'].astype(np.float32) - original)))
+        ok = same_ids
+        detail = f"max abs error {max_error:.2e}"
+    if not same_ids:
+        detail += ", ids differ"
+
+    size_mb = os.path.getsize(paths['vectors']) / 1024 ** 2
+    log(f"  {name}: {migrated['embeddings'].shape} {dtype}, {size_mb:.1f} MB, {detail}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate embedding pickles to the memory-mapped store")
+    parser.add_argument('--sets', nargs='+', default=list(EMBEDDING_SETS))
+    parser.add_argument('--dtype', choices=['float32', 'float16'], default='float32')
+    parser.add_argument('--embedding-dir', default=EMBEDDINGS_DIR)
+    args = parser.parse_args()
+
+    log(f"Migrating {', '.join(args.sets)} in {args.embedding_dir}/")
+    results = [migrate(name, args.embedding_dir, args.dtype) for name in args.sets]
+    log(f"{sum(results)}/{len(results)} sets migrated and verified")
+
+
+if __name__ == "__main__":
+    main()
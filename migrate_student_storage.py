@@ -0,0 +1,52 @@
+"""
+Student Storage Migration
+=========================
+Imports the API's legacy flat files (data/student_inputs.csv and
+data/student_inputs/*.json) into the SQLite student database used by
+api/utils/storage.py.
+
+Usage:
+    python migrate_student_storage.py [--data-dir data] [--db data/digital_twin.db]
+
+The API migrates an empty database automatically on first use; this
+script re-runs the import explicitly (existing rows are updated, so it is
+safe to repeat) and reports what the database holds afterwards.
+"""
+
+import os
+import argparse
+from datetime import datetime
+
+from api.utils.storage import DATA_DIR, DB_PATH, SCHEMA, ID_OFFSET, _connect, transaction, migrate_flat_files
+
+
+def log(message):
+    """Print timestamped log message"""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate API student flat files to SQLite")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.db) or '.', exist_ok=True)
+    conn = _connect(args.db)
+    conn.executescript(SCHEMA)
+    with transaction(conn):
+        counts = migrate_flat_files(conn, args.data_dir)
+    log(f"Imported {counts['csv_rows']} CSV rows and {counts['json_files']} JSON payloads "
+        f"from {args.data_dir}")
+
+    students = conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+    payloads = conn.execute("SELECT COUNT(*) FROM students WHERE payload IS NOT NULL").fetchone()[0]
+    last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM student_ids").fetchone()[0]
+    conn.close()
+    log(f"{args.db}: {students} students ({payloads} with raw input), "
+        f"next id S{last_seq + 1 + ID_OFFSET:04d}")
+
+
+if __name__ == "__main__":
+    main()
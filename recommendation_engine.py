@@ -1,13 +1,21 @@
 import pandas as pd
 import numpy as np
-import pickle
-import json
 import os
 import random
+import argparse
 from datetime import datetime
 from utils.skill_parser import parse_skill_list, normalize_skill
+from utils.similarity import row_norms, cosine_similarity_block, top_k_indices
+from utils.job_index import JobIndex
+from utils.vector_index import BACKENDS, load_embedding_index
+from utils.embedding_store import load_embedding_set
+from utils.skill_vocabulary import SkillVocabulary, SkillSets, coverage_matrix, load_skill_vocabulary
+from utils.record_store import RecordWriter, open_records, iter_blocks, export_json_array
 
 # --- Configuration ---
+COURSE_PROVIDERS = ['AWS', 'HUAWEI']
+COURSES_PER_PROVIDER = 5
+SCORE_BLOCK_SIZE = 512
 INPUT_DIR = "skill_gap_profiles"
 EMBEDDING_DIR = "embeddings"
 OUTPUT_DIR = "recommendations"
@@ -122,6 +130,130 @@ def recommend_courses(student_profile, student_embedding, course_embeddings, df_
     
     return top_aws + top_huawei
 
+class CourseScorer:
+    """
+    Batch course scorer.
+
+    Parses every course's SkillsGained once into a sparse course x skill
+    incidence matrix, then scores whole blocks of students with a few matrix
+    operations instead of one Python loop per (student, course) pair.
+    Scores use the same formula as recommend_courses:
+    0.60 * similarity + 0.30 * coverage + 0.10 * level.
+    """
+
+    def __init__(self, course_embeddings, df_courses, vocabulary=None):
+        self.df_courses = df_courses.reset_index(drop=True)
+        self.course_embeddings = np.asarray(course_embeddings, dtype=np.float32)
+        self.course_norms = row_norms(self.course_embeddings)
+
+        self.course_names = self.df_courses['CourseTitle'].tolist()
+        self.providers = self.df_courses['CourseProvider'].tolist()
+        self.levels = self.df_courses['Level'].tolist()
+        self.course_skills = [parse_skill_list(str(s)) for s in self.df_courses['SkillsGained']]
+        self.level_scores = np.array([get_level_score(l) for l in self.levels], dtype=np.float64)
+
+        # Without a shared vocabulary, the local one covers course skills
+        # only: a missing skill that no course teaches can never contribute
+        # to coverage.
+        self.vocabulary = vocabulary or SkillVocabulary.from_skill_lists(self.course_skills)
+        self.course_sets = SkillSets.from_lists(range(len(self.course_names)), self.course_skills,
+                                                self.vocabulary)
+
+        provider_upper = np.array([str(p).upper() for p in self.providers])
+        self.provider_indices = {
+            provider: np.flatnonzero(provider_upper == provider)
+            for provider in COURSE_PROVIDERS
+        }
+
+        self.title_index = {}
+        for course_idx, name in enumerate(self.course_names):
+            self.title_index.setdefault(str(name).lower().strip(), []).append(course_idx)
+
+    def _missing_skill_sets(self, missing_skill_lists):
+        """Encode missing skills; counts include skills outside the vocabulary."""
+        missing_sets = SkillSets.from_lists(range(len(missing_skill_lists)), missing_skill_lists,
+                                            self.vocabulary)
+        missing_counts = np.array([len(set(m)) for m in missing_skill_lists], dtype=np.float64)
+        return missing_sets, missing_counts
+
+    def score(self, student_embeddings, missing_skill_lists):
+        """
+        Score a block of students against every course.
+
+        Args:
+            student_embeddings: Matrix of shape (n_students, dim)
+            missing_skill_lists: Missing skills per student
+
+        Returns:
+            Tuple of (scores, similarities, coverage), each (n_students, n_courses)
+        """
+        student_embeddings = np.asarray(student_embeddings, dtype=np.float32)
+        if student_embeddings.ndim == 1:
+            student_embeddings = student_embeddings.reshape(1, -1)
+
+        similarities = cosine_similarity_block(
+            student_embeddings, self.course_embeddings, y_norms=self.course_norms
+        )
+
+        missing_sets, missing_counts = self._missing_skill_sets(missing_skill_lists)
+        coverage = coverage_matrix(missing_sets, self.course_sets, missing_counts)
+
+        scores = (0.6 * similarities.astype(np.float64)) + (0.3 * coverage) + (0.1 * self.level_scores)
+        return scores, similarities, coverage
+
+    def _format(self, course_idx, missing_skills, scores, similarities, coverage):
+        """Build a recommendation entry in the recommend_courses format."""
+        return {
+            "course_name": self.course_names[course_idx],
+            "provider": self.providers[course_idx],
+            "level": self.levels[course_idx],
+            "score": float(scores[course_idx]),
+            "similarity": float(similarities[course_idx]),
+            "coverage": float(coverage[course_idx]),
+            "covers_skills": list(set(missing_skills).intersection(set(self.course_skills[course_idx])))
+        }
+
+    def recommend(self, student_profiles, student_embeddings, top_n=COURSES_PER_PROVIDER,
+                  block_size=SCORE_BLOCK_SIZE):
+        """
+        Recommend courses for many students at once.
+
+        Args:
+            student_profiles: Step 2 profiles, aligned with student_embeddings
+            student_embeddings: Matrix of shape (n_students, dim)
+            top_n: Courses per provider
+            block_size: Students scored per matrix block
+
+        Returns:
+            List with one recommend_courses-style list per student
+        """
+        results = []
+        for start in range(0, len(student_profiles), block_size):
+            block_profiles = student_profiles[start:start + block_size]
+            missing_lists = [p['skill_gaps']['missing_skills'] for p in block_profiles]
+            scores, similarities, coverage = self.score(
+                student_embeddings[start:start + len(block_profiles)], missing_lists
+            )
+
+            for row, profile in enumerate(block_profiles):
+                row_scores = scores[row]
+                completed = [c.lower().strip() for c in profile.get('current_courses', [])]
+                excluded = [i for c in completed for i in self.title_index.get(c, [])]
+                if excluded:
+                    row_scores = row_scores.copy()
+                    row_scores[excluded] = -np.inf
+
+                recommendations = []
+                for provider in COURSE_PROVIDERS:
+                    candidates = self.provider_indices[provider]
+                    top = candidates[top_k_indices(row_scores[candidates], top_n)]
+                    recommendations.extend(
+                        self._format(i, missing_lists[row], row_scores, similarities[row], coverage[row])
+                        for i in top
+                    )
+                results.append(recommendations)
+        return results
+
 def recommend_skills(student_profile):
     """
     Return top 10 recommended skills based on priority score from Step 2.
@@ -229,34 +361,38 @@ def recommend_internships(student_embedding, job_embeddings, df_jobs):
 # --- Main Execution ---
 
 def main():
+    parser = argparse.ArgumentParser(description="Step 3: Recommendation Engine")
+    parser.add_argument("--index-backend", choices=sorted(BACKENDS), default=None,
+                        help="match internships through a vector index (see build_vector_index.py)")
+    parser.add_argument("--legacy-json", action="store_true",
+                        help="also write recommendations.json as one indented JSON array")
+    args = parser.parse_args()
+    
     print("🚀 Starting Step 3: Recommendation Engine...")
     
     # 1. Load Data
     print("   Loading data...")
     try:
-        with open(os.path.join(INPUT_DIR, "student_profiles.json"), "r") as f:
-            student_profiles = json.load(f)
+        # Profiles are streamed from the Step 2 record store, block by block
+        student_profiles = open_records(os.path.join(INPUT_DIR, "student_profiles.jsonl"))
             
-        with open(os.path.join(EMBEDDING_DIR, "embeddings_students.pkl"), "rb") as f:
-            student_data = pickle.load(f)
-            student_embeddings = student_data['embeddings']
-            # student_ids = student_data['ids'] # Not strictly needed if we assume 1:1 mapping with profiles
+        student_data = load_embedding_set("students", EMBEDDING_DIR)
+        student_embeddings = student_data['embeddings']
+        # student_ids = student_data['ids'] # Not strictly needed if we assume 1:1 mapping with profiles
             
-        with open(os.path.join(EMBEDDING_DIR, "embeddings_courses.pkl"), "rb") as f:
-            course_data = pickle.load(f)
-            course_embeddings = course_data['embeddings']
-            course_ids = course_data['ids']
+        course_data = load_embedding_set("courses", EMBEDDING_DIR)
+        course_embeddings = course_data['embeddings']
+        course_ids = course_data['ids']
             
-        with open(os.path.join(EMBEDDING_DIR, "embeddings_jobs.pkl"), "rb") as f:
-            job_data = pickle.load(f)
-            job_embeddings = job_data['embeddings']
-            job_ids = job_data['ids']
+        job_data = load_embedding_set("jobs", EMBEDDING_DIR)
+        job_embeddings = job_data['embeddings']
+        job_ids = job_data['ids']
             
         df_courses = pd.read_csv(COURSE_DATA_PATH)
         df_jobs = pd.read_csv(JOB_DATA_PATH)
         
         # Align DataFrames with Embeddings
-        # We assume 'ids' in pickle correspond to DataFrame indices
+        # We assume 'ids' in the embedding store correspond to DataFrame indices
         df_courses = df_courses.iloc[course_ids].reset_index(drop=True)
         
         # For jobs, ids are strings (J0001...), so we must set index first
@@ -271,55 +407,67 @@ def main():
 
     # 2. Generate Recommendations
     print("   Generating recommendations...")
-    all_recommendations = []
     
     # Create output directory
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    for i, profile in enumerate(student_profiles):
-        student_id = profile.get('student_id', f"S{i:04d}")
-        
-        # Get student embedding (assuming aligned order, which they should be from Step 1 & 2)
-        # Verify alignment if possible, but for now relying on index
-        s_embedding = student_embeddings[i]
-        
-        # A. Course Recommendations
-        rec_courses = recommend_courses(profile, s_embedding, course_embeddings, df_courses)
-        
-        # B. Skill Recommendations
-        rec_skills = recommend_skills(profile)
-        
-        # C. Project Recommendations
-        # Use the title of the #1 job match as the target
-        top_job = profile['best_job_matches'][0]['job_title'] if profile['best_job_matches'] else "Cloud Engineer"
-        rec_projects = recommend_projects(profile, top_job)
-        
-        # D. Internship Recommendations
-        rec_internships = recommend_internships(s_embedding, job_embeddings, df_jobs)
-        
-        # Construct Final Object
-        student_rec = {
-            "student_id": student_id,
-            "student_name": profile.get('student_name', 'Unknown'),
-            "target_job": top_job,
-            "recommended_courses": rec_courses,
-            "recommended_skills": rec_skills,
-            "recommended_projects": rec_projects,
-            "recommended_internships": rec_internships,
-            "comment": f"You are a {int(profile['best_job_matches'][0]['match_percentage'])}% match to {top_job} roles." if profile['best_job_matches'] else "Keep building your skills!"
-        }
-        
-        all_recommendations.append(student_rec)
-        
-        if (i + 1) % 100 == 0:
-            print(f"   Processed {i + 1}/{len(student_profiles)} students...")
-
-    # 3. Save Output
-    output_file = os.path.join(OUTPUT_DIR, "recommendations.json")
-    with open(output_file, "w") as f:
-        json.dump(all_recommendations, f, indent=2)
+    # Score all courses for all students in matrix blocks
+    # (student embeddings are aligned with profiles by index from Step 1 & 2)
+    # Shared skill vocabulary (build_skill_vocabulary.py), if built
+    vocabulary, _ = load_skill_vocabulary(EMBEDDING_DIR)
+    course_scorer = CourseScorer(course_embeddings, df_courses, vocabulary=vocabulary)
+    
+    # Entry-level job matches, one matrix multiply per block
+    vector_index = load_embedding_index('jobs', args.index_backend) if args.index_backend else None
+    job_index = JobIndex(job_embeddings, df_jobs, vector_index=vector_index)
+    
+    # 3. Stream Output: one block of profiles in memory at a time
+    output_file = os.path.join(OUTPUT_DIR, "recommendations.jsonl")
+    with RecordWriter(output_file) as writer:
+        for start, block_profiles in iter_blocks(student_profiles, SCORE_BLOCK_SIZE):
+            block_embeddings = student_embeddings[start:start + len(block_profiles)]
+            block_course_recs = course_scorer.recommend(block_profiles, block_embeddings)
+            block_internship_recs = job_index.recommend_internships(block_embeddings)
+            
+            for row, profile in enumerate(block_profiles):
+                i = start + row
+                student_id = profile.get('student_id', f"S{i:04d}")
+                
+                # A. Course Recommendations
+                rec_courses = block_course_recs[row]
+                
+                # B. Skill Recommendations
+                rec_skills = recommend_skills(profile)
+                
+                # C. Project Recommendations
+                # Use the title of the #1 job match as the target
+                top_job = profile['best_job_matches'][0]['job_title'] if profile['best_job_matches'] else "Cloud Engineer"
+                rec_projects = recommend_projects(profile, top_job)
+                
+                # D. Internship Recommendations
+                rec_internships = block_internship_recs[row]
+                
+                # Construct Final Object
+                student_rec = {
+                    "student_id": student_id,
+                    "student_name": profile.get('student_name', 'Unknown'),
+                    "target_job": top_job,
+                    "recommended_courses": rec_courses,
+                    "recommended_skills": rec_skills,
+                    "recommended_projects": rec_projects,
+                    "recommended_internships": rec_internships,
+                    "comment": f"You are a {int(profile['best_job_matches'][0]['match_percentage'])}% match to {top_job} roles." if profile['best_job_matches'] else "Keep building your skills!"
+                }
+                
+                writer.write(student_rec)
+                
+                if (i + 1) % 100 == 0:
+                    print(f"   Processed {i + 1}/{len(student_profiles)} students...")
+    
+    if args.legacy_json:
+        export_json_array(output_file)
         
-    print(f"✅ Successfully generated recommendations for {len(all_recommendations)} students.")
+    print(f"✅ Successfully generated recommendations for {writer.count} students.")
     print(f"📁 Output saved to: {output_file}")
 
 if __name__ == "__main__":
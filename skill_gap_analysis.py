@@ -3,38 +3,24 @@ Skill Gap Analysis Engine - Step 2
 Compares students to jobs, identifies skill gaps, and generates comprehensive profiles.
 """
 
+import io
 import os
 import sys
-import pickle
+import glob
 import json
+import argparse
+import contextlib
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
+from scipy import sparse
 from datetime import datetime
 from typing import Dict, List, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
 
-def cosine_similarity_numpy(X, Y):
-    """
-    Compute cosine similarity between two matrices using numpy.
-    Avoids scikit-learn DLL issues on Windows.
-    
-    Args:
-        X: Matrix of shape (n_samples_X, n_features)
-        Y: Matrix of shape (n_samples_Y, n_features)
-    
-    Returns:
-        Similarity matrix of shape (n_samples_X, n_samples_Y)
-    """
-    # Normalize rows
-    X_norm = X / np.linalg.norm(X, axis=1, keepdims=True)
-    Y_norm = Y / np.linalg.norm(Y, axis=1, keepdims=True)
-    
-    # Compute dot product
-    return np.dot(X_norm, Y_norm.T)
-
-
 # Configure UTF-8 encoding for Windows
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -48,6 +34,25 @@ from utils.skill_parser import (
     extract_skill_frequency,
     get_top_skills
 )
+from utils.similarity import top_k_rows, streaming_top_k, block_rows_for_memory
+from utils.vector_index import BACKENDS, load_embedding_index
+from utils.embedding_store import EMBEDDING_SETS, load_embedding_set
+from utils.skill_vocabulary import SkillVocabulary, SkillSets, load_skill_vocabulary
+from utils.record_store import write_records, merge_record_files, export_json_array
+
+# Students per similarity block when streaming top-k matches
+DEFAULT_BLOCK_SIZE = 1024
+DEFAULT_SHARD_SIZE = DEFAULT_BLOCK_SIZE
+
+EMBEDDINGS_DIR = 'embeddings'
+OUTPUT_DIR = 'skill_gap_profiles'
+PROFILES_FILE = 'student_profiles.jsonl'
+SHARD_DIR = 'shards'
+DATASET_FILES = {
+    'students': 'students_1500_PRODUCTION_READY.csv',
+    'jobs': 'egypt_jobs_full_1500_cleaned.csv',
+    'courses': 'digital_twin_courses_1500_cleaned.csv'
+}
 
 
 def print_header(text):
@@ -66,25 +71,16 @@ def load_embeddings():
     """Load all embeddings from Step 1"""
     print_header("LOADING EMBEDDINGS")
     
-    embeddings_dir = 'embeddings'
     embeddings = {}
     
-    files = {
-        'students': 'embeddings_students.pkl',
-        'jobs': 'embeddings_jobs.pkl',
-        'courses': 'embeddings_courses.pkl',
-        'interests': 'embeddings_interests.pkl'
-    }
-    
-    for key, filename in files.items():
-        filepath = os.path.join(embeddings_dir, filename)
-        print_progress(f"Loading {filename}...")
+    for key in EMBEDDING_SETS:
+        print_progress(f"Loading embeddings_{key}...")
         
-        with open(filepath, 'rb') as f:
-            data = pickle.load(f)
-            embeddings[key] = data
-            print(f"    - Loaded {len(data['ids'])} {key} embeddings")
-            print(f"    - Shape: {data['embeddings'].shape}")
+        # Memory-mapped store (falls back to the legacy pickle)
+        data = load_embedding_set(key, EMBEDDINGS_DIR)
+        embeddings[key] = data
+        print(f"    - Loaded {len(data['ids'])} {key} embeddings")
+        print(f"    - Shape: {data['embeddings'].shape}")
     
     print("\n[SUCCESS] All embeddings loaded successfully!")
     return embeddings
@@ -96,13 +92,7 @@ def load_datasets():
     
     datasets = {}
     
-    files = {
-        'students': 'students_1500_PRODUCTION_READY.csv',
-        'jobs': 'egypt_jobs_full_1500_cleaned.csv',
-        'courses': 'digital_twin_courses_1500_cleaned.csv'
-    }
-    
-    for key, filename in files.items():
+    for key, filename in DATASET_FILES.items():
         print_progress(f"Loading {filename}...")
         df = pd.read_csv(filename, encoding='utf-8')
         datasets[key] = df
@@ -112,41 +102,124 @@ def load_datasets():
     return datasets
 
 
-def compute_similarity_matrix(student_embeddings, job_embeddings):
-    """Compute cosine similarity between students and jobs"""
-    print_header("COMPUTING SIMILARITY MATRIX")
+class JobCatalog:
+    """
+    Indexed view of the job dataset.
     
-    print_progress("Calculating cosine similarity (1500 x 1500)...")
-    similarity_matrix = cosine_similarity_numpy(student_embeddings, job_embeddings)
+    Maps job_id to its row (first occurrence, like a boolean-mask lookup
+    followed by .iloc[0]) and caches the parsed required_skills per job, so
+    lookups are O(1) dict hits instead of full-column scans.
+    """
+    
+    def __init__(self, job_df):
+        self.df = job_df
+        records = job_df.drop_duplicates('job_id', keep='first').to_dict('records')
+        self.rows = {row['job_id']: row for row in records}
+        self.skills = {job_id: extract_job_skills(row) for job_id, row in self.rows.items()}
     
-    print(f"    - Matrix shape: {similarity_matrix.shape}")
-    print(f"    - Min similarity: {similarity_matrix.min():.4f}")
-    print(f"    - Max similarity: {similarity_matrix.max():.4f}")
-    print(f"    - Mean similarity: {similarity_matrix.mean():.4f}")
+    def row(self, job_id):
+        """Return the job row as a dict"""
+        return self.rows[job_id]
     
-    print("\n[SUCCESS] Similarity matrix computed!")
-    return similarity_matrix
+    def required_skills(self, job_id):
+        """Return the pre-parsed required skills for a job"""
+        return self.skills[job_id]
 
 
-def get_top_job_matches(similarity_matrix, job_ids, job_df, top_n=5):
-    """Get top N job matches for each student"""
-    print_header(f"EXTRACTING TOP {top_n} JOB MATCHES PER STUDENT")
+class StudentCatalog:
+    """
+    Indexed view of the student dataset.
+    
+    Maps StudentID to its row and caches each student's merged skill list
+    on first access.
+    """
+    
+    def __init__(self, student_df):
+        self.df = student_df
+        records = student_df.drop_duplicates('StudentID', keep='first').to_dict('records')
+        self.rows = {row['StudentID']: row for row in records}
+        self._skills = {}
+    
+    def row(self, student_id):
+        """Return the student row as a dict"""
+        return self.rows[student_id]
+    
+    def skills(self, student_id):
+        """Return the merged, normalized skills for a student"""
+        if student_id not in self._skills:
+            self._skills[student_id] = extract_student_skills(self.rows[student_id])
+        return self._skills[student_id]
+
+
+def as_job_catalog(jobs):
+    """Accept a JobCatalog or a job DataFrame"""
+    return jobs if isinstance(jobs, JobCatalog) else JobCatalog(jobs)
+
+
+def as_student_catalog(students):
+    """Accept a StudentCatalog or a student DataFrame"""
+    return students if isinstance(students, StudentCatalog) else StudentCatalog(students)
+
+
+def compute_top_job_matches(student_embeddings, job_embeddings, top_n=5,
+                            block_size=DEFAULT_BLOCK_SIZE, max_memory_mb=None, index=None):
+    """
+    Stream students against jobs in row blocks and keep only the top N jobs
+    per student, never materializing the full students x jobs matrix.
+    
+    Args:
+        student_embeddings: Matrix of shape (n_students, dim)
+        job_embeddings: Matrix of shape (n_jobs, dim)
+        top_n: Matches per student
+        block_size: Students per similarity block
+        max_memory_mb: Optional ceiling for one block's working set
+        index: Optional utils.vector_index index over the job embeddings;
+            when given it answers the queries instead of the exact scan
+    
+    Returns:
+        Tuple of (top_indices, top_scores), each of shape (n_students, top_n)
+    """
+    if index is not None:
+        print_header(f"COMPUTING TOP JOB MATCHES ({index.backend.upper()} INDEX)")
+        top_indices, top_scores = index.search(student_embeddings, top_n)
+        print(f"    - Top-k shape: {top_indices.shape}")
+        print("\n[SUCCESS] Top job matches computed!")
+        return top_indices, top_scores
+    
+    print_header("COMPUTING TOP JOB MATCHES (STREAMING)")
+    
+    if max_memory_mb is not None:
+        block_size = min(block_size, block_rows_for_memory(len(job_embeddings), max_memory_mb))
+    print_progress(f"Matching {len(student_embeddings)} students x {len(job_embeddings)} jobs "
+                   f"in blocks of {block_size} students...")
     
-    num_students = similarity_matrix.shape[0]
+    top_indices, top_scores, stats = streaming_top_k(
+        student_embeddings, job_embeddings, top_n, block_size=block_size
+    )
+    
+    print(f"    - Top-k shape: {top_indices.shape}")
+    print(f"    - Min similarity: {stats['min']:.4f}")
+    print(f"    - Max similarity: {stats['max']:.4f}")
+    print(f"    - Mean similarity: {stats['mean']:.4f}")
+    
+    print("\n[SUCCESS] Top job matches computed!")
+    return top_indices, top_scores
+
+
+def build_job_matches(top_indices, top_scores, job_ids, job_df):
+    """Format top job indices/scores into best_job_matches entries"""
+    job_catalog = as_job_catalog(job_df)
+    num_students = len(top_indices)
     all_matches = []
     
     for student_idx in range(num_students):
-        # Get similarity scores for this student
-        scores = similarity_matrix[student_idx]
-        
-        # Get top N job indices
-        top_indices = np.argsort(scores)[-top_n:][::-1]
-        
         # Extract job details
         matches = []
-        for job_idx in top_indices:
+        for job_idx, score in zip(top_indices[student_idx], top_scores[student_idx]):
+            if job_idx < 0:
+                continue
             job_id = job_ids[job_idx]
-            job_row = job_df[job_df['job_id'] == job_id].iloc[0]
+            job_row = job_catalog.row(job_id)
             
             matches.append({
                 'job_id': job_id,
@@ -155,8 +228,8 @@ def get_top_job_matches(similarity_matrix, job_ids, job_df, top_n=5):
                 'location': job_row['location'],
                 'department': job_row['department'],
                 'job_level': job_row['job_level'],
-                'similarity_score': float(scores[job_idx]),
-                'match_percentage': float(scores[job_idx] * 100)
+                'similarity_score': float(score),
+                'match_percentage': float(score * 100)
             })
         
         all_matches.append(matches)
@@ -164,7 +237,17 @@ def get_top_job_matches(similarity_matrix, job_ids, job_df, top_n=5):
         if (student_idx + 1) % 300 == 0:
             print_progress(f"Processed {student_idx + 1}/{num_students} students...")
     
-    print(f"\n[SUCCESS] Extracted top {top_n} matches for all {num_students} students!")
+    return all_matches
+
+
+def get_top_job_matches(similarity_matrix, job_ids, job_df, top_n=5):
+    """Get top N job matches for each student from a full similarity matrix"""
+    print_header(f"EXTRACTING TOP {top_n} JOB MATCHES PER STUDENT")
+    
+    top_indices, top_scores = top_k_rows(similarity_matrix, top_n)
+    all_matches = build_job_matches(top_indices, top_scores, job_ids, job_df)
+    
+    print(f"\n[SUCCESS] Extracted top {top_n} matches for all {len(all_matches)} students!")
     return all_matches
 
 
@@ -174,7 +257,7 @@ def extract_student_skills(student_row):
     skill_lists = []
     
     for col in skill_columns:
-        if col in student_row.index and pd.notna(student_row[col]):
+        if col in student_row and pd.notna(student_row[col]):
             skills = parse_skill_list(str(student_row[col]))
             skill_lists.append(skills)
     
@@ -183,21 +266,20 @@ def extract_student_skills(student_row):
 
 def extract_job_skills(job_row):
     """Extract skills required for a job"""
-    if 'required_skills' in job_row.index and pd.notna(job_row['required_skills']):
+    if 'required_skills' in job_row and pd.notna(job_row['required_skills']):
         return parse_skill_list(str(job_row['required_skills']))
     return []
 
 
 def analyze_skill_gaps(student_skills, job_matches, job_df):
     """Analyze skill gaps between student and their top job matches"""
+    job_catalog = as_job_catalog(job_df)
     all_missing_skills = []
     all_matching_skills = []
     job_skill_lists = []
     
     for match in job_matches:
-        job_id = match['job_id']
-        job_row = job_df[job_df['job_id'] == job_id].iloc[0]
-        job_skills = extract_job_skills(job_row)
+        job_skills = job_catalog.required_skills(match['job_id'])
         job_skill_lists.append(job_skills)
         
         # Calculate overlap
@@ -212,9 +294,9 @@ def analyze_skill_gaps(student_skills, job_matches, job_df):
     # Calculate skill priorities
     skill_frequency = extract_skill_frequency(job_skill_lists)
     
-    # Prioritize missing skills by frequency
+    # Prioritize missing skills by frequency (alphabetical within ties)
     priority_skills = []
-    for skill in unique_missing:
+    for skill in sorted(unique_missing):
         frequency = skill_frequency.get(skill, 0)
         priority_score = frequency / len(job_matches) * 10  # Scale to 0-10
         
@@ -234,6 +316,114 @@ def analyze_skill_gaps(student_skills, job_matches, job_df):
     }
 
 
+class SkillGapEngine:
+    """
+    Batch skill gap analysis on CSR skill matrices.
+    
+    With S the student x skill matrix, J the job x skill matrix and M the
+    student x job matrix of top matches, F = M.J counts for every student
+    how many of their matched jobs require each skill. Masking F with S
+    splits it into matching skills (F and S) and missing skills (F, not S),
+    and the missing entries of F are exactly the appears_in_jobs counts of
+    analyze_skill_gaps, so all students are analyzed with two sparse
+    products instead of per-student set arithmetic on strings.
+    """
+    
+    def __init__(self, job_df, vocabulary=None):
+        job_catalog = as_job_catalog(job_df)
+        self.job_ids = list(job_catalog.skills)
+        self.job_row = {job_id: row for row, job_id in enumerate(self.job_ids)}
+        job_skills = [job_catalog.skills[job_id] for job_id in self.job_ids]
+        
+        # Only job skills can be missing or matching; a shared vocabulary
+        # (build_skill_vocabulary.py) is extended with any newer job skills
+        self.vocabulary = vocabulary or SkillVocabulary.from_skill_lists(job_skills)
+        self.job_sets = SkillSets.from_lists(self.job_ids, job_skills, self.vocabulary, add=True)
+        self.job_matrix = self.job_sets.to_csr()
+        self.rank = self.vocabulary.alphabetical_rank()
+    
+    def student_matrix(self, student_skill_lists):
+        """S: student x skill incidence matrix"""
+        student_sets = SkillSets.from_lists(range(len(student_skill_lists)), student_skill_lists,
+                                            self.vocabulary)
+        return student_sets.to_csr(n_skills=len(self.vocabulary))
+    
+    def match_matrix(self, all_job_matches):
+        """M: student x job matrix with one entry per top match"""
+        counts = np.array([len(matches) for matches in all_job_matches], dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        indices = np.array([self.job_row[match['job_id']]
+                            for matches in all_job_matches for match in matches], dtype=np.int64)
+        matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, indptr),
+            shape=(len(all_job_matches), len(self.job_ids))
+        )
+        return matrix, counts
+    
+    def analyze(self, student_skill_lists, all_job_matches):
+        """
+        Skill gaps of every student against their top job matches.
+        
+        Args:
+            student_skill_lists: Normalized skills per student
+            all_job_matches: best_job_matches entries per student
+        
+        Returns:
+            List of skill_gaps dicts, identical to analyze_skill_gaps
+        """
+        student_matrix = self.student_matrix(student_skill_lists)
+        match_matrix, match_counts = self.match_matrix(all_job_matches)
+        
+        # F = M.J: per student, how many matched jobs require each skill
+        frequency = (match_matrix @ self.job_matrix).tocsr()
+        matching = frequency.multiply(student_matrix).tocsr()
+        missing = (frequency - matching).tocsr()
+        matching.eliminate_zeros()
+        missing.eliminate_zeros()
+        matching.sort_indices()
+        missing.sort_indices()
+        
+        # priority_score = round(frequency / len(job_matches) * 10, 2), with
+        # Python's round applied once per distinct (frequency, matches) pair
+        rows = np.repeat(np.arange(missing.shape[0]), np.diff(missing.indptr))
+        appears = np.rint(missing.data).astype(np.int64)
+        base = int(match_counts.max(initial=0)) + 1
+        pairs, inverse = np.unique(appears * base + match_counts[rows], return_inverse=True)
+        table = np.array([round(p // base / (p % base) * 10, 2) for p in pairs.tolist()],
+                         dtype=np.float64)
+        scores = table[inverse]
+        
+        skills = self.vocabulary.skills
+        missing_rank = self.rank[missing.indices]
+        by_name = np.lexsort((missing_rank, rows))
+        by_priority = np.lexsort((missing_rank, -scores, rows))
+        missing_names = [skills[i] for i in missing.indices[by_name].tolist()]
+        priority_names = [skills[i] for i in missing.indices[by_priority].tolist()]
+        priority_scores = scores[by_priority].tolist()
+        priority_appears = appears[by_priority].tolist()
+        
+        matching_rows = np.repeat(np.arange(matching.shape[0]), np.diff(matching.indptr))
+        matching_order = np.lexsort((self.rank[matching.indices], matching_rows))
+        matching_names = [skills[i] for i in matching.indices[matching_order].tolist()]
+        
+        all_gaps = []
+        missing_ptr = missing.indptr.tolist()
+        matching_ptr = matching.indptr.tolist()
+        for row in range(len(all_job_matches)):
+            start, end = missing_ptr[row], missing_ptr[row + 1]
+            all_gaps.append({
+                'missing_skills': missing_names[start:end],
+                'matching_skills': matching_names[matching_ptr[row]:matching_ptr[row + 1]],
+                'priority_skills': [
+                    {'skill': skill, 'priority_score': score, 'appears_in_jobs': appears_in}
+                    for skill, score, appears_in in zip(priority_names[start:end],
+                                                        priority_scores[start:end],
+                                                        priority_appears[start:end])
+                ]
+            })
+        return all_gaps
+
+
 def generate_recommendations(skill_gaps, job_matches):
     """Generate skill recommendations based on gaps and job matches"""
     priority_skills = skill_gaps['priority_skills']
@@ -244,8 +434,9 @@ def generate_recommendations(skill_gaps, job_matches):
     # Secondary skills: next 3-5 priority skills
     secondary_skills = [s['skill'] for s in priority_skills[3:8]]
     
-    # Career paths: unique job titles from top matches
-    career_paths = list(set([match['job_title'] for match in job_matches[:3]]))
+    # Career paths: unique job titles from top matches, in match order
+    # (a set's order would change with the process hash seed)
+    career_paths = list(dict.fromkeys(match['job_title'] for match in job_matches[:3]))
     
     return {
         'immediate_focus': immediate_focus,
@@ -254,26 +445,37 @@ def generate_recommendations(skill_gaps, job_matches):
     }
 
 
-def generate_skill_gap_profiles(embeddings, datasets, similarity_matrix, top_job_matches):
+def generate_skill_gap_profiles(embeddings, datasets, top_job_matches, analysis_date=None):
     """Generate comprehensive skill gap profiles for all students"""
     print_header("GENERATING SKILL GAP PROFILES")
+    analysis_date = analysis_date or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
-    student_df = datasets['students']
-    job_df = datasets['jobs']
+    student_catalog = as_student_catalog(datasets.get('student_catalog', datasets['students']))
+    job_catalog = as_job_catalog(datasets.get('job_catalog', datasets['jobs']))
+    
+    student_ids = embeddings['students']['ids']
+    
+    # Analyze skill gaps for all students at once
+    print_progress("Analyzing skill gaps (sparse batch)...")
+    gap_engine = datasets.get('gap_engine') or SkillGapEngine(
+        job_catalog, vocabulary=datasets.get('skill_vocabulary')
+    )
+    all_skill_gaps = gap_engine.analyze(
+        [student_catalog.skills(student_id) for student_id in student_ids],
+        top_job_matches[:len(student_ids)]
+    )
     
     profiles = []
     
-    for idx, student_id in enumerate(embeddings['students']['ids']):
-        student_row = student_df[student_df['StudentID'] == student_id].iloc[0]
+    for idx, student_id in enumerate(student_ids):
+        student_row = student_catalog.row(student_id)
         
         # Extract student skills
-        student_skills = extract_student_skills(student_row)
+        student_skills = student_catalog.skills(student_id)
         
         # Get job matches
         job_matches = top_job_matches[idx]
-        
-        # Analyze skill gaps
-        skill_gaps = analyze_skill_gaps(student_skills, job_matches, job_df)
+        skill_gaps = all_skill_gaps[idx]
         
         # Generate recommendations
         recommendations = generate_recommendations(skill_gaps, job_matches)
@@ -290,60 +492,82 @@ def generate_skill_gap_profiles(embeddings, datasets, similarity_matrix, top_job
             'best_job_matches': job_matches,
             'skill_gaps': skill_gaps,
             'recommendations': recommendations,
-            'analysis_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'analysis_date': analysis_date
         }
         
         profiles.append(profile)
         
         if (idx + 1) % 300 == 0:
-            print_progress(f"Generated profiles for {idx + 1}/{len(embeddings['students']['ids'])} students...")
+            print_progress(f"Generated profiles for {idx + 1}/{len(student_ids)} students...")
     
     print(f"\n[SUCCESS] Generated {len(profiles)} complete skill gap profiles!")
     return profiles
 
 
-def save_profiles(profiles):
-    """Save profiles to JSON files"""
-    print_header("SAVING PROFILES")
+def profile_statistics(profiles):
+    """
+    Mergeable summary inputs of a list of profiles.
     
-    # Create output directory
-    output_dir = 'skill_gap_profiles'
-    os.makedirs(output_dir, exist_ok=True)
+    Per-student values are kept in profile order (and frequency dicts in
+    first-seen order), so merging shard statistics in shard order gives
+    exactly the statistics of the concatenated profiles.
+    """
+    department_matches = {}
+    missing_frequency = {}
     
-    # Save all profiles
-    print_progress("Saving student_profiles.json...")
-    with open(os.path.join(output_dir, 'student_profiles.json'), 'w', encoding='utf-8') as f:
-        json.dump(profiles, f, indent=2, ensure_ascii=False)
+    for profile in profiles:
+        avg_match = np.mean([m['match_percentage'] for m in profile['best_job_matches']])
+        department_matches.setdefault(profile['department'], []).append(float(avg_match))
+        for skill in profile['skill_gaps']['missing_skills']:
+            missing_frequency[skill] = missing_frequency.get(skill, 0) + 1
     
-    # Generate summary statistics
-    print_progress("Generating summary statistics...")
-    summary = {
+    return {
         'total_students': len(profiles),
-        'analysis_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'average_skills_per_student': round(np.mean([p['skill_count'] for p in profiles]), 2),
-        'average_missing_skills': round(np.mean([len(p['skill_gaps']['missing_skills']) for p in profiles]), 2),
-        'average_matching_skills': round(np.mean([len(p['skill_gaps']['matching_skills']) for p in profiles]), 2),
-        'top_departments': {},
-        'average_match_score_by_department': {}
+        'skill_counts': [p['skill_count'] for p in profiles],
+        'missing_counts': [len(p['skill_gaps']['missing_skills']) for p in profiles],
+        'matching_counts': [len(p['skill_gaps']['matching_skills']) for p in profiles],
+        'department_matches': department_matches,
+        'missing_frequency': missing_frequency
     }
-    
-    # Department statistics
-    dept_counts = {}
-    dept_match_scores = {}
-    
-    for profile in profiles:
-        dept = profile['department']
-        dept_counts[dept] = dept_counts.get(dept, 0) + 1
-        
-        avg_match = np.mean([m['match_percentage'] for m in profile['best_job_matches']])
-        if dept not in dept_match_scores:
-            dept_match_scores[dept] = []
-        dept_match_scores[dept].append(avg_match)
-    
-    summary['top_departments'] = dept_counts
-    summary['average_match_score_by_department'] = {
-        dept: round(np.mean(scores), 2)
-        for dept, scores in dept_match_scores.items()
+
+
+def merge_profile_statistics(all_stats):
+    """Combine profile_statistics results, in order"""
+    merged = {
+        'total_students': 0,
+        'skill_counts': [],
+        'missing_counts': [],
+        'matching_counts': [],
+        'department_matches': {},
+        'missing_frequency': {}
+    }
+    for stats in all_stats:
+        merged['total_students'] += stats['total_students']
+        for key in ('skill_counts', 'missing_counts', 'matching_counts'):
+            merged[key].extend(stats[key])
+        for dept, scores in stats['department_matches'].items():
+            merged['department_matches'].setdefault(dept, []).extend(scores)
+        for skill, count in stats['missing_frequency'].items():
+            merged['missing_frequency'][skill] = merged['missing_frequency'].get(skill, 0) + count
+    return merged
+
+
+def save_summary(stats, output_dir=OUTPUT_DIR, analysis_date=None):
+    """Write summary_statistics.json and top_missing_skills.csv from profile statistics"""
+    print_progress("Generating summary statistics...")
+    summary = {
+        'total_students': stats['total_students'],
+        'analysis_date': analysis_date or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'average_skills_per_student': round(np.mean(stats['skill_counts']), 2),
+        'average_missing_skills': round(np.mean(stats['missing_counts']), 2),
+        'average_matching_skills': round(np.mean(stats['matching_counts']), 2),
+        'top_departments': {
+            dept: len(scores) for dept, scores in stats['department_matches'].items()
+        },
+        'average_match_score_by_department': {
+            dept: round(np.mean(scores), 2)
+            for dept, scores in stats['department_matches'].items()
+        }
     }
     
     # Save summary
@@ -352,63 +576,226 @@ def save_profiles(profiles):
     
     # Extract top missing skills across all students
     print_progress("Extracting top missing skills...")
-    all_missing_skills = []
-    for profile in profiles:
-        all_missing_skills.extend(profile['skill_gaps']['missing_skills'])
-    
-    skill_frequency = {}
-    for skill in all_missing_skills:
-        skill_frequency[skill] = skill_frequency.get(skill, 0) + 1
-    
-    top_missing = get_top_skills(skill_frequency, top_n=50)
+    top_missing = get_top_skills(stats['missing_frequency'], top_n=50)
     
     # Save as CSV
     top_missing_df = pd.DataFrame(top_missing, columns=['Skill', 'Frequency'])
     top_missing_df.to_csv(os.path.join(output_dir, 'top_missing_skills.csv'), index=False)
+
+
+def save_profiles(profiles, output_dir=OUTPUT_DIR, analysis_date=None, legacy_json=False):
+    """Save profiles as JSONL records plus summary files"""
+    print_header("SAVING PROFILES")
+    
+    # Create output directory
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Save all profiles
+    print_progress("Saving student_profiles.jsonl...")
+    profiles_path = os.path.join(output_dir, PROFILES_FILE)
+    write_records(profiles_path, profiles)
+    if legacy_json:
+        export_json_array(profiles_path)
+    
+    save_summary(profile_statistics(profiles), output_dir, analysis_date)
     
     print(f"\n[SUCCESS] All files saved to '{output_dir}/' directory!")
-    print(f"    - student_profiles.json ({len(profiles)} profiles)")
+    print(f"    - student_profiles.jsonl ({len(profiles)} profiles)")
     print(f"    - summary_statistics.json")
     print(f"    - top_missing_skills.csv (top 50 skills)")
 
 
+# =========================================================
+# SHARDED RUNNER
+# =========================================================
+# Students are split into fixed-size shards (independent of the worker
+# count, so output never depends on --workers). Workers load the catalogs
+# from disk and the embeddings through the memory-mapped store, so only
+# shard bounds and small statistics cross process boundaries.
+
+_shard_context = None
+
+
+def shard_bounds(num_students, shard_size=DEFAULT_SHARD_SIZE):
+    """(start, end) student positions of each shard"""
+    return [(start, min(start + shard_size, num_students))
+            for start in range(0, num_students, shard_size)]
+
+
+def shard_path(output_dir, shard):
+    """Profile record set of one shard"""
+    return os.path.join(output_dir, SHARD_DIR, f'student_profiles_{shard:05d}.jsonl')
+
+
+def load_shard_context(index_backend=None):
+    """Embeddings (memory-mapped), catalogs and gap engine of one process"""
+    embeddings = {key: load_embedding_set(key, EMBEDDINGS_DIR) for key in ('students', 'jobs')}
+    datasets = {key: pd.read_csv(filename, encoding='utf-8') for key, filename in DATASET_FILES.items()}
+    datasets['job_catalog'] = JobCatalog(datasets['jobs'])
+    datasets['student_catalog'] = StudentCatalog(datasets['students'])
+    datasets['skill_vocabulary'], _ = load_skill_vocabulary()
+    datasets['gap_engine'] = SkillGapEngine(datasets['job_catalog'], datasets['skill_vocabulary'])
+    job_index = load_embedding_index('jobs', index_backend) if index_backend else None
+    return {'embeddings': embeddings, 'datasets': datasets, 'job_index': job_index}
+
+
+def _init_shard_worker(index_backend):
+    """Load the shared inputs once per worker process"""
+    global _shard_context
+    _shard_context = load_shard_context(index_backend)
+
+
+def _run_shard_in_worker(shard, start, end, options):
+    """Run one shard with the worker's context"""
+    return run_shard(_shard_context, shard, start, end, **options)
+
+
+def run_shard(context, shard, start, end, output_dir=OUTPUT_DIR, analysis_date=None,
+              block_size=DEFAULT_BLOCK_SIZE, max_memory_mb=None):
+    """
+    Match, analyze and write the profiles of students[start:end].
+    
+    Returns:
+        profile_statistics of the shard
+    """
+    embeddings = context['embeddings']
+    datasets = context['datasets']
+    shard_embeddings = {
+        'students': {
+            'ids': embeddings['students']['ids'][start:end],
+            'embeddings': np.asarray(embeddings['students']['embeddings'][start:end])
+        },
+        'jobs': embeddings['jobs']
+    }
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        top_indices, top_scores = compute_top_job_matches(
+            shard_embeddings['students']['embeddings'],
+            embeddings['jobs']['embeddings'],
+            top_n=5,
+            block_size=block_size,
+            max_memory_mb=max_memory_mb,
+            index=context['job_index']
+        )
+        top_job_matches = build_job_matches(
+            top_indices, top_scores, embeddings['jobs']['ids'], datasets['job_catalog']
+        )
+        profiles = generate_skill_gap_profiles(
+            shard_embeddings, datasets, top_job_matches, analysis_date=analysis_date
+        )
+    
+    write_records(shard_path(output_dir, shard), profiles)
+    return profile_statistics(profiles)
+
+
+def run_sharded(workers=1, shard_size=DEFAULT_SHARD_SIZE, output_dir=OUTPUT_DIR,
+                index_backend=None, block_size=DEFAULT_BLOCK_SIZE, max_memory_mb=None,
+                legacy_json=False, analysis_date=None):
+    """
+    Run Step 2 shard by shard on a process pool and merge the results.
+    
+    Args:
+        workers: Worker processes (1 runs the shards in-process)
+        shard_size: Students per shard; a multiple of block_size keeps the
+            similarity blocks identical to an unsharded run
+        output_dir: Directory for shards, merged profiles and summary
+        index_backend: Optional vector index backend for job matching
+        block_size: Students per similarity block within a shard
+        max_memory_mb: Optional ceiling for one similarity block
+        legacy_json: Also write the indented student_profiles.json array
+        analysis_date: Timestamp stored in every profile and the summary
+            (default: now)
+    
+    Returns:
+        Merged profile statistics
+    """
+    print_header(f"GENERATING SKILL GAP PROFILES ({workers} WORKERS)")
+    
+    # One timestamp for the whole run, whichever process writes a profile
+    analysis_date = analysis_date or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    options = {'output_dir': output_dir, 'analysis_date': analysis_date,
+               'block_size': block_size, 'max_memory_mb': max_memory_mb}
+    
+    student_ids = load_embedding_set('students', EMBEDDINGS_DIR)['ids']
+    bounds = shard_bounds(len(student_ids), shard_size)
+    os.makedirs(os.path.join(output_dir, SHARD_DIR), exist_ok=True)
+    for stale in glob.glob(os.path.join(output_dir, SHARD_DIR, 'student_profiles_*')):
+        os.remove(stale)
+    print_progress(f"{len(student_ids)} students in {len(bounds)} shards of up to {shard_size}")
+    
+    all_stats = []
+    if workers == 1:
+        context = load_shard_context(index_backend)
+        for shard, (start, end) in enumerate(bounds):
+            all_stats.append(run_shard(context, shard, start, end, **options))
+            print_progress(f"Shard {shard + 1}/{len(bounds)} done ({end} students)")
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'),
+                                 initializer=_init_shard_worker,
+                                 initargs=(index_backend,)) as pool:
+            futures = [pool.submit(_run_shard_in_worker, shard, start, end, options)
+                       for shard, (start, end) in enumerate(bounds)]
+            # Collected in shard order, so merging is deterministic
+            for shard, future in enumerate(futures):
+                all_stats.append(future.result())
+                print_progress(f"Shard {shard + 1}/{len(bounds)} done ({bounds[shard][1]} students)")
+    
+    stats = merge_profile_statistics(all_stats)
+    print(f"\n[SUCCESS] Generated {stats['total_students']} complete skill gap profiles!")
+    
+    print_header("SAVING PROFILES")
+    print_progress("Merging shards into student_profiles.jsonl...")
+    profiles_path = os.path.join(output_dir, PROFILES_FILE)
+    merge_record_files([shard_path(output_dir, shard) for shard in range(len(bounds))],
+                       profiles_path)
+    if legacy_json:
+        print_progress("Exporting student_profiles.json...")
+        export_json_array(profiles_path)
+    save_summary(stats, output_dir, analysis_date)
+    
+    print(f"\n[SUCCESS] All files saved to '{output_dir}/' directory!")
+    print(f"    - {SHARD_DIR}/ ({len(bounds)} shards)")
+    print(f"    - student_profiles.jsonl ({stats['total_students']} profiles, indexed by student_id)")
+    print(f"    - summary_statistics.json")
+    print(f"    - top_missing_skills.csv (top 50 skills)")
+    return stats
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Skill Gap Analysis Engine - Step 2")
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                        help="students per similarity block")
+    parser.add_argument('--max-memory-mb', type=float, default=None,
+                        help="memory ceiling for one similarity block")
+    parser.add_argument('--index-backend', choices=sorted(BACKENDS), default=None,
+                        help="answer job matching through a vector index (see build_vector_index.py)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes for the student shards")
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+                        help="students per shard (output does not depend on --workers)")
+    parser.add_argument('--legacy-json', action='store_true',
+                        help="also write student_profiles.json as one indented JSON array")
+    return parser.parse_args()
+
+
 def main():
     """Main execution function"""
+    args = parse_args()
     print_header("SKILL GAP ANALYSIS ENGINE - STEP 2")
     print(f"Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
     try:
-        # Load embeddings
-        embeddings = load_embeddings()
-        
-        # Load datasets
-        datasets = load_datasets()
-        
-        # Compute similarity matrix
-        similarity_matrix = compute_similarity_matrix(
-            embeddings['students']['embeddings'],
-            embeddings['jobs']['embeddings']
-        )
-        
-        # Get top job matches
-        top_job_matches = get_top_job_matches(
-            similarity_matrix,
-            embeddings['jobs']['ids'],
-            datasets['jobs'],
-            top_n=5
+        # Match, analyze and write students shard by shard, then merge
+        run_sharded(
+            workers=args.workers,
+            shard_size=args.shard_size,
+            index_backend=args.index_backend,
+            block_size=args.block_size,
+            max_memory_mb=args.max_memory_mb,
+            legacy_json=args.legacy_json
         )
         
-        # Generate skill gap profiles
-        profiles = generate_skill_gap_profiles(
-            embeddings,
-            datasets,
-            similarity_matrix,
-            top_job_matches
-        )
-        
-        # Save profiles
-        save_profiles(profiles)
-        
         print_header("ANALYSIS COMPLETE!")
         print(f"End Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("\nNext Steps:")
@@ -3,6 +3,8 @@ import json
 import os
 import time
 
+from api.utils.storage import DB_PATH, get_student_json
+
 API_URL = "http://127.0.0.1:8000"
 
 def test_full_flow():
@@ -105,15 +107,20 @@ def test_full_flow():
             # ✅ 3. Validate generated files
             print("Validating generated files...")
             
-            # JSON Profile
-            json_path = f"./data/student_inputs/{student_id}.json"
-            if os.path.exists(json_path):
-                print(f"   ✔ JSON Profile found: {json_path}")
+            # Stored student record
+            if get_student_json(student_id) is not None:
+                print(f"   ✔ Student record found: {DB_PATH} ({student_id})")
             else:
-                print(f"   ❌ JSON Profile MISSING: {json_path}")
+                print(f"   ❌ Student record MISSING: {DB_PATH} ({student_id})")
 
-            # PDF Report
-            pdf_path = data.get("pdf_path")
+            # PDF Report (rendered by a background job)
+            for _ in range(60):
+                pdf_status = requests.get(f"{API_URL}/pdf_status/{student_id}").json()
+                if pdf_status.get("status") in ("done", "failed"):
+                    break
+                time.sleep(1)
+            print(f"   PDF job status: {pdf_status.get('status')}")
+            pdf_path = pdf_status.get("pdf_path") or data.get("pdf_path")
             if os.path.exists(pdf_path):
                 print(f"   ✔ PDF Report found: {pdf_path}")
             else:
@@ -123,13 +130,6 @@ def test_full_flow():
                 else:
                      print(f"   ❌ PDF Report MISSING: {pdf_path}")
             
-            # CSV Update (Check if file exists)
-            csv_path = "./data/student_inputs.csv"
-            if os.path.exists(csv_path):
-                print(f"   ✔ CSV Dataset found: {csv_path}")
-            else:
-                print(f"   ❌ CSV Dataset MISSING: {csv_path}")
-
             print("OK")
 
             # ✅ 4. Check dashboard auto-loads with query param
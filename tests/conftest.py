@@ -0,0 +1,18 @@
+# tests/conftest.py
+import pytest
+
+from api.utils import storage, pdf_jobs, twin_export
+
+
+@pytest.fixture
+def student_db(tmp_path, monkeypatch):
+    """Empty student database in tmp_path in place of DATA_DIR/digital_twin.db"""
+    monkeypatch.setattr(storage, 'CSV_FILE', str(tmp_path / 'student_inputs.csv'))
+    monkeypatch.setattr(storage, 'STUDENT_JSON_DIR', str(tmp_path / 'student_inputs'))
+    pool = storage.ConnectionPool(str(tmp_path / 'digital_twin.db'))
+    monkeypatch.setattr(storage, '_pool', pool)
+    # Modules that create their tables once per process
+    monkeypatch.setattr(pdf_jobs, '_schema_pid', None)
+    monkeypatch.setattr(twin_export, '_schema_pid', None)
+    yield pool
+    pool.close()
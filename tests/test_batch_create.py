@@ -0,0 +1,80 @@
+# tests/test_batch_create.py
+import json
+
+from fastapi.testclient import TestClient
+
+import api.main
+from api.main import app
+from api.utils import pdf_jobs
+from api.utils.storage import get_student_json
+from api.utils.twin_cache import TwinCache
+from benchmark_api_concurrency import student_form
+
+
+def _fake_pipeline(students):
+    if any(student['full_name'] == 'Broken' for student in students):
+        raise RuntimeError('model crashed')
+    return [{'best_track': student['preferred_track']} for student in students]
+
+
+def _post(records):
+    r = TestClient(app).post('/create_digital_twins:batch', json=records)
+    assert r.status_code == 200
+    return [json.loads(line) for line in r.text.splitlines()]
+
+
+def test_batch_streams_one_line_per_record(student_db, monkeypatch):
+    monkeypatch.setattr(api.main, 'twin_cache', TwinCache())
+    monkeypatch.setattr(api.main, 'run_student_pipeline_batch', _fake_pipeline)
+    monkeypatch.setattr(api.main, 'BATCH_CHUNK_SIZE', 2)
+    records = [student_form(i) for i in range(5)]
+    records[3]['full_name'] = 'Broken'
+    del records[4]['email']
+
+    lines = _post(records)
+    assert [line.get('index') for line in lines[:-1]] == [0, 1, 2, 3, 4]
+    assert lines[-1]['done'] and lines[-1]['received'] == 5
+    assert lines[-1]['created'] == 2 and lines[-1]['failed'] == 3
+
+    assert [line['student_id'] for line in lines[:2]] == ['S1501', 'S1502']
+    assert lines[0]['digital_twin'] == {'best_track': 'Data Science'}
+    assert lines[0]['pdf_job']['status'] == 'queued'
+    # Records 2 and 3 share the failed chunk; record 4 is invalid
+    assert 'model crashed' in lines[2]['error'] and 'model crashed' in lines[3]['error']
+    assert lines[4]['error'][0]['loc'] == ['email']
+
+    assert get_student_json('S1501')['full_name'] == 'Load Student 0'
+    assert get_student_json('S1503') is None
+    assert pdf_jobs.job_status('S1502')['status'] == 'queued'
+
+
+def test_failed_chunk_uses_no_ids(student_db, monkeypatch):
+    monkeypatch.setattr(api.main, 'twin_cache', TwinCache())
+    monkeypatch.setattr(api.main, 'run_student_pipeline_batch', _fake_pipeline)
+    monkeypatch.setattr(api.main, 'BATCH_CHUNK_SIZE', 1)
+    records = [student_form(0), dict(student_form(1), full_name='Broken'), student_form(2)]
+
+    lines = _post(records)
+    assert lines[0]['student_id'] == 'S1501'
+    assert 'error' in lines[1]
+    assert lines[2]['student_id'] == 'S1502'
+    # Stored twins are served from the cache under the stored payload
+    r = TestClient(app).get('/get_digital_twin/S1502')
+    assert r.json()['digital_twin'] == {'best_track': 'Data Science'}
+    assert r.json()['input_summary']['student_id'] == 'S1502'
+
+
+def test_queue_failure_after_save_reports_created_students(student_db, monkeypatch):
+    monkeypatch.setattr(api.main, 'twin_cache', TwinCache())
+    monkeypatch.setattr(api.main, 'run_student_pipeline_batch', _fake_pipeline)
+
+    def broken(*args):
+        raise RuntimeError('queue locked')
+
+    monkeypatch.setattr(pdf_jobs, 'enqueue_many', broken)
+    lines = _post([student_form(0), student_form(1)])
+    assert [line['student_id'] for line in lines[:-1]] == ['S1501', 'S1502']
+    assert all('error' not in line for line in lines[:-1])
+    assert lines[0]['pdf_job']['status'] == 'not_queued' and 'queue locked' in lines[0]['pdf_job']['error']
+    assert lines[-1]['created'] == 2
+    assert get_student_json('S1502')['full_name'] == 'Load Student 1'
@@ -0,0 +1,66 @@
+# tests/test_build_embeddings.py
+import hashlib
+
+import numpy as np
+
+import build_embeddings
+from build_embeddings import plan_encoding, encode_corpora, text_hash
+from utils.embedding_store import save_embedding_set, load_embedding_set
+
+
+class FakeModel:
+    """Deterministic 384-d vector per text; records what it was asked to encode"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        seeds = [int(hashlib.md5(t.encode()).hexdigest()[:8], 16) for t in texts]
+        return np.stack([np.random.default_rng(s).normal(size=384) for s in seeds]).astype(np.float32)
+
+
+def _build(name, ids, texts, incremental, model_name=build_embeddings.MODEL_NAME):
+    model = FakeModel()
+    plan = plan_encoding(name, ids, texts, incremental)
+    embeddings, counts = encode_corpora(model, [plan])[name]
+    save_embedding_set(name, ids, embeddings, {'model_name': model_name}, build_embeddings.OUTPUT_DIR,
+                       text_hashes=plan['hashes'])
+    return model, embeddings, counts
+
+
+def test_full_build_encodes_each_distinct_text_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_embeddings, 'OUTPUT_DIR', str(tmp_path))
+    model, embeddings, counts = _build('jobs', ['a', 'b', 'c'], ['python sql', 'java', 'python sql'], False)
+    assert model.encoded == ['python sql', 'java']
+    assert counts == {'reused': 0, 'encoded': 3, 'deleted': 0}
+    assert np.array_equal(embeddings[0], embeddings[2])
+
+
+def test_incremental_rebuild_matches_full_rebuild(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_embeddings, 'OUTPUT_DIR', str(tmp_path))
+    _build('jobs', ['a', 'b', 'c', 'd'], ['python', 'java', 'sql', 'excel'], False)
+
+    # b changed, c dropped, e added with a text the store already has
+    ids, texts = ['a', 'b', 'd', 'e'], ['python', 'java spring', 'excel', 'python']
+    model, embeddings, counts = _build('jobs', ids, texts, True)
+    assert model.encoded == ['java spring']
+    assert counts == {'reused': 3, 'encoded': 1, 'deleted': 1}
+
+    stored = load_embedding_set('jobs', str(tmp_path))
+    assert stored['ids'] == ids
+    full = FakeModel().encode(texts)
+    assert np.allclose(stored['embeddings'], full)
+
+
+def test_other_model_reencodes_everything(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_embeddings, 'OUTPUT_DIR', str(tmp_path))
+    _build('jobs', ['a', 'b'], ['python', 'java'], False, model_name='older-model')
+    model, _, counts = _build('jobs', ['a', 'b'], ['python', 'java'], True)
+    assert model.encoded == ['python', 'java'] and counts['reused'] == 0
+
+
+def test_plan_hashes_follow_row_order():
+    plan = plan_encoding('jobs', [1, 2], ['x', 'y'])
+    assert plan['hashes'] == [text_hash('x'), text_hash('y')]
+    assert plan['texts'] == ['x', 'y']
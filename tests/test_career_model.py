@@ -0,0 +1,47 @@
+# tests/test_career_model.py
+import os
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from api.dt_pipeline.career_predictor import CareerModel, MODELS_DIR, academic_features
+from benchmark_api_concurrency import student_form
+
+
+def _load(name):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return joblib.load(os.path.join(MODELS_DIR, name))
+
+
+def test_features_follow_training_column_order():
+    model = CareerModel()
+    feature_list = list(_load('feature_list.pkl'))
+    assert model.feature_names == feature_list
+
+    student = student_form(3)
+    embedding = np.random.default_rng(0).normal(size=model.embedding_dim).astype(np.float32)
+    skill_gaps = {'missing_skills': ['docker', 'aws'], 'priority_skills': [{'priority_score': 2}, {'priority_score': 4}]}
+    row = model.features(student, embedding, skill_gaps)[0]
+
+    expected = dict(academic_features(student), num_missing_skills=2, top_missing_priority=3.0)
+    for name, value in expected.items():
+        assert row[feature_list.index(name)] == np.float32(value), name
+    projected = _load('emb_pca.pkl').transform(embedding[None, :].astype(np.float64))[0]
+    pca_columns = [feature_list.index(f'emb_pca_{i}') for i in range(len(projected))]
+    assert np.allclose(row[pca_columns], projected, atol=1e-4)
+
+
+def test_booster_matches_classifier_predict_proba():
+    model = CareerModel()
+    feature_list = list(_load('feature_list.pkl'))
+    X = pd.read_csv(os.path.join(MODELS_DIR, 'features_all.csv'))[feature_list].fillna(0).head(25)
+    expected = _load('career_model_xgb.pkl').predict_proba(X)
+    probabilities = model.predict_proba(X.values)
+    assert probabilities.shape == expected.shape
+    assert np.allclose(probabilities, expected, atol=1e-6)
+    assert [career for career, _ in model.top_k(probabilities[0], 3)] == [
+        model.classes[i] for i in np.argsort(-expected[0], kind='stable')[:3]
+    ]
@@ -0,0 +1,25 @@
+# tests/test_course_scorer.py
+import random
+
+import numpy as np
+import pandas as pd
+
+from recommendation_engine import CourseScorer, recommend_courses, COURSE_DATA_PATH
+from utils.skill_parser import parse_skill_list
+
+
+def test_batch_scorer_matches_per_student_loop():
+    df_courses = pd.read_csv(COURSE_DATA_PATH)
+    rng = np.random.default_rng(0)
+    course_embeddings = rng.normal(size=(len(df_courses), 16)).astype(np.float32)
+    student_embeddings = rng.normal(size=(30, 16)).astype(np.float32)
+    skills = sorted({s for v in df_courses['SkillsGained'] for s in parse_skill_list(str(v))})
+    sample = random.Random(0)
+    profiles = [{'student_id': f'S{i:04d}', 'skill_gaps': {'missing_skills': sample.sample(skills, sample.randint(0, 4))}}
+                for i in range(30)]
+
+    batch = CourseScorer(course_embeddings, df_courses).recommend(profiles, student_embeddings)
+    for i, profile in enumerate(profiles):
+        loop = recommend_courses(profile, student_embeddings[i], course_embeddings, df_courses)
+        assert [r['course_name'] for r in batch[i]] == [r['course_name'] for r in loop]
+        assert np.allclose([r['score'] for r in batch[i]], [r['score'] for r in loop], atol=1e-5)
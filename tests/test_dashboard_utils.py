@@ -0,0 +1,88 @@
+# tests/test_dashboard_utils.py
+import os
+import json
+
+import pytest
+
+from dashboard import utils as dashboard_utils
+from utils.record_store import RecordReader, write_records
+
+
+@pytest.fixture
+def dashboard_base(tmp_path, monkeypatch):
+    """Dashboard data directory in tmp_path with an empty file cache"""
+    monkeypatch.setattr(dashboard_utils, 'BASE', tmp_path)
+    dashboard_utils.clear_cache()
+    yield tmp_path
+    dashboard_utils.clear_cache()
+
+
+def _write_json(path, data, mtime_ns):
+    path.write_text(json.dumps(data), encoding='utf-8')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_unchanged_file_is_served_from_cache(dashboard_base):
+    path = dashboard_base / 'data.json'
+    _write_json(path, {'value': 1}, 1_000_000_000)
+    calls = []
+
+    def loader(p):
+        calls.append(p)
+        return dashboard_utils._read_json(p)
+
+    first = dashboard_utils.cached('data.json', loader)
+    assert dashboard_utils.cached('data.json', loader) is first
+    assert len(calls) == 1
+
+
+def test_rewritten_file_is_reloaded(dashboard_base):
+    path = dashboard_base / 'data.json'
+    _write_json(path, {'value': 1}, 1_000_000_000)
+    assert dashboard_utils.load_json('data.json') == {'value': 1}
+
+    # Same size, new mtime
+    _write_json(path, {'value': 2}, 2_000_000_000)
+    assert dashboard_utils.load_json('data.json') == {'value': 2}
+
+    # Same mtime, new size
+    _write_json(path, {'value': 30}, 2_000_000_000)
+    assert dashboard_utils.load_json('data.json') == {'value': 30}
+
+
+def test_student_lookup_uses_the_index(dashboard_base, monkeypatch):
+    records = [{'student_id': f'S{i:03d}', 'skills': ['python'] * (i % 4)} for i in range(50)]
+    path = str(dashboard_base / dashboard_utils.PROFILES_PATH)
+    os.makedirs(os.path.dirname(path))
+    write_records(path, records)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("record set was scanned")
+
+    # A lookup must seek through the offset index, never read the whole file
+    monkeypatch.setattr(RecordReader, '_scan', fail)
+    monkeypatch.setattr(RecordReader, '__iter__', fail)
+
+    assert dashboard_utils.get_student_profile('S017') == records[17]
+    assert dashboard_utils.get_student_profile('S049') == records[49]
+    assert dashboard_utils.get_student_profile('S999') is None
+    # One reader (and one index load) is shared by every lookup
+    assert dashboard_utils._records(dashboard_utils.PROFILES_PATH) is \
+        dashboard_utils._records(dashboard_utils.PROFILES_PATH)
+
+
+def test_rewritten_record_set_is_reloaded(dashboard_base):
+    path = str(dashboard_base / dashboard_utils.RECOMMENDATIONS_PATH)
+    os.makedirs(os.path.dirname(path))
+    write_records(path, [{'student_id': 'S001', 'courses': ['a']}])
+    reader = dashboard_utils._records(dashboard_utils.RECOMMENDATIONS_PATH)
+    assert dashboard_utils.get_student_recommendations('S001') == {'student_id': 'S001', 'courses': ['a']}
+
+    write_records(path, [{'student_id': 'S002', 'courses': ['b', 'c']},
+                         {'student_id': 'S001', 'courses': ['d']}])
+    index_path = dashboard_base / 'recommendations' / 'recommendations.idx.json'
+    os.utime(index_path, ns=(3_000_000_000, 3_000_000_000))
+
+    assert dashboard_utils._records(dashboard_utils.RECOMMENDATIONS_PATH) is not reader
+    assert dashboard_utils.get_student_recommendations('S001') == {'student_id': 'S001', 'courses': ['d']}
+    assert dashboard_utils.get_student_recommendations('S002') == {'student_id': 'S002', 'courses': ['b', 'c']}
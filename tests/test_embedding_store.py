@@ -0,0 +1,75 @@
+# tests/test_embedding_store.py
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from utils import embedding_store
+from utils.embedding_store import save_embedding_set, load_embedding_set, load_text_hashes, store_paths
+
+
+def test_round_trip(tmp_path):
+    vectors = np.random.default_rng(0).normal(size=(6, 4)).astype(np.float32)
+    ids = [f'S{i}' for i in range(6)]
+    save_embedding_set('students', ids, vectors, {'model_name': 'm'}, str(tmp_path), text_hashes=list('abcdef'))
+
+    data = load_embedding_set('students', str(tmp_path))
+    assert data['ids'] == ids
+    assert np.array_equal(data['embeddings'], vectors)
+    assert isinstance(data['embeddings'], np.memmap)
+    assert data['metadata']['model_name'] == 'm' and data['metadata']['shape'] == [6, 4]
+    assert data['id_to_row']['S3'] == 3
+    assert load_text_hashes('students', str(tmp_path)) == list('abcdef')
+
+
+def test_float16_and_stale_hashes_removed(tmp_path):
+    vectors = np.ones((3, 4), dtype=np.float32)
+    save_embedding_set('jobs', ['a', 'b', 'c'], vectors, {}, str(tmp_path), text_hashes=['1', '2', '3'])
+    save_embedding_set('jobs', ['a', 'b', 'c'], vectors, {}, str(tmp_path), dtype='float16')
+    data = load_embedding_set('jobs', str(tmp_path))
+    assert data['embeddings'].dtype == np.float16
+    assert load_text_hashes('jobs', str(tmp_path)) is None
+
+
+def test_interrupted_save_is_detected(tmp_path, monkeypatch):
+    save_embedding_set('jobs', ['a'], np.ones((1, 4)), {}, str(tmp_path))
+    meta_path = store_paths('jobs', str(tmp_path))['meta']
+    with open(meta_path) as f:
+        meta = json.load(f)
+    with open(meta_path, 'w') as f:
+        json.dump(dict(meta, writing=True), f)
+
+    monkeypatch.setattr(embedding_store, 'LOAD_RETRIES', 2)
+    monkeypatch.setattr(embedding_store, 'LOAD_RETRY_DELAY', 0)
+    with pytest.raises(RuntimeError):
+        load_embedding_set('jobs', str(tmp_path))
+
+
+def test_concurrent_load_never_misaligns(tmp_path):
+    # Row i of every generation holds the value of its id, so a loader that
+    # pairs one save's vectors with another save's ids is detected
+    def save(n, offset):
+        ids = list(range(offset, offset + n))
+        vectors = np.repeat(np.asarray(ids, dtype=np.float32)[:, None], 4, axis=1)
+        save_embedding_set('jobs', ids, vectors, {}, str(tmp_path))
+
+    save(10, 0)
+    stop = threading.Event()
+
+    def writer():
+        generation = 0
+        while not stop.is_set():
+            generation += 1
+            save(10 + generation % 7, generation * 100)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(200):
+            data = load_embedding_set('jobs', str(tmp_path), mmap=False)
+            assert len(data['ids']) == len(data['embeddings'])
+            assert np.array_equal(data['embeddings'][:, 0], np.asarray(data['ids'], dtype=np.float32))
+    finally:
+        stop.set()
+        thread.join()
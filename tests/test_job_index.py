@@ -0,0 +1,23 @@
+# tests/test_job_index.py
+import numpy as np
+import pandas as pd
+
+from recommendation_engine import recommend_internships, JOB_DATA_PATH
+from utils.job_index import JobIndex
+
+
+def test_index_matches_per_student_scan():
+    df_jobs = pd.read_csv(JOB_DATA_PATH)
+    rng = np.random.default_rng(0)
+    job_embeddings = rng.normal(size=(len(df_jobs), 16)).astype(np.float32)
+    student_embeddings = rng.normal(size=(30, 16)).astype(np.float32)
+
+    index = JobIndex(job_embeddings, df_jobs)
+    batch = index.recommend_internships(student_embeddings)
+    for embedding, matches in zip(student_embeddings, batch):
+        loop = recommend_internships(embedding, job_embeddings, df_jobs)
+        assert [(m['role'], m['company']) for m in matches] == [(m['role'], m['company']) for m in loop]
+        assert np.allclose([m['match'] for m in matches], [m['match'] for m in loop], atol=1e-5)
+    # A single vector is a batch of one
+    single = index.recommend_internships(student_embeddings[3])
+    assert len(single) == 1 and [m['role'] for m in single[0]] == [m['role'] for m in batch[3]]
@@ -0,0 +1,158 @@
+# tests/test_micro_batcher.py
+import asyncio
+import threading
+
+import pytest
+
+from api.utils import micro_batcher
+from api.utils.micro_batcher import MicroBatcher, register_batcher, call_batched
+
+
+def _run(batcher, main):
+    async def wrapper():
+        await batcher.start()
+        try:
+            return await main()
+        finally:
+            await batcher.stop()
+    return asyncio.run(wrapper())
+
+
+def test_concurrent_items_are_coalesced():
+    sizes = []
+
+    def double(items):
+        sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch=8, max_wait_ms=50)
+    results = _run(batcher, lambda: asyncio.gather(*[batcher.submit(i) for i in range(20)]))
+    assert results == [i * 2 for i in range(20)]
+    assert sizes == [8, 8, 4]
+    assert batcher.metrics()['batches'] == 3
+
+
+def test_bad_item_fails_alone():
+    def invert(items):
+        return [1 / item for item in items]
+
+    batcher = MicroBatcher(invert, max_wait_ms=50)
+    results = _run(batcher, lambda: asyncio.gather(*[batcher.submit(i) for i in (1, 0, 4)],
+                                                   return_exceptions=True))
+    assert results[0] == 1 and results[2] == 0.25
+    assert isinstance(results[1], ZeroDivisionError)
+
+
+def test_wrong_result_count_is_an_error():
+    # A short batch result is retried one by one, where each call returns its one result
+    truncating = MicroBatcher(lambda items: items[:1], max_wait_ms=50)
+    results = _run(truncating, lambda: asyncio.gather(*[truncating.submit(i) for i in range(3)]))
+    assert results == [0, 1, 2]
+
+    empty = MicroBatcher(lambda items: [], max_wait_ms=1)
+    with pytest.raises(ValueError):
+        _run(empty, lambda: empty.submit(1))
+
+
+def test_collector_survives_dispatch_errors(monkeypatch):
+    batcher = MicroBatcher(lambda items: items, max_wait_ms=1)
+    calls = []
+    execute = batcher._execute
+
+    async def flaky_execute(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise RuntimeError('dispatch failed')
+        await execute(batch)
+
+    monkeypatch.setattr(batcher, '_execute', flaky_execute)
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await batcher.submit(1)
+        return await batcher.submit(2)
+
+    assert _run(batcher, main) == 2
+
+
+def test_stop_fails_in_flight_items():
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(items):
+        started.set()
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(blocking, max_wait_ms=1)
+
+    async def main():
+        await batcher.start()
+        pending = asyncio.ensure_future(batcher.submit(1))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        queued = asyncio.ensure_future(batcher.submit(2))
+        await asyncio.sleep(0)
+        await batcher.stop()
+        release.set()
+        return await asyncio.gather(pending, queued, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) and 'stopped' in str(r) for r in results)
+
+
+def test_submit_sync_times_out():
+    release = threading.Event()
+    batcher = MicroBatcher(lambda items: release.wait(5) and items, max_wait_ms=1)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        try:
+            with pytest.raises(TimeoutError):
+                await loop.run_in_executor(None, lambda: batcher.submit_sync(1, timeout=0.05))
+        finally:
+            release.set()
+
+    _run(batcher, main)
+
+
+def test_call_batched_uses_direct_path_unless_running(monkeypatch):
+    monkeypatch.setattr(micro_batcher, '_batchers', {})
+    batched = []
+    batcher = register_batcher('square', lambda items: batched.append(items) or [i * i for i in items],
+                               max_wait_ms=1)
+    assert call_batched('square', 3, lambda item: -1) == -1
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        # On the loop thread itself the direct path avoids a deadlock
+        assert call_batched('square', 3, lambda item: -1) == -1
+        return await loop.run_in_executor(None, call_batched, 'square', 3, lambda item: -1)
+
+    assert _run(batcher, main) == 9
+    assert batched == [[3]]
+
+
+def test_timed_out_queued_item_is_not_computed():
+    started, release = threading.Event(), threading.Event()
+    seen = []
+
+    def blocking(items):
+        seen.extend(items)
+        started.set()
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(blocking, max_wait_ms=1)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        first = asyncio.ensure_future(batcher.submit('running'))
+        await loop.run_in_executor(None, started.wait, 5)
+        # Queued behind the running batch, then abandoned by its caller
+        with pytest.raises(TimeoutError):
+            await loop.run_in_executor(None, lambda: batcher.submit_sync('abandoned', timeout=0.05))
+        release.set()
+        assert await first == 'running'
+        return await batcher.submit('next')
+
+    assert _run(batcher, main) == 'next'
+    assert seen == ['running', 'next']
@@ -0,0 +1,63 @@
+# tests/test_pdf_jobs.py
+from api.utils import pdf_jobs
+
+
+def _status(student_id):
+    return pdf_jobs.job_status(student_id)['status']
+
+
+def test_jobs_are_claimed_in_order(student_db):
+    first, second = pdf_jobs.enqueue_many([('S1', {'a': 1}), ('S2', {'a': 2})])
+    assert pdf_jobs.job_status('S2')['queue_position'] == 2
+
+    job = pdf_jobs.claim('w1')
+    assert job['job_id'] == first and job['digital_twin'] == {'a': 1} and job['attempts'] == 1
+    assert _status('S1') == 'running'
+    assert pdf_jobs.job_status('S2')['queue_position'] == 1
+
+    assert pdf_jobs.complete(first, '/tmp/S1.pdf', 'w1')
+    status = pdf_jobs.job_status('S1')
+    assert status['status'] == 'done' and status['pdf_path'] == '/tmp/S1.pdf'
+    assert pdf_jobs.claim('w1')['job_id'] == second
+    assert pdf_jobs.claim('w1') is None
+
+
+def test_failed_job_is_retried_until_max_attempts(student_db, monkeypatch):
+    monkeypatch.setattr(pdf_jobs, 'MAX_ATTEMPTS', 2)
+    job_id = pdf_jobs.enqueue('S1', {})
+    for attempt in range(2):
+        assert pdf_jobs.claim('w1')['attempts'] == attempt + 1
+        assert pdf_jobs.fail(job_id, 'boom', 'w1')
+    status = pdf_jobs.job_status('S1')
+    assert status['status'] == 'failed' and status['error'] == 'boom'
+    assert pdf_jobs.claim('w1') is None
+
+
+def test_expired_lease_is_requeued(student_db, monkeypatch):
+    job_id = pdf_jobs.enqueue('S1', {})
+    monkeypatch.setattr(pdf_jobs, 'JOB_TIMEOUT', -1)
+    assert pdf_jobs.claim('w1')['job_id'] == job_id
+    # The next claim finds the lease expired, requeues and takes the job
+    monkeypatch.setattr(pdf_jobs, 'JOB_TIMEOUT', 300)
+    job = pdf_jobs.claim('w2')
+    assert job['job_id'] == job_id and job['attempts'] == 2
+
+    # The first worker lost the job: its late result or error is discarded
+    assert not pdf_jobs.complete(job_id, '/tmp/stale.pdf', 'w1')
+    assert not pdf_jobs.fail(job_id, 'late error', 'w1')
+    assert _status('S1') == 'running'
+    assert pdf_jobs.complete(job_id, '/tmp/S1.pdf', 'w2')
+    assert pdf_jobs.job_status('S1')['pdf_path'] == '/tmp/S1.pdf'
+    # A finished job cannot be completed or failed again
+    assert not pdf_jobs.fail(job_id, 'again', 'w2')
+    assert _status('S1') == 'done'
+
+
+def test_release_requeues_without_counting_the_attempt(student_db):
+    job_id = pdf_jobs.enqueue('S1', {})
+    pdf_jobs.claim('w1')
+    assert pdf_jobs.release('w2') == 0
+    assert pdf_jobs.release('w1') == 1
+    status = pdf_jobs.job_status('S1')
+    assert status['status'] == 'queued' and status['attempts'] == 0
+    assert pdf_jobs.claim('w2')['job_id'] == job_id
@@ -0,0 +1,94 @@
+# tests/test_record_store.py
+import json
+
+import pytest
+
+from utils.record_store import (
+    RecordWriter, open_records, write_records, merge_record_files, read_records,
+    record_paths, iter_blocks, export_json_array
+)
+
+
+def _records(start, count):
+    # Non-ASCII names check that offsets are byte offsets
+    return [{'student_id': f'S{i:04d}', 'name': f'طالب {i}', 'skills': ['python'] * (i % 3)}
+            for i in range(start, start + count)]
+
+
+def test_round_trip_and_lookup(tmp_path):
+    records = _records(1, 5)
+    assert write_records(str(tmp_path / 'profiles'), records) == 5
+    reader = open_records(str(tmp_path / 'profiles.jsonl'))
+    assert list(reader) == records
+    assert len(reader) == 5 and reader.keys() == [r['student_id'] for r in records]
+    assert reader['S0003'] == records[2]
+    assert 'S0009' not in reader and reader.get('S0009') is None
+    with pytest.raises(KeyError):
+        reader['S0009']
+
+
+def test_duplicate_key_last_wins(tmp_path):
+    with RecordWriter(str(tmp_path / 'profiles')) as writer:
+        writer.write({'student_id': 'S1', 'v': 1})
+        writer.write({'student_id': 'S1', 'v': 2})
+    assert open_records(str(tmp_path / 'profiles'))['S1']['v'] == 2
+
+
+def test_merge_shifts_offsets(tmp_path):
+    parts = [str(tmp_path / f'part{i}') for i in range(3)]
+    for i, part in enumerate(parts):
+        write_records(part, _records(i * 4, 4))
+    assert merge_record_files(parts, str(tmp_path / 'merged')) == 12
+    reader = open_records(str(tmp_path / 'merged'))
+    assert list(reader) == _records(0, 12)
+    assert all(reader[f'S{i:04d}'] == _records(i, 1)[0] for i in range(12))
+
+
+def test_stale_or_missing_index_is_rebuilt(tmp_path):
+    path = str(tmp_path / 'profiles')
+    write_records(path, _records(0, 3))
+    reader = open_records(path)
+    reader.index()
+    # Replace the records behind the reader's back; lookups rescan once
+    with open(record_paths(path)['records'], 'w', encoding='utf-8') as f:
+        for record in _records(10, 2) + _records(0, 1):
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    assert reader['S0000'] == _records(0, 1)[0]
+    assert reader.get('S0011') == _records(11, 1)[0]
+
+    (tmp_path / 'profiles.idx.json').unlink()
+    assert len(open_records(path)) == 3
+
+
+def test_legacy_json_and_export(tmp_path):
+    records = _records(0, 3)
+    legacy = tmp_path / 'legacy.json'
+    with open(legacy, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
+    reader = open_records(str(legacy))
+    assert reader.legacy and reader['S0001'] == records[1] and read_records(str(legacy)) == records
+
+    write_records(str(tmp_path / 'profiles'), records)
+    exported = export_json_array(str(tmp_path / 'profiles'))
+    with open(exported, encoding='utf-8') as f:
+        assert f.read() == legacy.read_text(encoding='utf-8')
+
+    write_records(str(tmp_path / 'empty'), [])
+    with open(export_json_array(str(tmp_path / 'empty'))) as f:
+        assert json.load(f) == []
+
+
+def test_iter_blocks():
+    blocks = list(iter_blocks(iter(range(7)), 3))
+    assert blocks == [(0, [0, 1, 2]), (3, [3, 4, 5]), (6, [6])]
+
+
+def test_failed_writer_keeps_previous_set(tmp_path):
+    path = str(tmp_path / 'profiles')
+    write_records(path, _records(0, 5))
+    with pytest.raises(RuntimeError):
+        with RecordWriter(path) as writer:
+            writer.write(_records(9, 1)[0])
+            raise RuntimeError('crashed midway')
+    assert len(open_records(path)) == 5 and list(open_records(path)) == _records(0, 5)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['profiles.idx.json', 'profiles.jsonl']
@@ -0,0 +1,45 @@
+# tests/test_similarity.py
+import numpy as np
+
+from utils.similarity import top_k_rows, top_k_indices, streaming_top_k, cosine_similarity_block
+
+
+def test_top_k_rows_matches_stable_sort():
+    rng = np.random.default_rng(0)
+    # Rounded scores force ties across the partition boundary
+    scores = np.round(rng.random((50, 40)), 1).astype(np.float32)
+    indices, values = top_k_rows(scores, 5)
+    for row in range(len(scores)):
+        expected = np.argsort(-scores[row], kind="stable")[:5]
+        assert indices[row].tolist() == expected.tolist()
+        assert np.array_equal(values[row], scores[row, expected])
+
+
+def test_top_k_rows_pads_rows_with_few_finite_scores():
+    scores = np.array([[0.5, -np.inf, -np.inf, -np.inf, 0.2],
+                       [-np.inf, -np.inf, -np.inf, -np.inf, -np.inf]], dtype=np.float32)
+    indices, values = top_k_rows(scores, 3)
+    assert indices.tolist() == [[0, 4, -1], [-1, -1, -1]]
+    assert values[0, :2].tolist() == [0.5, np.float32(0.2)]
+    assert np.isneginf(values[0, 2]) and np.isneginf(values[1]).all()
+
+
+def test_top_k_indices_drops_excluded():
+    scores = np.array([0.1, -np.inf, 0.3])
+    assert top_k_indices(scores, 3).tolist() == [2, 0]
+
+
+def test_streaming_top_k_matches_full_matrix():
+    rng = np.random.default_rng(1)
+    X, Y = rng.normal(size=(37, 8)), rng.normal(size=(23, 8))
+    indices, scores, stats = streaming_top_k(X, Y, 4, block_size=5)
+    full_indices, full_scores = top_k_rows(cosine_similarity_block(X, Y), 4)
+    assert np.array_equal(indices, full_indices)
+    assert np.allclose(scores, full_scores, atol=1e-6)
+    assert stats["min"] <= stats["mean"] <= stats["max"]
+
+
+def test_streaming_top_k_empty_catalog():
+    indices, scores, stats = streaming_top_k(np.ones((3, 4)), np.empty((0, 4)), 5)
+    assert indices.shape == (3, 0) and scores.shape == (3, 0)
+    assert np.isnan(stats["mean"])
@@ -0,0 +1,39 @@
+# tests/test_skill_gap_engine.py
+import random
+
+import pandas as pd
+
+from skill_gap_analysis import SkillGapEngine, JobCatalog, analyze_skill_gaps
+from utils.skill_vocabulary import SkillVocabulary
+
+JOBS_PATH = 'egypt_jobs_full_1500_cleaned.csv'
+
+
+def _workload(n_students=200, seed=0):
+    job_catalog = JobCatalog(pd.read_csv(JOBS_PATH))
+    job_ids = list(job_catalog.skills)
+    all_skills = sorted({s for skills in job_catalog.skills.values() for s in skills})
+    rng = random.Random(seed)
+    students = [rng.sample(all_skills, rng.randint(0, 12)) + ['not a job skill'] * rng.randint(0, 1)
+                for _ in range(n_students)]
+    matches = [[{'job_id': job_id} for job_id in rng.sample(job_ids, rng.randint(1, 5))]
+               for _ in range(n_students)]
+    return job_catalog, students, matches
+
+
+def test_engine_matches_analyze_skill_gaps():
+    job_catalog, students, matches = _workload()
+    engine = SkillGapEngine(job_catalog)
+    assert engine.analyze(students, matches) == [
+        analyze_skill_gaps(skills, job_matches, job_catalog) for skills, job_matches in zip(students, matches)
+    ]
+
+
+def test_engine_with_shared_vocabulary():
+    job_catalog, students, matches = _workload(n_students=50, seed=1)
+    # A shared vocabulary missing some job skills is extended by the engine
+    vocabulary = SkillVocabulary.from_skill_lists(list(job_catalog.skills.values())[:100])
+    engine = SkillGapEngine(job_catalog, vocabulary=vocabulary)
+    assert engine.analyze(students, matches) == [
+        analyze_skill_gaps(skills, job_matches, job_catalog) for skills, job_matches in zip(students, matches)
+    ]
@@ -0,0 +1,47 @@
+# tests/test_skill_gap_sharding.py
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import skill_gap_analysis
+from skill_gap_analysis import run_sharded, DATASET_FILES
+from utils.embedding_store import save_embedding_set
+
+ANALYSIS_DATE = '2024-01-01 00:00:00'
+
+
+def _fixture(directory, n_students=37, n_jobs=120):
+    """Small catalogs and random embeddings in a working directory of their own"""
+    repo = os.getcwd()
+    students = pd.read_csv(os.path.join(repo, DATASET_FILES['students'])).head(n_students)
+    jobs = pd.read_csv(os.path.join(repo, DATASET_FILES['jobs'])).head(n_jobs)
+    students.to_csv(directory / DATASET_FILES['students'], index=False)
+    jobs.to_csv(directory / DATASET_FILES['jobs'], index=False)
+    shutil.copy(os.path.join(repo, DATASET_FILES['courses']), directory / DATASET_FILES['courses'])
+
+    rng = np.random.default_rng(0)
+    # Rounded vectors give tied match scores, so tie ordering is exercised
+    embedding_dir = str(directory / skill_gap_analysis.EMBEDDINGS_DIR)
+    save_embedding_set('students', students['StudentID'].tolist(),
+                       np.round(rng.random((n_students, 8)), 1), {}, embedding_dir)
+    save_embedding_set('jobs', jobs['job_id'].tolist(), np.round(rng.random((n_jobs, 8)), 1), {}, embedding_dir)
+
+
+def _outputs(output_dir):
+    names = ['student_profiles.jsonl', 'student_profiles.idx.json', 'summary_statistics.json', 'top_missing_skills.csv']
+    return {name: (output_dir / name).read_bytes() for name in names}
+
+
+def test_output_does_not_depend_on_worker_count(tmp_path, monkeypatch):
+    _fixture(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    options = {'shard_size': 8, 'block_size': 8, 'analysis_date': ANALYSIS_DATE}
+    single = run_sharded(workers=1, output_dir=str(tmp_path / 'one'), **options)
+    sharded = run_sharded(workers=3, output_dir=str(tmp_path / 'three'), **options)
+
+    assert single == sharded and single['total_students'] == 37
+    one, three = _outputs(tmp_path / 'one'), _outputs(tmp_path / 'three')
+    assert one == three
+    assert one['student_profiles.jsonl'].count(b'\n') == 37
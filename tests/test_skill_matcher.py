@@ -0,0 +1,42 @@
+# tests/test_skill_matcher.py
+import re
+
+import pandas as pd
+
+from utils.skill_matcher import SkillMatcher, catalog_vocabulary
+from api.dt_pipeline.skill_extractor import SKILL_PATTERNS
+
+TRICKY_TEXTS = [
+    'C++, C# and .NET; node.js/express',
+    'machine learning (deep learning) with scikit-learn',
+    'javascript not java? java!',
+    'ai_tools, ai-tools, AI',
+    'sql_server mysql postgresql sql',
+    '',
+]
+
+
+def _regex_find(vocabulary, text):
+    """The per-pattern re.search loop SkillMatcher replaces"""
+    text_lower = text.lower()
+    return {skill for skill in vocabulary if re.search(r'\b' + re.escape(skill) + r'\b', text_lower)}
+
+
+def _student_texts(count=200):
+    df = pd.read_csv('students_1500_PRODUCTION_READY.csv').head(count)
+    return (df['Skills'].fillna('') + '. ' + df['Projects'].fillna('') + '. ' + df['TechnicalSkills'].fillna('')).tolist()
+
+
+def test_matches_regex_search_on_catalog_vocabulary():
+    vocabulary = list(dict.fromkeys(SKILL_PATTERNS + catalog_vocabulary() + ['c++', 'c#', '.net', 'ai_tools']))
+    matcher = SkillMatcher(vocabulary, canonical=lambda p: p)
+    for text in TRICKY_TEXTS + _student_texts():
+        assert set(matcher.find(text)) == _regex_find(matcher.patterns, text), text
+
+
+def test_find_orders_canonical_names_by_first_occurrence():
+    matcher = SkillMatcher(['sql', 'python', 'machine learning', 'learning'], canonical=str.title)
+    assert matcher.find('Python, SQL and machine learning; more python') == [
+        'Python', 'Sql', 'Machine Learning', 'Learning'
+    ]
+    assert len(SkillMatcher(['SQL', 'sql ', '', None])) == 1
@@ -0,0 +1,67 @@
+# tests/test_skill_parser.py
+import json
+
+import numpy as np
+import pandas as pd
+
+from clean_datasets import standardize_skills
+from utils.skill_parser import (
+    ALIASES_PATH, SKILL_ALIASES, load_skill_aliases, normalize_skill, normalize_many, parse_skill_list
+)
+
+RAW_SKILLS = ['Python', '  Machine   Learning ', 'NodeJS', 'node  js', 'React JS', 'SKLEARN',
+              'Amazon Web Services', '\tSQL\n', '', '   ', np.nan, None, 42, 'C++', 'تعلم الآلة']
+
+
+def test_aliases_load_from_json():
+    with open(ALIASES_PATH, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+
+    assert raw
+    assert SKILL_ALIASES == {alias.lower().strip(): canonical for alias, canonical in raw.items()}
+    for alias, canonical in raw.items():
+        assert normalize_skill(alias) == canonical
+        assert normalize_skill(f'  {alias.upper()} ') == canonical
+
+
+def test_alias_keys_are_normalized(tmp_path):
+    path = tmp_path / 'aliases.json'
+    path.write_text(json.dumps({'  Node   JS ': 'node.js', 'SkLearn': 'scikit-learn'}), encoding='utf-8')
+
+    assert load_skill_aliases(str(path)) == {'node js': 'node.js', 'sklearn': 'scikit-learn'}
+
+
+def test_cleaning_uses_the_alias_table():
+    assert standardize_skills('NodeJS; sklearn, Python') == 'Node.Js, Scikit-Learn, Python'
+    assert parse_skill_list('NodeJS; sklearn;;Python') == ['node.js', 'scikit-learn', 'python']
+
+
+def test_normalize_many_list_matches_normalize_skill():
+    assert normalize_many(RAW_SKILLS) == [normalize_skill(s) for s in RAW_SKILLS]
+    assert normalize_many(iter(RAW_SKILLS)) == [normalize_skill(s) for s in RAW_SKILLS]
+
+
+def test_normalize_many_series_matches_normalize_skill():
+    series = pd.Series(RAW_SKILLS, index=[f'r{i}' for i in range(len(RAW_SKILLS))], dtype=object)
+
+    result = normalize_many(series)
+
+    assert isinstance(result, pd.Series)
+    assert result.index.equals(series.index)
+    assert result.tolist() == [normalize_skill(s) for s in RAW_SKILLS]
+    assert result['r2'] == 'node.js'
+    assert result['r10'] == '' and result['r11'] == '' and result['r12'] == ''
+
+
+def test_normalize_many_series_with_missing_values():
+    # A float column (all NaN) and a pandas string column with <NA>
+    assert normalize_many(pd.Series([np.nan, np.nan])).tolist() == ['', '']
+    strings = pd.Series(['ReactJS', pd.NA, ' Google Cloud '], dtype='string')
+    assert normalize_many(strings).tolist() == ['react', '', 'gcp']
+
+
+def test_normalize_many_empty_input():
+    assert normalize_many([]) == []
+    result = normalize_many(pd.Series([], dtype=object))
+    assert isinstance(result, pd.Series)
+    assert len(result) == 0
@@ -0,0 +1,143 @@
+# tests/test_skill_vocabulary.py
+import random
+import sys
+
+import numpy as np
+
+import build_skill_vocabulary
+from recommendation_engine import calculate_skill_coverage
+from utils.skill_parser import normalize_skill, calculate_skill_overlap
+from utils.skill_vocabulary import (
+    SkillVocabulary, SkillSets, overlap, coverage_matrix, frequency,
+    save_skill_vocabulary, load_skill_vocabulary
+)
+
+POOL = ['Python', 'SQL', 'machine learning', 'Docker', 'AWS', 'Excel', 'React',
+        'java', 'Linux', 'Git', 'Tableau', 'Kubernetes']
+
+
+def _skill_lists(seed, count, max_len=6):
+    rng = random.Random(seed)
+    return [rng.sample(POOL, rng.randint(0, max_len)) for _ in range(count)]
+
+
+def _normalized(skills):
+    return {normalize_skill(s) for s in skills if normalize_skill(s)}
+
+
+def test_interning_is_sorted_and_normalized():
+    vocabulary = SkillVocabulary.from_skill_lists([['Python', ' SQL '], ['python', '']], [['Docker']])
+
+    assert vocabulary.skills == sorted(vocabulary.skills)
+    assert len(vocabulary) == len(set(vocabulary.skills)) == 3
+    assert vocabulary.id('PYTHON') == vocabulary.id('python')
+    assert 'Sql' in vocabulary
+    assert vocabulary.id('rust') is None
+
+    ids = vocabulary.encode(['sql', 'Python', 'python', 'rust'])
+    assert ids.dtype == np.int32
+    assert ids.tolist() == sorted({vocabulary.id('sql'), vocabulary.id('python')})
+    assert vocabulary.decode(ids) == sorted(_normalized(['sql', 'python']))
+
+
+def test_add_appends_new_ids():
+    vocabulary = SkillVocabulary.from_skill_lists([['python', 'sql']])
+    before = list(vocabulary.skills)
+
+    new_id = vocabulary.add('Rust')
+    assert new_id == len(before)
+    assert vocabulary.add('rust') == new_id
+    assert vocabulary.skills[:len(before)] == before
+    assert vocabulary.decode(vocabulary.encode(['rust', 'zig'], add=True)) == ['rust', 'zig']
+
+    rank = vocabulary.alphabetical_rank()
+    assert [vocabulary.skills[i] for i in np.argsort(rank)] == sorted(vocabulary.skills)
+
+
+def test_save_load_round_trip(tmp_path):
+    lists = _skill_lists(1, 20)
+    vocabulary = SkillVocabulary.from_skill_lists(lists)
+    ids = [f'S{i:03d}' for i in range(len(lists))]
+    sets = SkillSets.from_lists(ids, lists, vocabulary)
+
+    save_skill_vocabulary(vocabulary, {'students': sets}, str(tmp_path))
+    loaded_vocabulary, loaded = load_skill_vocabulary(str(tmp_path))
+
+    assert loaded_vocabulary.skills == vocabulary.skills
+    assert set(loaded) == {'students'}
+    loaded_sets = loaded['students']
+    assert loaded_sets.ids == ids
+    assert loaded_sets.n_skills == len(vocabulary)
+    np.testing.assert_array_equal(loaded_sets.indptr, sets.indptr)
+    np.testing.assert_array_equal(loaded_sets.indices, sets.indices)
+    for entity_id, skills in zip(ids, lists):
+        assert set(loaded_vocabulary.decode(loaded_sets.get(entity_id))) == _normalized(skills)
+
+
+def test_load_without_vocabulary(tmp_path):
+    assert load_skill_vocabulary(str(tmp_path)) == (None, {})
+
+
+def test_overlap_matches_set_reference():
+    lists = _skill_lists(2, 30)
+    vocabulary = SkillVocabulary.from_skill_lists(lists)
+
+    for a, b in zip(lists, reversed(lists)):
+        expected = calculate_skill_overlap(a, b)
+        result = overlap(vocabulary.encode(a), vocabulary.encode(b))
+        for key in ('matching', 'missing_from_1', 'missing_from_2'):
+            assert vocabulary.decode(result[key]) == expected[key]
+
+
+def test_coverage_matrix_matches_set_reference():
+    missing_lists = _skill_lists(3, 15)
+    course_lists = _skill_lists(4, 10)
+    vocabulary = SkillVocabulary.from_skill_lists(missing_lists, course_lists)
+    missing = SkillSets.from_lists(range(len(missing_lists)), missing_lists, vocabulary)
+    courses = SkillSets.from_lists(range(len(course_lists)), course_lists, vocabulary)
+
+    coverage = coverage_matrix(missing, courses)
+
+    assert coverage.shape == (len(missing_lists), len(course_lists))
+    for i, missing_skills in enumerate(missing_lists):
+        for j, course_skills in enumerate(course_lists):
+            expected = calculate_skill_coverage(sorted(_normalized(missing_skills)),
+                                                sorted(_normalized(course_skills)))
+            assert coverage[i, j] == expected
+
+
+def test_coverage_matrix_with_grown_vocabulary_and_counts():
+    vocabulary = SkillVocabulary.from_skill_lists([['python', 'sql']])
+    courses = SkillSets.from_lists([0], [['python', 'sql']], vocabulary)
+    # 'rust' is interned after the courses were encoded, so the sets disagree on n_skills
+    missing = SkillSets.from_lists(['a', 'b'], [['python', 'rust'], []], vocabulary, add=True)
+
+    coverage = coverage_matrix(missing, courses)
+    assert coverage.tolist() == [[0.5], [0.0]]
+    # A missing list with one skill outside the vocabulary keeps it in the denominator
+    assert coverage_matrix(missing, courses, missing_counts=[4, 0]).tolist() == [[0.25], [0.0]]
+
+
+def test_frequency_counts_rows():
+    lists = _skill_lists(5, 25)
+    vocabulary = SkillVocabulary.from_skill_lists(lists)
+    sets = SkillSets.from_lists(range(len(lists)), lists, vocabulary)
+
+    counts = frequency(sets)
+    for skill_id, skill in enumerate(vocabulary.skills):
+        assert counts[skill_id] == sum(skill in _normalized(s) for s in lists)
+    subset = frequency(sets, rows=[0, 3, 7])
+    assert subset.sum() == sum(len(_normalized(lists[r])) for r in (0, 3, 7))
+
+
+def test_build_script_encodes_every_catalog(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['build_skill_vocabulary.py', '--embedding-dir', str(tmp_path)])
+    build_skill_vocabulary.main()
+
+    vocabulary, sets = load_skill_vocabulary(str(tmp_path))
+    catalogs = build_skill_vocabulary.catalog_skill_lists()
+    assert set(sets) == set(catalogs)
+    for name, (ids, skill_lists) in catalogs.items():
+        assert sets[name].ids == ids
+        for row, skills in enumerate(skill_lists):
+            assert set(vocabulary.decode(sets[name].row(row))) == _normalized(skills)
@@ -0,0 +1,99 @@
+# tests/test_stages.py
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.dt_pipeline.student_pipeline import run_student_pipeline
+from api.utils.stages import Stage
+from benchmark_api_concurrency import student_form
+
+
+class _Tracker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def __call__(self, value):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return value * 2
+
+
+def test_semaphore_limits_concurrency():
+    stage = Stage('limited', 2)
+    # A larger executor than the limit, so only the stage semaphore holds calls back
+    stage._executor = ThreadPoolExecutor(8)
+    tracker = _Tracker()
+
+    async def burst():
+        waiting = []
+
+        async def watch():
+            await asyncio.sleep(0.02)
+            waiting.append(stage.metrics()['waiting'])
+
+        results = await asyncio.gather(*[stage.run(tracker, i) for i in range(6)], watch())
+        return results[:-1], waiting
+
+    try:
+        results, waiting = asyncio.run(burst())
+        assert results == [i * 2 for i in range(6)]
+        assert tracker.peak == 2
+        assert waiting == [4]
+
+        # A new event loop gets its own semaphore with the same limit
+        tracker.peak = 0
+
+        async def second_burst():
+            return await asyncio.gather(*[stage.run(tracker, i) for i in range(4)])
+
+        assert asyncio.run(second_burst()) == [0, 2, 4, 6]
+        assert tracker.peak == 2
+    finally:
+        stage.shutdown()
+
+    metrics = stage.metrics()
+    assert metrics['completed'] == 10
+    assert metrics['active'] == metrics['waiting'] == metrics['errors'] == 0
+
+
+def test_errors_are_counted_and_raised():
+    stage = Stage('failing', 1)
+
+    def fail():
+        raise ValueError('boom')
+
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(stage.run(fail))
+    finally:
+        stage.shutdown()
+    assert stage.metrics()['errors'] == 1
+
+
+def test_process_stage_matches_thread_stage():
+    students = [student_form(i) for i in range(3)]
+    thread_stage = Stage('pipeline-thread', 2)
+    process_stage = Stage('pipeline-process', 2, 'process')
+
+    async def run_all(stage):
+        return await asyncio.gather(*[stage.run(run_student_pipeline, student) for student in students])
+
+    try:
+        from_threads = asyncio.run(run_all(thread_stage))
+        from_processes = asyncio.run(run_all(process_stage))
+    finally:
+        thread_stage.shutdown()
+        process_stage.shutdown()
+
+    assert from_processes == from_threads
+    assert process_stage.metrics()['kind'] == 'process'
+    assert process_stage.metrics()['completed'] == len(students)
@@ -0,0 +1,84 @@
+# tests/test_storage.py
+import json
+import threading
+
+import pytest
+
+from api.utils import storage
+from api.utils.storage import (
+    next_student_id, next_student_ids, create_students, save_student, append_student_csv,
+    get_student_json, migrate_flat_files, transaction
+)
+
+
+def test_ids_continue_the_dataset_numbering(student_db):
+    assert next_student_id() == 'S1501'
+    assert next_student_ids(3) == ['S1502', 'S1503', 'S1504']
+    assert next_student_ids(0) == []
+    assert next_student_id() == 'S1505'
+
+
+def test_concurrent_allocation_never_repeats_an_id(student_db):
+    allocated = []
+
+    def allocate():
+        for _ in range(20):
+            allocated.extend(next_student_ids(2))
+
+    threads = [threading.Thread(target=allocate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(allocated) == [f'S{1501 + i}' for i in range(160)]
+
+
+def test_save_and_summary_columns(student_db):
+    save_student('S1501', {'full_name': 'A', 'department': 'CS', 'gpa': 3.2, 'skills': ['Python']})
+    assert get_student_json('S1501')['skills'] == ['Python']
+    # A summary-only update keeps the stored payload
+    append_student_csv('S1501', {'name': 'B', 'department': 'IS'})
+    assert get_student_json('S1501')['full_name'] == 'A'
+    with student_db.connection() as conn:
+        row = conn.execute('SELECT name, department FROM students WHERE student_id = ?', ('S1501',)).fetchone()
+    assert tuple(row) == ('B', 'IS')
+    assert get_student_json('S9999') is None
+
+
+def test_create_students_rolls_back_ids(student_db, monkeypatch):
+    payloads = [{'full_name': 'A'}, {'full_name': 'B'}]
+    assert create_students(payloads) == ['S1501', 'S1502']
+    assert payloads[1]['student_id'] == 'S1502'
+
+    def broken(*args):
+        raise RuntimeError('disk full')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(storage, '_upsert', broken)
+        with pytest.raises(RuntimeError):
+            create_students([{'full_name': 'C'}])
+    assert next_student_id() == 'S1503'
+
+
+def test_migrate_flat_files(student_db, tmp_path):
+    legacy = tmp_path / 'legacy'
+    (legacy / 'student_inputs').mkdir(parents=True)
+    (legacy / 'student_inputs.csv').write_text(
+        'student_id,name,email,department,level,gpa,created_at\n'
+        'S1501,A,a@x,CS,3,3.1,2024-01-01T00:00:00\n'
+        'S1503,C,c@x,IS,2,2.9,\n'
+    )
+    (legacy / 'student_inputs' / 'S1503.json').write_text(json.dumps({'student_id': 'S1503', 'full_name': 'C'}))
+
+    with student_db.connection() as conn, transaction(conn):
+        counts = migrate_flat_files(conn, data_dir=str(legacy))
+    assert counts == {'csv_rows': 2, 'json_files': 1}
+    assert get_student_json('S1503') == {'student_id': 'S1503', 'full_name': 'C'}
+    assert get_student_json('S1501') is None
+    # New ids continue after the highest migrated id
+    assert next_student_id() == 'S1504'
+
+    # Re-running the migration updates rows in place
+    with student_db.connection() as conn, transaction(conn):
+        migrate_flat_files(conn, data_dir=str(legacy))
+        assert conn.execute('SELECT COUNT(*) FROM students').fetchone()[0] == 2
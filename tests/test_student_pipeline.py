@@ -0,0 +1,11 @@
+# tests/test_student_pipeline.py
+from api.dt_pipeline.student_pipeline import run_student_pipeline, run_student_pipeline_batch
+from benchmark_api_concurrency import student_form
+
+
+def test_batch_pipeline_matches_single_runs():
+    students = [student_form(i) for i in range(6)]
+    students[1].update(technical_skills=[], preferred_track='Web Development', desired_career_path='Web')
+    students[4].update(technical_skills=['Java', 'Docker', 'AWS'], gpa=1.9)
+    assert run_student_pipeline_batch(students) == [run_student_pipeline(student) for student in students]
+    assert run_student_pipeline_batch([]) == []
@@ -0,0 +1,124 @@
+# tests/test_twin_cache.py
+import os
+import fnmatch
+import shutil
+
+from fastapi.testclient import TestClient
+
+import api.main
+from api.main import app
+from api.utils import twin_cache as twin_cache_module
+from api.utils.storage import save_student
+from api.utils.twin_cache import TwinCache, etag_for, etag_matches, artifact_version
+
+TWIN = {'best_track': 'Data Science', 'career_predictions': []}
+
+
+def test_memory_and_persistent_tiers(student_db):
+    cache = TwinCache(capacity=1)
+    key = cache.key('S1501', {'name': 'A'})
+    assert cache.get(key) is None
+    cache.put(key, TWIN)
+    assert cache.get(key) == TWIN
+
+    # Evicted from memory by another student, still found in the database
+    cache.put_many([(cache.key('S1502', {'name': 'B'}), {'best_track': 'Web'})])
+    assert cache.get(key) == TWIN
+    # A fresh process only has the database tier
+    assert TwinCache().get(key) == TWIN
+    assert cache.metrics()['memory_hits'] == 1
+    assert cache.metrics()['persistent_hits'] == 1
+    assert cache.metrics()['misses'] == 1
+
+
+def test_changed_payload_or_version_misses(student_db, monkeypatch):
+    cache = TwinCache()
+    monkeypatch.setenv('MODEL_VERSION', 'v1')
+    cache.put(cache.key('S1501', {'name': 'A'}), TWIN)
+    assert cache.get(cache.key('S1501', {'name': 'B'})) is None
+    monkeypatch.setenv('MODEL_VERSION', 'v2')
+    assert cache.get(cache.key('S1501', {'name': 'A'})) is None
+
+
+def test_invalidate(student_db):
+    cache = TwinCache()
+    key = cache.key('S1501', {'name': 'A'})
+    cache.put(key, TWIN)
+    cache.invalidate('S1501')
+    assert cache.get(key) is None
+
+
+def test_artifact_version_is_memoized(monkeypatch):
+    monkeypatch.delenv('MODEL_VERSION', raising=False)
+    calls = []
+    monkeypatch.setattr(twin_cache_module.glob, 'glob', lambda pattern: calls.append(pattern) or [])
+    monkeypatch.setattr(twin_cache_module, 'VERSION_TTL', 60)
+    monkeypatch.setattr(twin_cache_module, '_version', (0.0, ''))
+    version = artifact_version(refresh=True)
+    stats = len(calls)
+    assert artifact_version() == version
+    assert len(calls) == stats
+    artifact_version(refresh=True)
+    assert len(calls) == 2 * stats
+
+
+def test_etag_matches():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"x", "abc"', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"x"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_get_digital_twin_not_modified(student_db, monkeypatch):
+    cache = TwinCache()
+    monkeypatch.setattr(api.main, 'twin_cache', cache)
+    payload = {'student_id': 'S1501', 'name': 'A'}
+    save_student('S1501', payload)
+    key = cache.key('S1501', payload)
+    cache.put(key, TWIN)
+
+    client = TestClient(app)
+    r = client.get('/get_digital_twin/S1501')
+    assert r.status_code == 200
+    assert r.json()['digital_twin'] == TWIN
+    assert r.headers['etag'] == etag_for(key)
+
+    r = client.get('/get_digital_twin/S1501', headers={'If-None-Match': r.headers['etag']})
+    assert r.status_code == 304
+    assert cache.metrics()['not_modified'] == 1
+    assert client.get('/get_digital_twin/S9999').status_code == 404
+
+
+def test_version_covers_catalogs_and_aliases():
+    patterns = [os.path.abspath(p) for p in twin_cache_module.ARTIFACT_PATTERNS]
+    assert os.path.abspath('egypt_jobs_full_1500_cleaned.csv') in patterns
+    assert os.path.abspath('digital_twin_courses_1500_cleaned.csv') in patterns
+    assert any(fnmatch.fnmatch(os.path.abspath('utils/skill_aliases.json'), p) for p in patterns)
+    assert any(fnmatch.fnmatch(os.path.abspath('utils/skill_parser.py'), p) for p in patterns)
+
+
+def test_catalog_update_invalidates_cached_twin(student_db, tmp_path, monkeypatch):
+    monkeypatch.delenv('MODEL_VERSION', raising=False)
+    catalog = tmp_path / 'jobs.csv'
+    shutil.copy('egypt_jobs_full_1500_cleaned.csv', catalog)
+    monkeypatch.setattr(twin_cache_module, 'ARTIFACT_PATTERNS', [str(catalog)])
+    monkeypatch.setattr(twin_cache_module, '_version', (0.0, ''))
+    cache = TwinCache()
+    monkeypatch.setattr(api.main, 'twin_cache', cache)
+    payload = {'student_id': 'S1501', 'name': 'A'}
+    save_student('S1501', payload)
+    cache.put(cache.key('S1501', payload), TWIN)
+
+    client = TestClient(app)
+    etag = client.get('/get_digital_twin/S1501').headers['etag']
+    stat = os.stat(catalog)
+    os.utime(catalog, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    artifact_version(refresh=True)
+    assert cache.get(cache.key('S1501', payload)) is None
+    monkeypatch.setattr(api.main, 'run_student_pipeline', lambda data: {'best_track': 'Web'})
+    r = client.get('/get_digital_twin/S1501', headers={'If-None-Match': etag})
+    assert r.status_code == 200 and r.headers['etag'] != etag
+    assert r.json()['digital_twin'] == {'best_track': 'Web'}
@@ -0,0 +1,92 @@
+# tests/test_twin_export.py
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.main
+from api.main import app
+from api.utils import twin_export
+from api.utils.storage import create_students
+from api.utils.twin_cache import TwinCache
+
+TRACKS = ['Data Science', 'Web', 'Data Science', 'Security', 'Data Science', 'Web']
+
+
+@pytest.fixture
+def client(student_db, monkeypatch):
+    """Six students; the even ones have a cached twin, the odd ones are computed on export"""
+    cache = TwinCache()
+    monkeypatch.setattr(api.main, 'twin_cache', cache)
+    monkeypatch.setattr(twin_export, 'PAGE_SIZE', 2)
+    computed = []
+
+    def pipeline(students):
+        computed.extend(student['student_id'] for student in students)
+        return [{'best_track': student['preferred_track']} for student in students]
+
+    monkeypatch.setattr(api.main, 'run_student_pipeline_batch', pipeline)
+    payloads = [{'full_name': f'Student {i}', 'department': 'CS' if i < 4 else 'IS', 'preferred_track': track}
+                for i, track in enumerate(TRACKS)]
+    student_ids = create_students(payloads)
+    cache.put_many([(cache.key(student_id, payload), {'best_track': payload['preferred_track']})
+                    for student_id, payload in list(zip(student_ids, payloads))[::2]])
+    client = TestClient(app)
+    client.computed = computed
+    return client
+
+
+def _export(client, **params):
+    r = client.get('/digital_twins/export', params=params)
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    return lines[:-1], lines[-1]
+
+
+def test_export_everything(client):
+    rows, summary = _export(client)
+    assert [row['student_id'] for row in rows] == [f'S{1501 + i}' for i in range(6)]
+    assert [row['digital_twin']['best_track'] for row in rows] == TRACKS
+    assert summary == {'done': True, 'exported': 6, 'next_cursor': None}
+    assert client.computed == ['S1502', 'S1504', 'S1506']
+    # Computed twins were cached
+    _export(client)
+    assert len(client.computed) == 3
+
+
+def test_limit_and_resume(client):
+    rows, summary = _export(client, limit=4)
+    assert len(rows) == 4 and summary['next_cursor'] == rows[-1]['cursor']
+    rest, summary = _export(client, cursor=summary['next_cursor'])
+    assert [row['student_id'] for row in rest] == ['S1505', 'S1506']
+    assert summary['next_cursor'] is None
+
+    # A limit that ends exactly on the last twin leaves nothing to resume
+    _, summary = _export(client, limit=6)
+    assert summary['exported'] == 6 and summary['next_cursor'] is None
+
+
+def test_track_filter_with_limit(client):
+    rows, summary = _export(client, track='Data Science', limit=2)
+    assert [row['student_id'] for row in rows] == ['S1501', 'S1503']
+    rows, summary = _export(client, track='Data Science', cursor=summary['next_cursor'])
+    assert [row['student_id'] for row in rows] == ['S1505']
+    assert summary['next_cursor'] is None
+
+    # The last matching twin is followed only by non-matching students
+    rows, summary = _export(client, track='Web', limit=2)
+    assert [row['student_id'] for row in rows] == ['S1502', 'S1506']
+    assert summary['next_cursor'] is None
+
+
+def test_department_filter_and_csv(client):
+    r = client.get('/digital_twins/export', params={'format': 'csv', 'department': 'IS'})
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert [row['student_id'] for row in rows] == ['S1505', 'S1506']
+    assert rows[1]['best_track'] == 'Web' and rows[1]['name'] == 'Student 5'
+
+
+def test_invalid_cursor(client):
+    assert client.get('/digital_twins/export', params={'cursor': '!!'}).status_code == 400
@@ -0,0 +1,100 @@
+# tests/test_vector_index.py
+import os
+import warnings
+
+import numpy as np
+
+from utils import vector_index
+from utils.embedding_store import save_embedding_set, load_embedding_set, content_fingerprint
+from utils.vector_index import (
+    build_index, load_index, index_path, load_embedding_index, embedding_fingerprint, remove_indexes
+)
+
+
+def _save_jobs(embedding_dir, n, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(n, 8)).astype(np.float32)
+    save_embedding_set('jobs', [f'J{i}' for i in range(n)], vectors, {}, str(embedding_dir))
+    return vectors
+
+
+def _persist(embedding_dir, index_dir, backend='flat', **params):
+    data = load_embedding_set('jobs', str(embedding_dir))
+    index = build_index(data['embeddings'], data['ids'], backend, **params)
+    index.source = embedding_fingerprint(data)
+    return index.save(index_path('jobs', backend, str(index_dir)))
+
+
+def test_flat_search_finds_itself(tmp_path):
+    vectors = _save_jobs(tmp_path, 20)
+    positions, scores = build_index(vectors).search(vectors[:5], 3)
+    assert positions[:, 0].tolist() == [0, 1, 2, 3, 4]
+    assert np.allclose(scores[:, 0], 1.0, atol=1e-5)
+
+
+def test_ivf_round_trip(tmp_path):
+    vectors = _save_jobs(tmp_path, 50)
+    path = _persist(tmp_path, tmp_path / 'index', 'ivf', nlist=5, nprobe=5)
+    loaded = load_index(path)
+    positions, _ = loaded.search(vectors[:4], 2)
+    assert positions[:, 0].tolist() == [0, 1, 2, 3]
+
+
+def test_persisted_index_is_reused_when_current(tmp_path):
+    _save_jobs(tmp_path, 20)
+    path = _persist(tmp_path, tmp_path / 'index')
+    mtime = os.path.getmtime(os.path.join(path, 'index.json'))
+    index = load_embedding_index('jobs', 'flat', index_dir=str(tmp_path / 'index'), embedding_dir=str(tmp_path))
+    assert len(index) == 20
+    assert os.path.getmtime(os.path.join(path, 'index.json')) == mtime
+
+
+def test_stale_index_is_rebuilt_after_catalog_change(tmp_path):
+    _save_jobs(tmp_path, 20)
+    _persist(tmp_path, tmp_path / 'index')
+    vectors = _save_jobs(tmp_path, 12, seed=1)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        index = load_embedding_index('jobs', 'flat', index_dir=str(tmp_path / 'index'),
+                                     embedding_dir=str(tmp_path))
+    assert any('rebuilding' in str(w.message) for w in caught)
+    assert len(index) == 12 and index.ids == [f'J{i}' for i in range(12)]
+    positions, _ = index.search(vectors[-1], 1)
+    assert positions[0, 0] == 11
+    # The rebuilt index was persisted
+    reloaded = load_index(index_path('jobs', 'flat', str(tmp_path / 'index')))
+    assert reloaded.source == index.source
+
+
+def test_remove_indexes(tmp_path):
+    _save_jobs(tmp_path, 20)
+    path = _persist(tmp_path, tmp_path / 'index')
+    assert remove_indexes('jobs', str(tmp_path / 'index')) == [path]
+    assert not os.path.exists(path)
+
+
+def test_first_load_persists_the_index(tmp_path, monkeypatch):
+    vectors = _save_jobs(tmp_path, 40)
+    index_dir = str(tmp_path / 'index')
+    built = load_embedding_index('jobs', 'ivf', index_dir=index_dir, embedding_dir=str(tmp_path), nlist=4)
+    assert os.path.exists(os.path.join(index_path('jobs', 'ivf', index_dir), 'index.json'))
+    assert os.listdir(index_dir) == ['jobs_ivf']
+
+    def no_build(*args, **kwargs):
+        raise AssertionError('index rebuilt instead of loaded')
+
+    monkeypatch.setattr(vector_index, 'build_index', no_build)
+    loaded = load_embedding_index('jobs', 'ivf', index_dir=index_dir, embedding_dir=str(tmp_path))
+    assert np.array_equal(loaded.centroids, built.centroids)
+    assert loaded.search(vectors[:3], 1)[0][:, 0].tolist() == [0, 1, 2]
+
+
+def test_fingerprint_comes_from_metadata(tmp_path):
+    vectors = _save_jobs(tmp_path, 10)
+    data = load_embedding_set('jobs', str(tmp_path))
+    assert data['metadata']['fingerprint'] == content_fingerprint([f'J{i}' for i in range(10)], vectors)
+    # Checking freshness does not read the vectors
+    assert embedding_fingerprint(dict(data, embeddings=None)) == data['metadata']['fingerprint']
+    # Sets saved without one are hashed on load
+    legacy = dict(data, metadata={})
+    assert embedding_fingerprint(legacy) == data['metadata']['fingerprint']
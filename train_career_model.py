@@ -17,8 +17,6 @@ Outputs:
 
 import os
 import sys
-import json
-import pickle
 import joblib
 import re
 import numpy as np
@@ -29,6 +27,8 @@ from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split, cross_val_score
 from xgboost import XGBClassifier
 from sklearn.metrics import classification_report, accuracy_score, f1_score
+from utils.embedding_store import load_embedding_set
+from utils.record_store import open_records
 
 # Set encoding for Windows
 if sys.platform == 'win32':
@@ -50,14 +50,13 @@ BASE = Path(".")
 df = pd.read_csv(BASE / "digital_twin_students_1500_cleaned.csv", low_memory=False)
 print(f"   Loaded {len(df)} students")
 
-with open(BASE / "skill_gap_profiles" / "student_profiles.json", "r") as f:
-    profiles = json.load(f)
-print(f"   Loaded {len(profiles)} profiles")
+# Lazy student_id -> profile lookup over the Step 2 record store
+profiles_map = open_records(str(BASE / "skill_gap_profiles" / "student_profiles.jsonl"))
+print(f"   Indexed {len(profiles_map)} profiles")
 
-with open(BASE / "embeddings" / "embeddings_students.pkl", "rb") as f:
-    emb_data = pickle.load(f)
-    student_ids = emb_data['ids']
-    student_embeddings = np.vstack(emb_data['embeddings'])
+emb_data = load_embedding_set("students", str(BASE / "embeddings"))
+student_ids = emb_data['ids']
+student_embeddings = np.asarray(emb_data['embeddings'], dtype=np.float32)
 print(f"   Loaded embeddings: {student_embeddings.shape}")
 
 # ============================================================================
@@ -94,7 +93,6 @@ def map_job_to_class(job_title):
     return "Other"
 
 label_rows = []
-profiles_map = {p['student_id']: p for p in profiles}
 
 for sid in df['StudentID'].astype(str).tolist():
     p = profiles_map.get(sid, {})
@@ -4,6 +4,7 @@ Utility functions for the Digital Twin AI project.
 
 from .skill_parser import (
     normalize_skill,
+    normalize_many,
     parse_skill_list,
     merge_skill_sets,
     calculate_skill_overlap
@@ -11,6 +12,7 @@ from .skill_parser import (
 
 __all__ = [
     'normalize_skill',
+    'normalize_many',
     'parse_skill_list',
     'merge_skill_sets',
     'calculate_skill_overlap'
@@ -0,0 +1,215 @@
+"""
+Memory-mapped embedding store.
+
+Each embedding set is stored as three files in the embeddings directory:
+- embeddings_<name>.npy        raw float32 / float16 matrix
+- embeddings_<name>.ids.json   row ids, in row order
+- embeddings_<name>.meta.json  generation metadata plus dtype / shape
+
+plus an optional embeddings_<name>.hashes.json with the content hash of
+each row's source text, used by incremental rebuilds. The meta file also
+holds a 'fingerprint' of the ids and vectors, computed once at save time,
+so consumers can tell whether the set changed without reading the matrix.
+
+Each file is replaced atomically, but the set is several files, so a save
+is guarded like a seqlock: the meta file is first rewritten with
+'writing': true, then the matrix and ids are replaced, and finally the
+meta file gets the new 'generation'. A loader reads the meta file before
+and after the matrix and ids and retries unless both reads show the same
+finished generation, so it never pairs new vectors with old ids.
+
+Loading opens the matrix with np.load(mmap_mode='r'), so the rows are
+zero-copy read-only views backed by the OS page cache and shared between
+processes (e.g. several uvicorn workers). Sets that have not been migrated
+yet fall back to the legacy embeddings_<name>.pkl files.
+"""
+
+import os
+import json
+import time
+import pickle
+import hashlib
+import numpy as np
+
+EMBEDDINGS_DIR = 'embeddings'
+EMBEDDING_SETS = ('students', 'jobs', 'courses', 'interests')
+
+# Attempts and delay of a load that overlaps a save
+LOAD_RETRIES = 50
+LOAD_RETRY_DELAY = 0.05
+
+
+def store_paths(name, embedding_dir=EMBEDDINGS_DIR):
+    """
+    File paths of an embedding set.
+
+    Args:
+        name: Embedding set name ('students', 'jobs', 'courses', 'interests')
+        embedding_dir: Embeddings directory
+
+    Returns:
+        Dictionary with 'vectors', 'ids', 'meta', 'hashes' and legacy 'pickle' paths
+    """
+    base = os.path.join(embedding_dir, f'embeddings_{name}')
+    return {
+        'vectors': base + '.npy',
+        'ids': base + '.ids.json',
+        'meta': base + '.meta.json',
+        'hashes': base + '.hashes.json',
+        'pickle': base + '.pkl',
+    }
+
+
+def has_store(name, embedding_dir=EMBEDDINGS_DIR):
+    """Return True if the set has been written in the memory-mapped format"""
+    paths = store_paths(name, embedding_dir)
+    return all(os.path.exists(paths[key]) for key in ('vectors', 'ids', 'meta'))
+
+
+def _json_ids(ids):
+    """Convert numpy scalars to plain Python values for JSON"""
+    return [i.item() if hasattr(i, 'item') else i for i in ids]
+
+
+def content_fingerprint(ids, embeddings):
+    """Fingerprint of an embedding set's ids and vectors"""
+    digest = hashlib.sha256(json.dumps(_json_ids(ids), default=str).encode('utf-8'))
+    digest.update(np.ascontiguousarray(embeddings).tobytes())
+    return {'count': len(ids), 'sha256': digest.hexdigest()[:32]}
+
+
+def _atomic_write(path, write):
+    """Write to a temp file and rename, so readers never see a partial file"""
+    tmp = path + '.tmp'
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def save_embedding_set(name, ids, embeddings, metadata=None, embedding_dir=EMBEDDINGS_DIR,
+                       dtype='float32', text_hashes=None):
+    """
+    Write an embedding set in the memory-mapped format.
+
+    Files are replaced atomically and the meta file guards the whole set
+    (see the module docstring), so a concurrent load_embedding_set sees
+    either the old or the new set; processes that already mapped the old
+    matrix keep reading it until they reload.
+
+    Args:
+        name: Embedding set name
+        ids: Row ids aligned with embeddings
+        embeddings: Matrix of shape (n, dim)
+        metadata: Generation metadata (model name, datasets, ...)
+        embedding_dir: Embeddings directory
+        dtype: Storage dtype, 'float32' or 'float16'
+        text_hashes: Optional content hashes of the source texts, aligned with ids
+
+    Returns:
+        Path of the .npy matrix
+    """
+    os.makedirs(embedding_dir, exist_ok=True)
+    paths = store_paths(name, embedding_dir)
+    matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=dtype))
+    if len(ids) != len(matrix):
+        raise ValueError(f"{name}: {len(ids)} ids for {len(matrix)} embeddings")
+
+    previous = _read_meta(paths['meta']) if os.path.exists(paths['meta']) else {}
+    generation = int(previous.get('generation', 0)) + 1
+    meta = dict(metadata or {})
+    meta.update({'dtype': str(matrix.dtype), 'shape': list(matrix.shape), 'generation': generation,
+                 'fingerprint': content_fingerprint(ids, matrix)})
+
+    def write_vectors(tmp):
+        with open(tmp, 'wb') as f:
+            np.save(f, matrix)
+
+    def write_json(value):
+        def write(tmp):
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+        return write
+
+    _atomic_write(paths['meta'], write_json(dict(previous, generation=generation, writing=True)))
+    _atomic_write(paths['vectors'], write_vectors)
+    _atomic_write(paths['ids'], write_json(_json_ids(ids)))
+    if text_hashes is not None:
+        if len(text_hashes) != len(ids):
+            raise ValueError(f"{name}: {len(text_hashes)} text hashes for {len(ids)} ids")
+        _atomic_write(paths['hashes'], write_json(list(text_hashes)))
+    elif os.path.exists(paths['hashes']):
+        # Stale hashes would let an incremental rebuild reuse the wrong rows
+        os.remove(paths['hashes'])
+    _atomic_write(paths['meta'], write_json(meta))
+    return paths['vectors']
+
+
+def _read_meta(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_text_hashes(name, embedding_dir=EMBEDDINGS_DIR):
+    """
+    Content hashes saved with an embedding set.
+
+    Returns:
+        List of hashes aligned with the set's ids, or None if the set was
+        saved without them (or only exists as a legacy pickle)
+    """
+    paths = store_paths(name, embedding_dir)
+    if not (has_store(name, embedding_dir) and os.path.exists(paths['hashes'])):
+        return None
+    with open(paths['hashes'], 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_embedding_set(name, embedding_dir=EMBEDDINGS_DIR, mmap=True):
+    """
+    Load an embedding set.
+
+    Returns the same keys as the legacy pickles ('ids', 'embeddings',
+    'metadata') plus 'id_to_row'. With mmap=True 'embeddings' is a read-only
+    memory map; slicing it gives zero-copy views.
+
+    Args:
+        name: Embedding set name
+        embedding_dir: Embeddings directory
+        mmap: Memory-map the matrix instead of reading it into RAM
+
+    Returns:
+        Dictionary with ids, embeddings, metadata and id_to_row
+    """
+    paths = store_paths(name, embedding_dir)
+
+    if has_store(name, embedding_dir):
+        ids, embeddings, metadata = _load_consistent(name, paths, mmap)
+    else:
+        with open(paths['pickle'], 'rb') as f:
+            data = pickle.load(f)
+        ids = list(data['ids'])
+        embeddings = np.asarray(data['embeddings'])
+        metadata = data.get('metadata', {})
+
+    return {
+        'ids': ids,
+        'embeddings': embeddings,
+        'metadata': metadata,
+        'id_to_row': {sid: row for row, sid in enumerate(ids)},
+    }
+
+
+def _load_consistent(name, paths, mmap):
+    """Matrix, ids and meta of one finished save (retries while a save overlaps)"""
+    for _ in range(LOAD_RETRIES):
+        before = _read_meta(paths['meta'])
+        if not before.get('writing'):
+            embeddings = np.load(paths['vectors'], mmap_mode='r' if mmap else None)
+            with open(paths['ids'], 'r', encoding='utf-8') as f:
+                ids = json.load(f)
+            after = _read_meta(paths['meta'])
+            shape = before.get('shape', [len(ids)])
+            if after == before and len(ids) == embeddings.shape[0] == shape[0]:
+                return ids, embeddings, before
+        time.sleep(LOAD_RETRY_DELAY)
+    raise RuntimeError(f"Embedding set '{name}' is being rewritten or was left incomplete by an "
+                       f"interrupted save; re-run build_embeddings.py")
@@ -0,0 +1,203 @@
+"""
+Cached sentence encoder.
+
+Wraps a SentenceTransformer so that each distinct text is encoded at most
+once: texts are deduplicated inside every batch, looked up in an in-memory
+LRU and then in a persistent SQLite text -> vector cache, and only the
+misses are sent to model.encode. Repeated job titles, tracks and interest
+strings therefore cost one encode across batches and across runs.
+"""
+
+import os
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+DEFAULT_CACHE_PATH = os.path.join('embeddings', 'encoder_cache.sqlite')
+DEFAULT_MEMORY_SIZE = 10000
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_CHUNK = 500
+
+
+def text_key(text):
+    """Cache key of a text (sha256 hex digest)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class CachedEncoder:
+    """
+    Drop-in replacement for SentenceTransformer.encode with a two-tier cache.
+
+    Args:
+        model_name: SentenceTransformer model name; vectors are cached per model
+        cache_path: SQLite cache file, or None for the in-memory tier only
+        memory_size: Maximum number of vectors kept in the in-memory LRU
+        model: Already loaded model; otherwise it is loaded on the first miss
+        device: Device used when loading the model
+        model_loader: Optional zero-argument callable returning the model,
+            used instead of loading it here (e.g. a shared model registry)
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL, cache_path=DEFAULT_CACHE_PATH,
+                 memory_size=DEFAULT_MEMORY_SIZE, model=None, device='cpu', model_loader=None):
+        self.model_name = model_name
+        self.model_loader = model_loader
+        self.cache_path = cache_path
+        self.memory_size = memory_size
+        self.device = device
+        self._model = model
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.reset_stats()
+
+    def _connection(self):
+        """SQLite connection of the persistent tier, opened on first use"""
+        if self._conn is None and self.cache_path:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS vectors ('
+                ' model TEXT NOT NULL, key TEXT NOT NULL, vector BLOB NOT NULL,'
+                ' PRIMARY KEY (model, key))'
+            )
+            self._conn.commit()
+        return self._conn
+
+    @property
+    def model(self):
+        """The wrapped SentenceTransformer, loaded on first use"""
+        if self._model is None:
+            if self.model_loader is not None:
+                return self.model_loader()
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    def reset_stats(self):
+        """Zero the hit-rate counters"""
+        self._stats = {'requested': 0, 'unique': 0, 'memory_hits': 0, 'disk_hits': 0, 'encoded': 0}
+
+    def stats(self):
+        """
+        Cache metrics since the last reset.
+
+        Returns:
+            Dictionary with requested texts, unique texts per batch summed,
+            memory / disk hits, encoded texts and hit rates (hits over
+            unique texts; dedup_rate counts in-batch duplicates as well)
+        """
+        stats = dict(self._stats)
+        hits = stats['memory_hits'] + stats['disk_hits']
+        stats['hit_rate'] = hits / stats['unique'] if stats['unique'] else 0.0
+        saved = stats['requested'] - stats['encoded']
+        stats['dedup_rate'] = saved / stats['requested'] if stats['requested'] else 0.0
+        stats['memory_items'] = len(self._memory)
+        return stats
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, convert_to_numpy=True,
+               **kwargs):
+        """
+        Encode texts, reusing cached vectors.
+
+        Accepts the arguments of SentenceTransformer.encode; extra keyword
+        arguments are passed through for the texts that miss the cache.
+
+        Returns:
+            float32 array of shape (n, dim), or (dim,) for a single string
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        keys = [text_key(t) for t in texts]
+        text_by_key = dict(zip(keys, texts))
+        found = {}
+
+        with self._lock:
+            self._stats['requested'] += len(texts)
+            self._stats['unique'] += len(text_by_key)
+
+            for key in text_by_key:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self._stats['memory_hits'] += len(found)
+
+            pending = [key for key in text_by_key if key not in found]
+            disk = self._load(pending)
+            self._stats['disk_hits'] += len(disk)
+            found.update(disk)
+
+            missing = [key for key in pending if key not in disk]
+            if missing:
+                vectors = self.model.encode(
+                    [text_by_key[key] for key in missing],
+                    batch_size=batch_size,
+                    show_progress_bar=show_progress_bar,
+                    convert_to_numpy=True,
+                    **kwargs
+                )
+                encoded = dict(zip(missing, np.asarray(vectors, dtype=np.float32)))
+                self._stats['encoded'] += len(missing)
+                self._store(encoded)
+                found.update(encoded)
+
+            for key in pending:
+                self._remember(key, found[key])
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        result = np.stack([found[key] for key in keys])
+        if single:
+            return result[0]
+        return result if convert_to_numpy else list(result)
+
+    def _remember(self, key, vector):
+        """Insert into the in-memory LRU, evicting the oldest entries"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _load(self, keys):
+        """Fetch vectors for keys from the SQLite tier"""
+        conn = self._connection()
+        if conn is None or not keys:
+            return {}
+        found = {}
+        for start in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = keys[start:start + _LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f'SELECT key, vector FROM vectors WHERE model = ? AND key IN ({placeholders})',
+                [self.model_name] + chunk
+            )
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def _store(self, vectors):
+        """Write newly encoded vectors to the SQLite tier"""
+        conn = self._connection()
+        if conn is None or not vectors:
+            return
+        conn.executemany(
+            'INSERT OR REPLACE INTO vectors (model, key, vector) VALUES (?, ?, ?)',
+            [(self.model_name, key, vector.tobytes()) for key, vector in vectors.items()]
+        )
+        conn.commit()
+
+    def close(self):
+        """Close the SQLite connection"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
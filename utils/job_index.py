@@ -0,0 +1,146 @@
+"""
+Job catalog index for internship and entry-level matching.
+
+Built once at load time: seniority bucket masks over job titles and
+pre-normalized embedding sub-matrices per bucket, so matching any number of
+students is one matrix multiply plus a row-wise top-k.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+from utils.similarity import row_norms, top_k_rows
+from utils.vector_index import load_embedding_index
+from utils.embedding_store import load_embedding_set
+
+# Title keywords per seniority bucket ('all' is always available)
+SENIORITY_BUCKETS = {
+    'entry': ('intern', 'junior', 'trainee', 'fresh'),
+}
+
+
+class JobIndex:
+    """
+    Seniority-bucketed index over the job catalog embeddings.
+
+    Args:
+        job_embeddings: Matrix of shape (n_jobs, dim), aligned with df_jobs
+        df_jobs: Job catalog DataFrame
+        buckets: Mapping of bucket name to title keywords
+        vector_index: Optional utils.vector_index index over the same jobs;
+            when given, searches go through it with the bucket as filter mask
+    """
+
+    def __init__(self, job_embeddings, df_jobs, buckets=SENIORITY_BUCKETS, vector_index=None):
+        self.df_jobs = df_jobs.reset_index(drop=True)
+        self.vector_index = vector_index
+        job_embeddings = np.asarray(job_embeddings, dtype=np.float32)
+        normalized = job_embeddings / row_norms(job_embeddings)
+
+        titles = self.df_jobs['job_title'].astype(str).str.lower()
+        self.masks = {'all': np.ones(len(self.df_jobs), dtype=bool)}
+        for name, keywords in buckets.items():
+            mask = np.zeros(len(self.df_jobs), dtype=bool)
+            for keyword in keywords:
+                mask |= titles.str.contains(keyword, regex=False).to_numpy()
+            self.masks[name] = mask
+
+        self.bucket_indices = {}
+        self.bucket_embeddings = {}
+        for name, mask in self.masks.items():
+            indices = np.flatnonzero(mask)
+            self.bucket_indices[name] = indices
+            self.bucket_embeddings[name] = np.ascontiguousarray(normalized[indices])
+
+        # Row payloads for formatting results without touching the DataFrame
+        self.companies = self.df_jobs['company'].tolist()
+        self.titles = self.df_jobs['job_title'].tolist()
+        if 'location' in self.df_jobs.columns:
+            self.locations = self.df_jobs['location'].tolist()
+        else:
+            self.locations = ['Egypt'] * len(self.df_jobs)
+
+    def top_k(self, student_embeddings, bucket='entry', k=5):
+        """
+        Top-k jobs in a bucket for a batch of students.
+
+        Falls back to the whole catalog when the bucket is empty.
+
+        Args:
+            student_embeddings: Matrix of shape (n_students, dim) or a single vector
+            bucket: Seniority bucket name
+            k: Number of jobs per student
+
+        Returns:
+            Tuple of (job_indices, similarities), each of shape (n_students, k);
+            job indices refer to rows of df_jobs (-1 for padding when a
+            vector index returns fewer than k hits)
+        """
+        if len(self.bucket_indices.get(bucket, [])) == 0:
+            bucket = 'all'
+
+        students = np.asarray(student_embeddings, dtype=np.float32)
+        if students.ndim == 1:
+            students = students.reshape(1, -1)
+
+        if self.vector_index is not None:
+            return self.vector_index.search(students, k, filter_mask=self.masks[bucket])
+
+        students = students / row_norms(students)
+
+        similarities = students @ self.bucket_embeddings[bucket].T
+        local_indices, scores = top_k_rows(similarities, k)
+        return self.bucket_indices[bucket][local_indices], scores
+
+    def recommend_internships(self, student_embeddings, k=5):
+        """
+        Internship recommendations in the recommend_internships format.
+
+        Args:
+            student_embeddings: Matrix of shape (n_students, dim) or a single vector
+
+        Returns:
+            List with one list of recommendation dicts per student
+        """
+        job_indices, scores = self.top_k(student_embeddings, bucket='entry', k=k)
+        return [
+            [
+                {
+                    "company": self.companies[j],
+                    "role": self.titles[j],
+                    "match": float(score),
+                    "location": self.locations[j],
+                    "missing_skills": []
+                }
+                for j, score in zip(row_indices, row_scores)
+                if j >= 0
+            ]
+            for row_indices, row_scores in zip(job_indices, scores)
+        ]
+
+
+def load_job_index(embedding_dir='embeddings', job_data_path='egypt_jobs_full_1500_cleaned.csv',
+                   backend=None):
+    """
+    Build a JobIndex from the Step 1 job embeddings and the job catalog CSV.
+
+    Args:
+        embedding_dir: Directory containing the jobs embedding set
+        job_data_path: Path to the cleaned jobs CSV
+        backend: Optional vector index backend ('flat', 'ivf', 'hnsw') to
+            search through; None uses the built-in bucket matrices
+
+    Returns:
+        JobIndex aligned with the embedding ids
+    """
+    job_data = load_embedding_set('jobs', embedding_dir)
+
+    df_jobs = pd.read_csv(job_data_path)
+    df_jobs = df_jobs.set_index('job_id').loc[job_data['ids']].reset_index()
+
+    vector_index = None
+    if backend is not None:
+        vector_index = load_embedding_index('jobs', backend, embedding_dir=embedding_dir,
+                                            index_dir=os.path.join(embedding_dir, 'index'))
+    return JobIndex(job_data['embeddings'], df_jobs, vector_index=vector_index)
@@ -0,0 +1,146 @@
+"""
+Multi-process sentence encoder.
+
+Splits the texts into batches of similar length (longest first, so each
+batch pads to a similar size and the slowest batches start early) and
+encodes them on a pool of worker processes, each holding its own copy of
+the SentenceTransformer. encode() has the same signature as
+SentenceTransformer.encode, so the pool can be wrapped by CachedEncoder or
+passed wherever a model is expected.
+"""
+
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_BATCH_SIZE = 32
+
+# Per-worker model, set by _init_worker
+_worker_model = None
+
+
+def length_sorted_batches(texts, batch_size):
+    """
+    Group text positions into batches of similar length.
+
+    Args:
+        texts: List of texts
+        batch_size: Maximum texts per batch
+
+    Returns:
+        List of position arrays, longest texts first
+    """
+    order = np.argsort([-len(t) for t in texts], kind='stable')
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def _init_worker(model_name, device, num_threads):
+    """Load the model once per worker process"""
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+    torch.set_num_threads(num_threads)
+    _worker_model = SentenceTransformer(model_name, device=device)
+
+
+def _encode_batch(texts, kwargs):
+    """Encode one batch in a worker process"""
+    return _worker_model.encode(texts, batch_size=len(texts), show_progress_bar=False,
+                                convert_to_numpy=True, **kwargs).astype(np.float32)
+
+
+class ParallelEncoder:
+    """
+    SentenceTransformer encoding spread over worker processes.
+
+    Args:
+        model_name: SentenceTransformer model name
+        workers: Number of worker processes (1 encodes in-process)
+        batch_size: Texts per length-sorted batch
+        device: Device each worker loads the model on
+        threads_per_worker: torch threads per worker; defaults to an even
+            split of the CPU cores
+    """
+
+    def __init__(self, model_name, workers=None, batch_size=DEFAULT_BATCH_SIZE, device='cpu',
+                 threads_per_worker=None):
+        self.model_name = model_name
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.batch_size = batch_size
+        self.device = device
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+        self._pool = None
+        self._model = None
+
+    def _executor(self):
+        """Worker pool, started on first use"""
+        if self._pool is None:
+            # spawn: torch is not fork-safe once its thread pool is running
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.device, self.threads_per_worker)
+            )
+        return self._pool
+
+    def _local_model(self):
+        """In-process model used when workers == 1"""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    def encode(self, sentences, batch_size=None, show_progress_bar=False, convert_to_numpy=True,
+               **kwargs):
+        """
+        Encode texts, preserving input order.
+
+        Returns:
+            float32 array of shape (n, dim), or (dim,) for a single string
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        batches = length_sorted_batches(texts, batch_size or self.batch_size)
+        kwargs.pop('convert_to_tensor', None)
+
+        if self.workers == 1:
+            model = self._local_model()
+            results = [
+                model.encode([texts[i] for i in batch], batch_size=len(batch), show_progress_bar=False,
+                             convert_to_numpy=True, **kwargs).astype(np.float32)
+                for batch in batches
+            ]
+        else:
+            pool = self._executor()
+            futures = [pool.submit(_encode_batch, [texts[i] for i in batch], kwargs) for batch in batches]
+            results = []
+            for done, future in enumerate(futures, 1):
+                results.append(future.result())
+                if show_progress_bar:
+                    print(f"\r  Batches: {done}/{len(futures)}", end='', flush=True)
+            if show_progress_bar and futures:
+                print()
+
+        if not results:
+            return np.zeros((0, 0), dtype=np.float32)
+        embeddings = np.empty((len(texts), results[0].shape[1]), dtype=np.float32)
+        for batch, vectors in zip(batches, results):
+            embeddings[batch] = vectors
+        if single:
+            return embeddings[0]
+        return embeddings if convert_to_numpy else list(embeddings)
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,305 @@
+"""
+Streaming JSONL record store.
+
+Pipeline outputs such as student_profiles and recommendations are written
+as newline-delimited JSON, one record per line, next to a byte-offset
+index keyed by student_id:
+- <name>.jsonl       one JSON record per line, written incrementally
+- <name>.idx.json    key field, record count and the offset of each key
+
+Readers iterate lazily (one line at a time) or seek straight to a single
+record through the index, so memory stays flat as the student count
+grows. Outputs that were only written in the legacy indented JSON array
+format (<name>.json) are still readable through the same API.
+"""
+
+import os
+import json
+import shutil
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_KEY = 'student_id'
+
+
+def record_paths(path: str) -> Dict[str, str]:
+    """
+    File paths of a record set.
+
+    Args:
+        path: Record set path, with or without a .jsonl / .json extension
+
+    Returns:
+        Dictionary with 'records', 'index' and legacy 'json' paths
+    """
+    stem, ext = os.path.splitext(path)
+    if ext not in ('.jsonl', '.json'):
+        stem = path
+    return {
+        'records': stem + '.jsonl',
+        'index': stem + '.idx.json',
+        'json': stem + '.json',
+    }
+
+
+def has_records(path: str) -> bool:
+    """Return True if the record set exists in either format"""
+    paths = record_paths(path)
+    return os.path.exists(paths['records']) or os.path.exists(paths['json'])
+
+
+class RecordWriter:
+    """
+    Incremental JSONL writer.
+
+    Records go to temp files that replace the previous record set on
+    close(), so readers never see a partial file; abort() (or an exception
+    inside a with block) discards them and keeps the previous set.
+
+    Args:
+        path: Record set path
+        key: Record field the index is keyed by (last record wins on
+            duplicates, like building a dict)
+    """
+
+    def __init__(self, path: str, key: str = DEFAULT_KEY):
+        self.paths = record_paths(path)
+        self.key = key
+        self.offsets: Dict[Any, int] = {}
+        self.count = 0
+        os.makedirs(os.path.dirname(self.paths['records']) or '.', exist_ok=True)
+        self._file = open(self.paths['records'] + '.tmp', 'wb')
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Append one record"""
+        self.write_line(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n',
+                        record.get(self.key))
+
+    def write_line(self, line: bytes, record_key: Any) -> None:
+        """Append one already serialized record line"""
+        if record_key is not None:
+            self.offsets[record_key] = self._file.tell()
+        self._file.write(line)
+        self.count += 1
+
+    def close(self) -> None:
+        """Flush the records and write the index"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        index = {'key': self.key, 'count': self.count, 'offsets': self.offsets}
+        with open(self.paths['index'] + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(self.paths['records'] + '.tmp', self.paths['records'])
+        os.replace(self.paths['index'] + '.tmp', self.paths['index'])
+
+    def abort(self) -> None:
+        """Discard the records written so far, keeping the previous record set"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        for tmp in (self.paths['records'] + '.tmp', self.paths['index'] + '.tmp'):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if exc[0] is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+def write_records(path: str, records: Iterable[Dict[str, Any]], key: str = DEFAULT_KEY) -> int:
+    """
+    Write an iterable of records.
+
+    Returns:
+        Number of records written
+    """
+    with RecordWriter(path, key) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
+
+
+def merge_record_files(sources: Iterable[str], path: str, key: str = DEFAULT_KEY) -> int:
+    """
+    Concatenate record sets in order, without parsing the records.
+
+    Each source's index offsets are shifted by the bytes already written.
+
+    Returns:
+        Number of records written
+    """
+    with RecordWriter(path, key) as writer:
+        out = writer._file
+        for source in sources:
+            reader = RecordReader(source, key)
+            base = out.tell()
+            for record_key, offset in reader.index()['offsets'].items():
+                writer.offsets[record_key] = base + offset
+            with open(reader.paths['records'], 'rb') as f:
+                shutil.copyfileobj(f, out)
+            writer.count += len(reader)
+    return writer.count
+
+
+class RecordReader:
+    """
+    Lazy reader for a record set.
+
+    Iterating yields records one at a time; get() / [] seek to a single
+    record through the offset index. Behaves like a read-only mapping of
+    key -> record, so it can stand in for the {student_id: profile} dicts
+    the pipeline used to build.
+
+    Args:
+        path: Record set path
+        key: Record field used for lookups
+    """
+
+    def __init__(self, path: str, key: str = DEFAULT_KEY):
+        self.paths = record_paths(path)
+        self.key = key
+        self.legacy = not os.path.exists(self.paths['records'])
+        if self.legacy and not os.path.exists(self.paths['json']):
+            raise FileNotFoundError(f"No records at {self.paths['records']} or {self.paths['json']}")
+        self._index = None
+        self._legacy_map = None
+
+    def index(self) -> Dict[str, Any]:
+        """Offset index, loaded on first use (rebuilt by a scan if missing)"""
+        if self._index is None:
+            if not self.legacy and os.path.exists(self.paths['index']):
+                with open(self.paths['index'], 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            else:
+                self._index = self._scan()
+        return self._index
+
+    def _scan(self) -> Dict[str, Any]:
+        """Build the index by reading every record"""
+        offsets = {}
+        count = 0
+        if self.legacy:
+            for record in self:
+                offsets[record.get(self.key)] = count
+                count += 1
+        else:
+            with open(self.paths['records'], 'rb') as f:
+                offset = f.tell()
+                for line in iter(f.readline, b''):
+                    if line.strip():
+                        offsets[json.loads(line).get(self.key)] = offset
+                        count += 1
+                    offset = f.tell()
+        return {'key': self.key, 'count': count, 'offsets': offsets}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self.legacy:
+            with open(self.paths['json'], 'r', encoding='utf-8') as f:
+                yield from json.load(f)
+            return
+        with open(self.paths['records'], 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def __len__(self) -> int:
+        return self.index()['count']
+
+    def keys(self) -> List[Any]:
+        """Record keys, in file order"""
+        return list(self.index()['offsets'])
+
+    def __contains__(self, record_key: Any) -> bool:
+        return record_key in self.index()['offsets']
+
+    def get(self, record_key: Any, default: Any = None) -> Any:
+        """Record with the given key, or default"""
+        offset = self.index()['offsets'].get(record_key)
+        if offset is None:
+            return default
+        if self.legacy:
+            if self._legacy_map is None:
+                self._legacy_map = {r.get(self.key): r for r in self}
+            return self._legacy_map.get(record_key, default)
+        record = self._read_at(offset)
+        if record is None or record.get(self.key) != record_key:
+            # Records were replaced after the index was read: rebuild it once
+            self._index = self._scan()
+            offset = self._index['offsets'].get(record_key)
+            record = self._read_at(offset) if offset is not None else None
+        return record if record is not None else default
+
+    def _read_at(self, offset: int) -> Optional[Dict[str, Any]]:
+        """Record starting at a byte offset"""
+        with open(self.paths['records'], 'rb') as f:
+            f.seek(offset)
+            line = f.readline()
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    def __getitem__(self, record_key: Any) -> Dict[str, Any]:
+        record = self.get(record_key)
+        if record is None:
+            raise KeyError(record_key)
+        return record
+
+
+def open_records(path: str, key: str = DEFAULT_KEY) -> RecordReader:
+    """Open a record set for lazy reading"""
+    return RecordReader(path, key)
+
+
+def read_records(path: str) -> List[Dict[str, Any]]:
+    """Load every record of a set into a list"""
+    return list(RecordReader(path))
+
+
+def iter_blocks(records: Iterable[Dict[str, Any]], block_size: int):
+    """
+    Group a record stream into blocks.
+
+    Yields:
+        (start position, list of up to block_size records)
+    """
+    block = []
+    start = 0
+    for record in records:
+        block.append(record)
+        if len(block) == block_size:
+            yield start, block
+            start += block_size
+            block = []
+    if block:
+        yield start, block
+
+
+def export_json_array(path: str, destination: Optional[str] = None) -> str:
+    """
+    Write a record set in the legacy indented JSON array format.
+
+    Streams one record at a time; the output matches
+    json.dump(records, f, indent=2, ensure_ascii=False).
+
+    Returns:
+        Path written
+    """
+    destination = destination or record_paths(path)['json']
+    with open(destination + '.tmp', 'w', encoding='utf-8') as out:
+        out.write('[')
+        first = True
+        for record in RecordReader(path):
+            out.write('\n  ' if first else ',\n  ')
+            out.write(json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  '))
+            first = False
+        out.write(']' if first else '\n]')
+    os.replace(destination + '.tmp', destination)
+    return destination
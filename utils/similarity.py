@@ -0,0 +1,204 @@
+"""
+Vectorized similarity helpers shared by the matching and recommendation steps.
+"""
+
+import numpy as np
+
+
+def row_norms(X):
+    """
+    Compute L2 norms of matrix rows, replacing zeros to avoid division errors.
+
+    Args:
+        X: Matrix of shape (n_samples, n_features)
+
+    Returns:
+        Column vector of shape (n_samples, 1)
+    """
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1e-10
+    return norms
+
+
+def cosine_similarity_block(X, Y, x_norms=None, y_norms=None):
+    """
+    Cosine similarity between a block of rows and a catalog.
+
+    Uses the same dot / (norm x norm) form as the per-student loops so
+    batch and loop paths agree to float32 precision.
+
+    Args:
+        X: Matrix of shape (n_x, n_features)
+        Y: Matrix of shape (n_y, n_features)
+        x_norms: Optional precomputed row norms of X
+        y_norms: Optional precomputed row norms of Y
+
+    Returns:
+        Similarity matrix of shape (n_x, n_y)
+    """
+    X = np.asarray(X, dtype=np.float32)
+    Y = np.asarray(Y, dtype=np.float32)
+    if x_norms is None:
+        x_norms = row_norms(X)
+    if y_norms is None:
+        y_norms = row_norms(Y)
+    return np.dot(X, Y.T) / np.dot(x_norms, y_norms.T)
+
+
+def top_k_indices(scores, k):
+    """
+    Indices of the k highest scores, best first.
+
+    Uses argpartition to avoid sorting the whole vector. Ties are broken by
+    the lower index, matching a stable descending sort of the full vector.
+    Entries equal to -inf are treated as excluded.
+
+    Args:
+        scores: 1-D array of scores
+        k: Number of indices to return
+
+    Returns:
+        Array of at most k indices
+    """
+    n = scores.shape[0]
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k < n:
+        part = np.argpartition(-scores, k - 1)[:k]
+        kth = scores[part].min()
+        # Keep every entry tied with the kth score so tie-breaking is exact
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(n)
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    top = candidates[order[:k]]
+    return top[np.isfinite(scores[top])]
+
+
+def top_k_rows(scores, k):
+    """
+    Row-wise top-k over a score matrix, best first.
+
+    Vectorized argpartition over all rows; rows whose kth score is tied with
+    entries outside the partition fall back to top_k_indices so ordering
+    matches a stable descending sort of each row. Slots past a row's finite
+    scores hold index -1 and score -inf.
+
+    Args:
+        scores: Matrix of shape (n_rows, n_cols)
+        k: Number of columns to keep per row
+
+    Returns:
+        Tuple of (indices, values), each of shape (n_rows, min(k, n_cols))
+    """
+    n_rows, n_cols = scores.shape
+    k = min(k, n_cols)
+    if k <= 0 or n_rows == 0:
+        empty = np.empty((n_rows, 0), dtype=np.int64)
+        return empty, np.empty((n_rows, 0), dtype=scores.dtype)
+
+    if k < n_cols:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.tile(np.arange(n_cols), (n_rows, 1))
+    part_scores = np.take_along_axis(scores, part, axis=1)
+
+    # Order each row by (-score, index)
+    order = np.lexsort((part, -part_scores), axis=1)
+    indices = np.take_along_axis(part, order, axis=1)
+
+    if k < n_cols:
+        kth = part_scores.min(axis=1)
+        tied = np.flatnonzero((scores >= kth[:, None]).sum(axis=1) > k)
+        for row in tied:
+            top = top_k_indices(scores[row], k)
+            indices[row] = -1
+            indices[row, :len(top)] = top
+
+    values = np.take_along_axis(scores, np.maximum(indices, 0), axis=1)
+    unused = (indices < 0) | np.isneginf(values)
+    indices[unused] = -1
+    values[unused] = -np.inf
+    return indices, values
+
+
+def normalize_rows(X):
+    """
+    L2-normalize matrix rows as float32.
+
+    Args:
+        X: Matrix of shape (n_samples, n_features)
+
+    Returns:
+        Normalized float32 matrix of the same shape
+    """
+    X = np.asarray(X, dtype=np.float32)
+    return X / row_norms(X)
+
+
+def block_rows_for_memory(n_cols, max_memory_mb):
+    """
+    Number of rows per block that keeps one block's working set under a ceiling.
+
+    A block needs the float32 similarity block, its negated copy used by
+    argpartition and the int64 partition indices: about 16 bytes per cell.
+
+    Args:
+        n_cols: Number of catalog items (columns of the similarity block)
+        max_memory_mb: Memory ceiling in megabytes
+
+    Returns:
+        Block size in rows (at least 1)
+    """
+    bytes_per_row = max(1, n_cols) * 16
+    return max(1, int(max_memory_mb * 1024 * 1024 // bytes_per_row))
+
+
+def streaming_top_k(X, Y, k, block_size=1024, max_memory_mb=None, Y_normalized=False):
+    """
+    Top-k cosine matches of every row of X against Y without building the
+    full similarity matrix.
+
+    Rows of X are processed in blocks; each side is normalized once.
+
+    Args:
+        X: Query matrix of shape (n_x, n_features)
+        Y: Catalog matrix of shape (n_y, n_features)
+        k: Matches per query row
+        block_size: Query rows per block
+        max_memory_mb: Optional ceiling for a block's working set; lowers block_size if needed
+        Y_normalized: Skip normalizing Y when it is already unit-length
+
+    Returns:
+        Tuple of (indices, scores, stats) where indices/scores have shape
+        (n_x, min(k, n_y)) and stats holds min/max/mean similarity (NaN
+        for an empty catalog)
+    """
+    Yn = np.asarray(Y, dtype=np.float32) if Y_normalized else normalize_rows(Y)
+    n_x, n_y = len(X), Yn.shape[0]
+    if n_y == 0 or n_x == 0:
+        k = min(k, n_y)
+        return (np.empty((n_x, k), dtype=np.int64), np.empty((n_x, k), dtype=np.float32),
+                {'min': np.nan, 'max': np.nan, 'mean': np.nan})
+    if max_memory_mb is not None:
+        block_size = min(block_size, block_rows_for_memory(n_y, max_memory_mb))
+
+    k = min(k, n_y)
+    indices = np.empty((n_x, k), dtype=np.int64)
+    scores = np.empty((n_x, k), dtype=np.float32)
+    stats = {'min': np.inf, 'max': -np.inf, 'sum': 0.0}
+
+    for start in range(0, n_x, block_size):
+        block = normalize_rows(X[start:start + block_size])
+        sims = block @ Yn.T
+        stats['min'] = min(stats['min'], float(sims.min()))
+        stats['max'] = max(stats['max'], float(sims.max()))
+        stats['sum'] += float(sims.sum(dtype=np.float64))
+        block_indices, block_scores = top_k_rows(sims, k)
+        indices[start:start + len(block)] = block_indices
+        scores[start:start + len(block)] = block_scores
+
+    stats['mean'] = stats.pop('sum') / max(1, n_x * n_y)
+    return indices, scores, stats
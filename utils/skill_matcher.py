@@ -0,0 +1,163 @@
+"""
+Single-pass skill matching over free text.
+
+Compiles a skill vocabulary once into an Aho-Corasick automaton, so a text
+is scanned once regardless of vocabulary size (tens of thousands of skills
+from the job / course catalogs), instead of one regex search per skill.
+
+Matches follow the semantics of re.search(r'\\b' + re.escape(skill) + r'\\b')
+on the lowercased text: a skill matches if any occurrence has a word
+boundary on both sides, and occurrences may overlap.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.skill_parser import normalize_skill
+
+# Separators used by the catalog skill columns (jobs / courses use commas,
+# student skill columns use semicolons)
+CATALOG_SEPARATORS = re.compile(r'[;,]')
+
+
+def _is_word(char: str) -> bool:
+    """Same character class as the regex \\w for str patterns"""
+    return char.isalnum() or char == '_'
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick matcher over a skill vocabulary.
+
+    Args:
+        patterns: Skill strings to look for (matched case-insensitively)
+        canonical: Function mapping a pattern to the name reported for it
+    """
+
+    def __init__(self, patterns: Iterable[str], canonical=normalize_skill):
+        self.patterns: List[str] = []
+        seen = set()
+        for pattern in patterns:
+            pattern = pattern.lower().strip() if isinstance(pattern, str) else ''
+            if pattern and pattern not in seen:
+                seen.add(pattern)
+                self.patterns.append(pattern)
+        self.names = [canonical(p) or p for p in self.patterns]
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _build(self) -> None:
+        """Build the goto, failure and output tables"""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(index)
+
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and char not in goto[f]:
+                    f = fail[f]
+                fallback = goto[f].get(char, 0)
+                fail[nxt] = fallback if fallback != nxt else 0
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+        # Boundary class of the first / last character of each pattern
+        self._starts_word = [_is_word(p[0]) for p in self.patterns]
+        self._ends_word = [_is_word(p[-1]) for p in self.patterns]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        All bounded occurrences in a text.
+
+        Returns:
+            List of (start, end, pattern_index) in order of their end position
+        """
+        if not text:
+            return []
+        text = text.lower()
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        patterns = self.patterns
+        length = len(text)
+        found = []
+        state = 0
+        for pos, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not outputs[state]:
+                continue
+            end = pos + 1
+            after_word = end < length and _is_word(text[end])
+            for index in outputs[state]:
+                start = end - len(patterns[index])
+                before_word = start > 0 and _is_word(text[start - 1])
+                # \b holds where word-ness changes
+                if before_word != self._starts_word[index] and after_word != self._ends_word[index]:
+                    found.append((start, end, index))
+        return found
+
+    def find(self, text: str) -> List[str]:
+        """
+        Canonical names of the skills in a text.
+
+        Returns:
+            Unique names, ordered by first occurrence
+        """
+        names = []
+        seen = set()
+        for start, _, index in sorted(self.find_all(text)):
+            name = self.names[index]
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+        return names
+
+
+def catalog_vocabulary(job_data_path: str = 'egypt_jobs_full_1500_cleaned.csv',
+                       course_data_path: str = 'digital_twin_courses_1500_cleaned.csv',
+                       student_data_path: Optional[str] = None) -> List[str]:
+    """
+    Skill vocabulary drawn from the catalogs.
+
+    Args:
+        job_data_path: Jobs CSV (required_skills column)
+        course_data_path: Courses CSV (SkillsGained column)
+        student_data_path: Optional students CSV (Skills / TechnicalSkills)
+
+    Returns:
+        Sorted list of lowercase skills
+    """
+    import pandas as pd
+
+    sources = [(job_data_path, ['required_skills']), (course_data_path, ['SkillsGained'])]
+    if student_data_path:
+        sources.append((student_data_path, ['Skills', 'TechnicalSkills']))
+
+    vocabulary = set()
+    for path, columns in sources:
+        df = pd.read_csv(path, usecols=lambda c: c in columns)
+        for column in df.columns:
+            for value in df[column].dropna():
+                for skill in CATALOG_SEPARATORS.split(str(value)):
+                    skill = skill.strip().lower()
+                    if skill:
+                        vocabulary.add(skill)
+    return sorted(vocabulary)
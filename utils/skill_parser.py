@@ -2,8 +2,42 @@
 Skill parsing and normalization utilities for skill gap analysis.
 """
 
+import os
 import re
-from typing import List, Set, Dict, Tuple
+import json
+from functools import lru_cache
+from typing import Iterable, List, Set, Dict, Tuple, Union
+
+ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_aliases.json')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def load_skill_aliases(path: str = ALIASES_PATH) -> Dict[str, str]:
+    """
+    Load the alias -> canonical skill table.
+    
+    Args:
+        path: JSON file mapping aliases to canonical names
+        
+    Returns:
+        Dictionary keyed by the lowercased, whitespace-collapsed alias
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        aliases = json.load(f)
+    return {_WHITESPACE.sub(' ', alias.lower().strip()): canonical for alias, canonical in aliases.items()}
+
+
+# Canonical alias table shared by matching (normalize_skill) and cleaning
+# (clean_datasets.standardize_skills)
+SKILL_ALIASES = load_skill_aliases()
+
+
+@lru_cache(maxsize=65536)
+def _normalize(skill: str) -> str:
+    """Cached normalization of a non-empty string"""
+    skill = _WHITESPACE.sub(' ', skill.lower().strip())
+    return SKILL_ALIASES.get(skill, skill)
 
 
 def normalize_skill(skill: str) -> str:
@@ -18,45 +52,31 @@ def normalize_skill(skill: str) -> str:
     """
     if not skill or not isinstance(skill, str):
         return ""
+    return _normalize(skill)
+
+
+def normalize_many(skills: Union['pd.Series', Iterable[str]]) -> Union['pd.Series', List[str]]:
+    """
+    Normalize many skill strings at once.
     
-    # Convert to lowercase and strip whitespace
-    skill = skill.lower().strip()
-    
-    # Remove extra whitespace
-    skill = re.sub(r'\s+', ' ', skill)
-    
-    # Common standardizations
-    standardizations = {
-        'nodejs': 'node.js',
-        'node js': 'node.js',
-        'reactjs': 'react',
-        'react js': 'react',
-        'tensorflow': 'tensorflow',
-        'tensor flow': 'tensorflow',
-        'pytorch': 'pytorch',
-        'py torch': 'pytorch',
-        'scikit-learn': 'scikit-learn',
-        'sklearn': 'scikit-learn',
-        'ci/cd': 'ci/cd',
-        'cicd': 'ci/cd',
-        'tcp/ip': 'tcp/ip',
-        'tcpip': 'tcp/ip',
-        'rest api': 'rest apis',
-        'restful api': 'rest apis',
-        'aws': 'aws',
-        'amazon web services': 'aws',
-        'gcp': 'gcp',
-        'google cloud': 'gcp',
-        'azure': 'azure',
-        'microsoft azure': 'azure',
-    }
-    
-    # Apply standardizations
-    for old, new in standardizations.items():
-        if skill == old:
-            return new
-    
-    return skill
+    Args:
+        skills: pandas Series or iterable of raw skill strings
+        
+    Returns:
+        Series with the same index (for a Series input) or list of
+        normalized skills; non-string entries become ""
+    """
+    import pandas as pd
+
+    if isinstance(skills, pd.Series):
+        is_text = skills.map(lambda value: isinstance(value, str))
+        cleaned = (
+            skills.where(is_text, '').astype(str)
+            .str.lower().str.strip()
+            .str.replace(r'\s+', ' ', regex=True)
+        )
+        return cleaned.map(lambda skill: SKILL_ALIASES.get(skill, skill))
+    return [normalize_skill(skill) for skill in skills]
 
 
 def parse_skill_list(skill_string: str, separator: str = ';') -> List[str]:
@@ -0,0 +1,263 @@
+"""
+Interned skill vocabulary.
+
+Maps normalized skill strings to dense int ids and stores the skill sets
+of students, jobs and courses as CSR-style sorted int32 id arrays, so that
+overlap, coverage and frequency become NumPy / SciPy operations instead of
+per-call string set arithmetic.
+
+The vocabulary and the skill sets are persisted next to the embeddings:
+- embeddings/skill_vocabulary.json       skills in id order
+- embeddings/skill_sets_<name>.npz        ids, indptr, indices per catalog
+
+Ids are assigned in sorted skill order, so sorting ids also sorts the
+skills alphabetically.
+"""
+
+import os
+import json
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from utils.skill_parser import normalize_skill
+
+VOCABULARY_DIR = 'embeddings'
+VOCABULARY_FILE = 'skill_vocabulary.json'
+
+
+class SkillVocabulary:
+    """
+    Bidirectional skill <-> id mapping.
+
+    Args:
+        skills: Normalized skills in id order
+    """
+
+    def __init__(self, skills: Sequence[str] = ()):
+        self.skills: List[str] = list(skills)
+        self.index: Dict[str, int] = {skill: i for i, skill in enumerate(self.skills)}
+
+    @classmethod
+    def from_skill_lists(cls, *skill_lists: Iterable[Iterable[str]]) -> 'SkillVocabulary':
+        """Build a vocabulary (sorted ids) from any number of skill list collections"""
+        skills = set()
+        for collection in skill_lists:
+            for skill_list in collection:
+                skills.update(normalize_skill(s) for s in skill_list)
+        skills.discard('')
+        return cls(sorted(skills))
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def __contains__(self, skill: str) -> bool:
+        return normalize_skill(skill) in self.index
+
+    def id(self, skill: str) -> Optional[int]:
+        """Id of a skill, or None if it is not in the vocabulary"""
+        return self.index.get(normalize_skill(skill))
+
+    def add(self, skill: str) -> int:
+        """Id of a skill, appending it if new (new ids break alphabetical id order)"""
+        skill = normalize_skill(skill)
+        if skill not in self.index:
+            self.index[skill] = len(self.skills)
+            self.skills.append(skill)
+        return self.index[skill]
+
+    def encode(self, skills: Iterable[str], add: bool = False) -> np.ndarray:
+        """
+        Sorted unique int32 ids of a skill list.
+
+        Skills outside the vocabulary are dropped unless add=True; they can
+        never match a catalog skill anyway.
+        """
+        if add:
+            ids = {self.add(s) for s in skills if normalize_skill(s)}
+        else:
+            ids = {self.index[s] for s in map(normalize_skill, skills) if s in self.index}
+        return np.array(sorted(ids), dtype=np.int32)
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        """Skills of the given ids, in the given order"""
+        return [self.skills[i] for i in ids]
+
+    def alphabetical_rank(self) -> np.ndarray:
+        """Position of each id in alphabetical skill order (identity unless add() was used)"""
+        rank = np.empty(len(self.skills), dtype=np.int64)
+        rank[np.argsort(np.array(self.skills, dtype=object), kind='stable')] = np.arange(len(self.skills))
+        return rank
+
+    def save(self, path: str) -> None:
+        """Write the vocabulary as a JSON list"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.skills, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> 'SkillVocabulary':
+        """Read a vocabulary written by save()"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+
+class SkillSets:
+    """
+    Skill sets of one catalog in CSR layout.
+
+    Row r holds the sorted skill ids of entity ids[r] in
+    indices[indptr[r]:indptr[r + 1]].
+    """
+
+    def __init__(self, ids: Sequence, indptr: np.ndarray, indices: np.ndarray, n_skills: int):
+        self.ids = list(ids)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.n_skills = n_skills
+        self.row_of = {entity_id: row for row, entity_id in enumerate(self.ids)}
+
+    @classmethod
+    def from_lists(cls, ids: Sequence, skill_lists: Iterable[Iterable[str]],
+                   vocabulary: SkillVocabulary, add: bool = False) -> 'SkillSets':
+        """Encode one skill list per entity (add=True interns unknown skills)"""
+        arrays = [vocabulary.encode(skills, add=add) for skills in skill_lists]
+        indptr = np.zeros(len(arrays) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(a) for a in arrays])
+        indices = np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.int32)
+        return cls(ids, indptr, indices, len(vocabulary))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, row: int) -> np.ndarray:
+        """Sorted skill ids of a row"""
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def get(self, entity_id) -> np.ndarray:
+        """Sorted skill ids of an entity"""
+        return self.row(self.row_of[entity_id])
+
+    def counts(self) -> np.ndarray:
+        """Number of skills per row"""
+        return np.diff(self.indptr)
+
+    def to_csr(self, rows: Optional[Sequence[int]] = None,
+               n_skills: Optional[int] = None) -> sparse.csr_matrix:
+        """
+        Entity x skill incidence matrix (float32 ones).
+
+        Args:
+            rows: Optional row positions to select (in that order)
+            n_skills: Column count, for vocabularies that grew after encoding
+        """
+        matrix = sparse.csr_matrix(
+            (np.ones(len(self.indices), dtype=np.float32), self.indices, self.indptr),
+            shape=(len(self.ids), max(self.n_skills, n_skills or 0))
+        )
+        return matrix if rows is None else matrix[np.asarray(rows)]
+
+    def save(self, path: str) -> None:
+        """Write the sets as .npz"""
+        np.savez(path, ids=np.array(self.ids), indptr=self.indptr,
+                 indices=self.indices, n_skills=np.array(self.n_skills))
+
+    @classmethod
+    def load(cls, path: str) -> 'SkillSets':
+        """Read sets written by save()"""
+        with np.load(path) as data:
+            return cls(data['ids'].tolist(), data['indptr'], data['indices'], int(data['n_skills']))
+
+
+def overlap(ids_a: np.ndarray, ids_b: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Id-array counterpart of calculate_skill_overlap.
+
+    Returns:
+        Dictionary with 'matching', 'missing_from_1' (in b, not a) and
+        'missing_from_2' (in a, not b) as sorted id arrays
+    """
+    return {
+        'matching': np.intersect1d(ids_a, ids_b, assume_unique=True),
+        'missing_from_1': np.setdiff1d(ids_b, ids_a, assume_unique=True),
+        'missing_from_2': np.setdiff1d(ids_a, ids_b, assume_unique=True),
+    }
+
+
+def coverage_matrix(missing: SkillSets, courses: SkillSets,
+                    missing_counts: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Coverage of every missing-skill set by every course at once.
+
+    Matches calculate_skill_coverage: covered / len(missing), 0 when a row
+    has no missing skills.
+
+    Args:
+        missing: Missing skills per student
+        courses: Skills per course
+        missing_counts: Denominators when the missing lists held skills
+            outside the vocabulary (defaults to the encoded set sizes)
+
+    Returns:
+        Array of shape (len(missing), len(courses))
+    """
+    n_skills = max(missing.n_skills, courses.n_skills)
+    covered = (missing.to_csr(n_skills=n_skills) @ courses.to_csr(n_skills=n_skills).T)
+    covered = covered.toarray().astype(np.float64)
+    counts = missing.counts() if missing_counts is None else missing_counts
+    counts = np.asarray(counts, dtype=np.float64)
+    coverage = covered / np.where(counts > 0, counts, 1.0)[:, None]
+    coverage[counts == 0] = 0.0
+    return coverage
+
+
+def frequency(sets: SkillSets, rows: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Number of rows containing each skill (extract_skill_frequency over ids).
+
+    Returns:
+        Array of length n_skills
+    """
+    if rows is None:
+        indices = sets.indices
+    else:
+        indices = np.concatenate([sets.row(r) for r in rows]) if len(rows) else np.zeros(0, np.int32)
+    return np.bincount(indices, minlength=sets.n_skills)
+
+
+def vocabulary_paths(directory: str = VOCABULARY_DIR) -> Dict[str, str]:
+    """Path of the vocabulary file and a template for the skill set files"""
+    return {
+        'vocabulary': os.path.join(directory, VOCABULARY_FILE),
+        'sets': os.path.join(directory, 'skill_sets_{name}.npz'),
+    }
+
+
+def save_skill_vocabulary(vocabulary: SkillVocabulary, sets: Dict[str, SkillSets],
+                          directory: str = VOCABULARY_DIR) -> None:
+    """Persist the vocabulary and the catalog skill sets next to the embeddings"""
+    os.makedirs(directory, exist_ok=True)
+    paths = vocabulary_paths(directory)
+    vocabulary.save(paths['vocabulary'])
+    for name, skill_sets in sets.items():
+        skill_sets.save(paths['sets'].format(name=name))
+
+
+def load_skill_vocabulary(directory: str = VOCABULARY_DIR):
+    """
+    Load the persisted vocabulary and skill sets.
+
+    Returns:
+        Tuple of (SkillVocabulary, dict of name -> SkillSets), or (None, {})
+        if no vocabulary has been built
+    """
+    paths = vocabulary_paths(directory)
+    if not os.path.exists(paths['vocabulary']):
+        return None, {}
+    vocabulary = SkillVocabulary.load(paths['vocabulary'])
+    sets = {}
+    for name in ('students', 'jobs', 'courses'):
+        path = paths['sets'].format(name=name)
+        if os.path.exists(path):
+            sets[name] = SkillSets.load(path)
+    return vocabulary, sets
@@ -0,0 +1,435 @@
+"""
+Vector indexes over the Step 1 embedding sets.
+
+Two backends share one interface:
+- FlatIndex: exact cosine search over all vectors (blocked matmul + top-k)
+- IVFIndex: approximate search with a spherical k-means inverted file;
+  only the nprobe closest lists are scanned per query
+
+An HNSW backend is available when the optional hnswlib package is installed.
+All backends expose search(query_vectors, k, filter_mask), save(path) and
+load_index(path), and recall_at_k() compares any index against exact search.
+"""
+
+import os
+import json
+import glob
+import shutil
+import warnings
+import numpy as np
+
+from utils.similarity import normalize_rows, top_k_rows
+from utils.embedding_store import load_embedding_set, content_fingerprint
+
+try:
+    import hnswlib
+    HNSW_AVAILABLE = True
+except ImportError:
+    HNSW_AVAILABLE = False
+
+INDEX_DIR = os.path.join('embeddings', 'index')
+
+
+def _empty_results(n_queries, k):
+    """Result arrays padded with index -1 / score -inf"""
+    return (np.full((n_queries, k), -1, dtype=np.int64),
+            np.full((n_queries, k), -np.inf, dtype=np.float32))
+
+
+def _mask_padding(indices, scores):
+    """Replace excluded (-inf) hits with index -1"""
+    indices[~np.isfinite(scores)] = -1
+    return indices, scores
+
+
+class FlatIndex:
+    """
+    Exact cosine-similarity index.
+
+    Args:
+        vectors: Matrix of shape (n_items, dim)
+        ids: Optional item ids aligned with vectors (defaults to positions)
+    """
+
+    backend = 'flat'
+
+    def __init__(self, vectors, ids=None, block_size=1024):
+        self.vectors = normalize_rows(vectors)
+        self.ids = list(ids) if ids is not None else list(range(len(self.vectors)))
+        self.block_size = block_size
+        # Fingerprint of the embedding set the index was built from
+        self.source = None
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def search(self, query_vectors, k, filter_mask=None):
+        """
+        Find the k most similar items for each query.
+
+        Args:
+            query_vectors: Matrix of shape (n_queries, dim) or a single vector
+            k: Number of results per query
+            filter_mask: Optional boolean array over items; False items are excluded
+
+        Returns:
+            Tuple of (positions, scores), each (n_queries, k); missing results
+            are padded with position -1 and score -inf
+        """
+        queries = normalize_rows(np.atleast_2d(query_vectors))
+        indices, scores = _empty_results(len(queries), k)
+        k_eff = min(k, len(self.vectors))
+
+        for start in range(0, len(queries), self.block_size):
+            sims = queries[start:start + self.block_size] @ self.vectors.T
+            if filter_mask is not None:
+                sims[:, ~np.asarray(filter_mask, dtype=bool)] = -np.inf
+            block_indices, block_scores = top_k_rows(sims, k_eff)
+            indices[start:start + len(sims), :k_eff] = block_indices
+            scores[start:start + len(sims), :k_eff] = block_scores
+
+        return _mask_padding(indices, scores)
+
+    def _meta(self):
+        return {'backend': self.backend, 'count': len(self.vectors),
+                'dim': int(self.vectors.shape[1]), 'ids': self.ids, 'source': self.source}
+
+    def save(self, path):
+        """Persist the index to a directory"""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'vectors.npy'), self.vectors)
+        with open(os.path.join(path, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump(self._meta(), f)
+        return path
+
+    @classmethod
+    def _from_saved(cls, path, meta):
+        index = cls.__new__(cls)
+        index.vectors = np.load(os.path.join(path, 'vectors.npy'))
+        index.ids = meta['ids']
+        index.block_size = 1024
+        index.source = meta.get('source')
+        return index
+
+
+class IVFIndex(FlatIndex):
+    """
+    Approximate cosine index using an inverted file over k-means lists.
+
+    Vectors are stored grouped by list so each probed list is a contiguous
+    slice.
+
+    Args:
+        vectors: Matrix of shape (n_items, dim)
+        ids: Optional item ids aligned with vectors
+        nlist: Number of k-means lists (default: about sqrt(n_items))
+        nprobe: Lists scanned per query; widened automatically when a
+            filter leaves fewer than k candidates
+        n_iter: k-means iterations
+        seed: Random seed for centroid initialisation
+    """
+
+    backend = 'ivf'
+
+    def __init__(self, vectors, ids=None, nlist=None, nprobe=10, n_iter=20, seed=42):
+        super().__init__(vectors, ids)
+        n_items = len(self.vectors)
+        if nlist is None:
+            nlist = int(np.sqrt(n_items))
+        self.nlist = max(1, min(nlist, n_items))
+        self.nprobe = nprobe
+
+        self.centroids, assignments = self._train(self.vectors, self.nlist, n_iter, seed)
+        self.order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=self.nlist)
+        self.list_offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.list_vectors = np.ascontiguousarray(self.vectors[self.order])
+
+    @staticmethod
+    def _train(vectors, nlist, n_iter, seed):
+        """Spherical k-means; returns (centroids, assignments)"""
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+        assignments = np.zeros(len(vectors), dtype=np.int64)
+        for _ in range(n_iter):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            empty = np.bincount(assignments, minlength=nlist) == 0
+            # Re-seed empty lists with random vectors
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+            centroids = normalize_rows(sums)
+        return centroids, np.argmax(vectors @ centroids.T, axis=1)
+
+    def search(self, query_vectors, k, filter_mask=None, nprobe=None):
+        """
+        Approximate k nearest items per query, scanning the nprobe closest lists.
+
+        Args:
+            query_vectors: Matrix of shape (n_queries, dim) or a single vector
+            k: Number of results per query
+            filter_mask: Optional boolean array over items; False items are excluded
+            nprobe: Lists scanned per query (defaults to the index setting)
+
+        Returns:
+            Tuple of (positions, scores), padded like FlatIndex.search
+        """
+        queries = normalize_rows(np.atleast_2d(query_vectors))
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        indices, scores = _empty_results(len(queries), k)
+        list_mask = None
+        if filter_mask is not None:
+            list_mask = np.asarray(filter_mask, dtype=bool)[self.order]
+
+        list_order = np.argsort(-(queries @ self.centroids.T), axis=1, kind='stable')
+        for q, lists in enumerate(list_order):
+            # Widen the probe when filtering leaves fewer than k candidates
+            n_probe = nprobe
+            while True:
+                candidates = np.concatenate([
+                    np.arange(self.list_offsets[l], self.list_offsets[l + 1]) for l in lists[:n_probe]
+                ])
+                if list_mask is not None:
+                    candidates = candidates[list_mask[candidates]]
+                if len(candidates) >= k or n_probe >= self.nlist:
+                    break
+                n_probe = min(self.nlist, n_probe * 2)
+            if len(candidates) == 0:
+                continue
+            sims = self.list_vectors[candidates] @ queries[q]
+            top, top_scores = top_k_rows(sims.reshape(1, -1), k)
+            n = top.shape[1]
+            indices[q, :n] = self.order[candidates[top[0]]]
+            scores[q, :n] = top_scores[0]
+
+        return _mask_padding(indices, scores)
+
+    def _meta(self):
+        meta = super()._meta()
+        meta.update({'nlist': self.nlist, 'nprobe': self.nprobe})
+        return meta
+
+    def save(self, path):
+        """Persist the index to a directory"""
+        super().save(path)
+        np.save(os.path.join(path, 'centroids.npy'), self.centroids)
+        np.save(os.path.join(path, 'order.npy'), self.order)
+        np.save(os.path.join(path, 'list_offsets.npy'), self.list_offsets)
+        return path
+
+    @classmethod
+    def _from_saved(cls, path, meta):
+        index = super()._from_saved(path, meta)
+        index.nlist = meta['nlist']
+        index.nprobe = meta['nprobe']
+        index.centroids = np.load(os.path.join(path, 'centroids.npy'))
+        index.order = np.load(os.path.join(path, 'order.npy'))
+        index.list_offsets = np.load(os.path.join(path, 'list_offsets.npy'))
+        index.list_vectors = np.ascontiguousarray(index.vectors[index.order])
+        return index
+
+
+class HNSWIndex(FlatIndex):
+    """
+    Approximate cosine index backed by hnswlib (optional dependency).
+
+    Filtered searches over-fetch and drop excluded items, widening the
+    search until k allowed items are found or the whole index is covered.
+    """
+
+    backend = 'hnsw'
+
+    def __init__(self, vectors, ids=None, M=16, ef_construction=200, ef=64):
+        if not HNSW_AVAILABLE:
+            raise ImportError("hnswlib is not installed (pip install hnswlib)")
+        super().__init__(vectors, ids)
+        self.params = {'M': M, 'ef_construction': ef_construction, 'ef': ef}
+        self._build_graph()
+
+    def _build_graph(self):
+        self.graph = hnswlib.Index(space='ip', dim=self.vectors.shape[1])
+        self.graph.init_index(max_elements=len(self.vectors), M=self.params['M'],
+                              ef_construction=self.params['ef_construction'])
+        self.graph.add_items(self.vectors, np.arange(len(self.vectors)))
+        self.graph.set_ef(self.params['ef'])
+
+    def search(self, query_vectors, k, filter_mask=None):
+        """Approximate k nearest items per query; padded like FlatIndex.search"""
+        queries = normalize_rows(np.atleast_2d(query_vectors))
+        indices, scores = _empty_results(len(queries), k)
+        mask = None if filter_mask is None else np.asarray(filter_mask, dtype=bool)
+        fetch = k if mask is None else min(len(self.vectors), k * 4)
+
+        while True:
+            self.graph.set_ef(max(self.params['ef'], fetch))
+            labels, distances = self.graph.knn_query(queries, k=fetch)
+            sims = (1.0 - distances).astype(np.float32)
+            if mask is not None:
+                sims[~mask[labels]] = -np.inf
+            order = np.argsort(-sims, axis=1, kind='stable')[:, :k]
+            found = np.isfinite(np.take_along_axis(sims, order, axis=1)).sum(axis=1)
+            if mask is None or fetch >= len(self.vectors) or (found >= min(k, int(mask.sum()))).all():
+                break
+            fetch = min(len(self.vectors), fetch * 4)
+
+        n = order.shape[1]
+        indices[:, :n] = np.take_along_axis(labels, order, axis=1)
+        scores[:, :n] = np.take_along_axis(sims, order, axis=1)
+        return _mask_padding(indices, scores)
+
+    def _meta(self):
+        meta = super()._meta()
+        meta['params'] = self.params
+        return meta
+
+    @classmethod
+    def _from_saved(cls, path, meta):
+        if not HNSW_AVAILABLE:
+            raise ImportError("hnswlib is not installed (pip install hnswlib)")
+        index = super()._from_saved(path, meta)
+        index.params = meta['params']
+        index._build_graph()
+        return index
+
+
+BACKENDS = {'flat': FlatIndex, 'ivf': IVFIndex, 'hnsw': HNSWIndex}
+
+
+def build_index(vectors, ids=None, backend='flat', **params):
+    """
+    Build a vector index with the given backend.
+
+    Args:
+        vectors: Matrix of shape (n_items, dim)
+        ids: Optional item ids aligned with vectors
+        backend: 'flat', 'ivf' or 'hnsw'
+        **params: Backend-specific parameters (e.g. nlist, nprobe)
+
+    Returns:
+        Index instance
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown index backend '{backend}' (choose from {sorted(BACKENDS)})")
+    return BACKENDS[backend](vectors, ids, **params)
+
+
+def load_index(path):
+    """
+    Load an index saved with save().
+
+    Args:
+        path: Index directory
+
+    Returns:
+        Index instance of the saved backend
+    """
+    with open(os.path.join(path, 'index.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    return BACKENDS[meta['backend']]._from_saved(path, meta)
+
+
+def index_path(name, backend, index_dir=INDEX_DIR):
+    """Directory of a persisted index for an embedding set"""
+    return os.path.join(index_dir, f"{name}_{backend}")
+
+
+def embedding_fingerprint(data):
+    """
+    Content fingerprint of a loaded embedding set (ids and vectors).
+
+    Persisted indexes store the fingerprint of the set they were built
+    from; a different fingerprint means the set was rebuilt since. It is
+    read from the set's metadata (written by save_embedding_set); only
+    legacy pickles and sets saved without one are hashed here.
+    """
+    fingerprint = data['metadata'].get('fingerprint')
+    if fingerprint is None:
+        fingerprint = content_fingerprint(data['ids'], data['embeddings'])
+    return fingerprint
+
+
+def _persist(index, path):
+    """
+    Save an index through a temporary directory renamed into place, so a
+    concurrent loader never reads a half-written index
+    """
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        shutil.rmtree(tmp, ignore_errors=True)
+        index.save(tmp)
+        shutil.rmtree(path, ignore_errors=True)
+        os.rename(tmp, path)
+    except OSError as e:
+        # Read-only index directory, or another process saved it first
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.exists(os.path.join(path, 'index.json')):
+            warnings.warn(f"Could not save vector index {path}: {e}")
+
+
+def remove_indexes(name, index_dir=INDEX_DIR):
+    """Delete every persisted index of an embedding set (after rewriting it)"""
+    removed = []
+    for path in glob.glob(os.path.join(index_dir, f"{name}_*")):
+        if os.path.exists(os.path.join(path, 'index.json')):
+            shutil.rmtree(path)
+            removed.append(path)
+    return removed
+
+
+def load_embedding_index(name, backend='flat', index_dir=INDEX_DIR, embedding_dir='embeddings', **params):
+    """
+    Load a persisted index for an embedding set, building it from
+    the embedding store (and saving it) when none has been saved yet.
+
+    A persisted index built from another version of the set (different ids
+    or vectors) is rebuilt and saved again, so its row positions always
+    refer to the current set.
+
+    Args:
+        name: Embedding set name ('jobs', 'courses', 'students', 'interests')
+        backend: Index backend
+        index_dir: Directory holding persisted indexes
+        embedding_dir: Directory holding the Step 1 embedding sets
+
+    Returns:
+        Index instance
+    """
+    data = load_embedding_set(name, embedding_dir)
+    fingerprint = embedding_fingerprint(data)
+    path = index_path(name, backend, index_dir)
+    if os.path.exists(os.path.join(path, 'index.json')):
+        index = load_index(path)
+        if index.source == fingerprint:
+            return index
+        warnings.warn(f"Vector index {path} was built from another version of the "
+                      f"'{name}' embeddings; rebuilding it")
+
+    index = build_index(data['embeddings'], data['ids'], backend, **params)
+    index.source = fingerprint
+    _persist(index, path)
+    return index
+
+
+def recall_at_k(index, exact_index, query_vectors, k, filter_mask=None):
+    """
+    Mean recall@k of an index against exact search.
+
+    Args:
+        index: Index under test
+        exact_index: Reference FlatIndex over the same vectors
+        query_vectors: Queries to evaluate
+        k: Cut-off
+        filter_mask: Optional filter applied to both searches
+
+    Returns:
+        Recall in [0, 1]
+    """
+    approx, _ = index.search(query_vectors, k, filter_mask)
+    exact, _ = exact_index.search(query_vectors, k, filter_mask)
+    hits = 0
+    total = 0
+    for a, e in zip(approx, exact):
+        e = set(e[e >= 0].tolist())
+        hits += len(e.intersection(a[a >= 0].tolist()))
+        total += len(e)
+    return hits / total if total else 1.0
@@ -17,12 +17,13 @@ if sys.platform == 'win32':
     os.environ['PYTHONIOENCODING'] = 'utf-8'
     sys.stdout.reconfigure(encoding='utf-8')
 
-import pickle
 import numpy as np
 import pandas as pd
 from sklearn.metrics.pairwise import cosine_similarity
 from datetime import datetime
 
+from utils.embedding_store import load_embedding_set
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -40,11 +41,9 @@ def log(message):
     timestamp = datetime.now().strftime("%H:%M:%S")
     print(f"[{timestamp}] {message}")
 
-def load_pickle(filename):
-    """Load pickle file from embeddings directory"""
-    path = os.path.join(EMBEDDINGS_DIR, filename)
-    with open(path, 'rb') as f:
-        return pickle.load(f)
+def load_embeddings(name):
+    """Load an embedding set from the embeddings directory"""
+    return load_embedding_set(name, EMBEDDINGS_DIR)
 
 # ============================================================================
 # VERIFICATION TESTS
@@ -58,10 +57,10 @@ def verify():
     # Load all embeddings
     try:
         log("\nLoading embeddings...")
-        data_students = load_pickle('embeddings_students.pkl')
-        data_jobs = load_pickle('embeddings_jobs.pkl')
-        data_courses = load_pickle('embeddings_courses.pkl')
-        data_interests = load_pickle('embeddings_interests.pkl')
+        data_students = load_embeddings('students')
+        data_jobs = load_embeddings('jobs')
+        data_courses = load_embeddings('courses')
+        data_interests = load_embeddings('interests')
         log("✓ All embedding files loaded successfully")
     except Exception as e:
         log(f"✗ ERROR loading embeddings: {e}")
@@ -2,19 +2,20 @@ import json
 import os
 import sys
 
+from utils.record_store import has_records, read_records
+
 # --- Configuration ---
-REC_FILE = "recommendations/recommendations.json"
+REC_FILE = "recommendations/recommendations.jsonl"
 
 def verify_recommendations():
     print("🔍 Starting Verification for Step 3: Recommendation Engine...")
     
-    if not os.path.exists(REC_FILE):
+    if not has_records(REC_FILE):
         print(f"❌ Error: Recommendation file not found at {REC_FILE}")
         return False
         
     try:
-        with open(REC_FILE, "r") as f:
-            data = json.load(f)
+        data = read_records(REC_FILE)
     except Exception as e:
         print(f"❌ Error loading JSON: {e}")
         return False
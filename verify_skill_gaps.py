@@ -5,9 +5,9 @@ Validates profiles, similarity scores, and skill consistency.
 
 import os
 import sys
-import json
 import numpy as np
 from datetime import datetime
+from utils.record_store import has_records, read_records
 
 # Configure UTF-8 encoding for Windows
 if sys.platform == 'win32':
@@ -33,15 +33,14 @@ def load_profiles():
     """Load generated profiles"""
     print_header("LOADING PROFILES")
     
-    profiles_path = 'skill_gap_profiles/student_profiles.json'
+    profiles_path = 'skill_gap_profiles/student_profiles.jsonl'
     
-    if not os.path.exists(profiles_path):
+    if not has_records(profiles_path):
         print(f"[ERROR] Profiles file not found: {profiles_path}")
         print("Please run 'python skill_gap_analysis.py' first!")
         sys.exit(1)
     
-    with open(profiles_path, 'r', encoding='utf-8') as f:
-        profiles = json.load(f)
+    profiles = read_records(profiles_path)
     
     print(f"[*] Loaded {len(profiles)} student profiles")
     return profiles